@@ -0,0 +1,98 @@
+import os
+from io import BytesIO
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+# Responsive widths served through srcset (never upscaled past the original)
+VARIANT_WIDTHS = {
+    'thumb': 320,
+    'medium': 640,
+}
+
+# File extension -> (Pillow format, encoder options)
+FORMATS = {
+    'webp': ('WEBP', {'quality': 75, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 80, 'optimize': True, 'progressive': True}),
+}
+
+VARIANT_DIR = 'blog_images/variants'
+
+
+def render_variants(data):
+    """
+    Resizes raw image bytes into every variant and format.
+    Pure (no Django, no storage) so it can run in a process pool.
+    Returns {'original': {width, height}, variant: {width, height, webp: bytes, jpeg: bytes}}.
+    """
+    with Image.open(BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source).convert('RGB')
+
+    rendered = {'original': {'width': image.width, 'height': image.height}}
+    for variant, max_width in VARIANT_WIDTHS.items():
+        width = min(max_width, image.width)
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+
+        entry = {'width': width, 'height': height}
+        for ext, (fmt, params) in FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, fmt, **params)
+            entry[ext] = buffer.getvalue()
+        rendered[variant] = entry
+    return rendered
+
+
+def variant_name(image_name, variant, ext):
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    return f"{VARIANT_DIR}/{stem}_{variant}.{ext}"
+
+
+def store_variants(image_name, rendered, storage=default_storage):
+    """Writes rendered bytes next to the original and returns the record kept on Post.image_variants."""
+    record = {'original': rendered['original']}
+    for variant in VARIANT_WIDTHS:
+        entry = dict(rendered[variant])
+        for ext in FORMATS:
+            # Content-addressed storage reuses identical files; superseded ones are left to gc_media
+            entry[ext] = storage.save(variant_name(image_name, variant, ext), ContentFile(entry[ext]))
+        record[variant] = entry
+    return record
+
+
+def variant_files(record):
+    """Storage names referenced by an image_variants record."""
+    return [entry[ext] for variant, entry in record.items() if variant in VARIANT_WIDTHS
+            for ext in FORMATS if entry.get(ext)]
+
+
+def read_image(post):
+    with post.image.open('rb') as f:
+        return f.read()
+
+
+def build_derivatives(post, force=False):
+    """
+    Generates (or reuses) the variants for post.image and saves the record.
+    Posts sharing the same stored file share one set of variants.
+    Returns False if the image is missing or cannot be decoded.
+    """
+    from blog.models import Post
+
+    record = {}
+    if post.image:
+        if not force:
+            shared = (Post.objects.filter(image=post.image.name).exclude(pk=post.pk)
+                      .exclude(image_variants={}).values_list('image_variants', flat=True).first())
+            if shared:
+                record = shared
+        if not record:
+            try:
+                record = store_variants(post.image.name, render_variants(read_image(post)))
+            except (OSError, UnidentifiedImageError, ValueError):
+                record = {}
+
+    post.image_variants = record
+    Post.objects.filter(pk=post.pk).update(image_variants=record)
+    return bool(record)
@@ -0,0 +1,116 @@
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+
+from blog.models import Post
+
+SLUG_MAX_LENGTH = Post._meta.get_field('slug').max_length
+
+
+def post_slug(item):
+    """Explicit slug if given, else slugified title (trimmed to fit the column)."""
+    return (item.get('slug') or slugify(item['title']))[:SLUG_MAX_LENGTH].strip('-')
+
+
+def _suffixed(base, n):
+    suffix = f"-{n}"
+    return base[:SLUG_MAX_LENGTH - len(suffix)] + suffix
+
+
+def resolve_slugs(items):
+    """
+    Assigns a slug to every item and returns {slug: existing Post}.
+    Items are matched to existing posts by slug. When a title slugifies the
+    same as a different title earlier in the batch or an existing post with
+    another title, it gets -2, -3... (reusing a suffixed slug whose post has the
+    same title, so re-imports stay idempotent). Existing posts are fetched with
+    one query, plus one for the suffixed slugs when a title clashes with a post
+    from an earlier import.
+    """
+    bases = [post_slug(item) for item in items]
+    titles_by_base = {}
+    for base, item in zip(bases, items):
+        titles_by_base.setdefault(base, set()).add(item['title'])
+    colliding = [base for base, titles in titles_by_base.items() if len(titles) > 1]
+
+    query = Q(slug__in=set(bases))
+    for base in colliding:
+        query |= Q(slug__startswith=base[:SLUG_MAX_LENGTH - 2] + '-')
+    existing = {post.slug: post for post in Post.objects.filter(query)}
+
+    clashing = [
+        base for base, titles in titles_by_base.items()
+        if len(titles) == 1 and base in existing and existing[base].title not in titles
+    ]
+    if clashing:
+        query = Q()
+        for base in clashing:
+            query |= Q(slug__startswith=base[:SLUG_MAX_LENGTH - 2] + '-')
+        existing.update((post.slug, post) for post in Post.objects.filter(query))
+
+    # title -> slug already handed out in this batch
+    taken = {}
+    for base, item in zip(bases, items):
+        slug, n = base, 1
+        while True:
+            holder = taken.get(slug)
+            post = existing.get(slug)
+            if holder == item['title'] or (holder is None and (post is None or post.title == item['title'])):
+                break
+            n += 1
+            slug = _suffixed(base, n)
+        taken.setdefault(slug, item['title'])
+        item['slug'] = slug
+    return existing
+
+
+def bulk_load_posts(items, author, replace=False, batch_size=500):
+    """
+    Inserts or updates blog posts from an iterable of dicts
+    (title, category, content, optional slug/author) in one transaction.
+    Posts are matched on slug; unchanged posts are not written. With
+    replace=True, posts not in the import are deleted. Each item dict gets
+    its resolved 'slug' filled in.
+    Returns ({'created', 'updated', 'unchanged', 'deleted'}, {slug: Post}).
+    """
+    items = list(items)
+    counts = {'created': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0}
+    now = timezone.now()
+
+    with transaction.atomic():
+        existing = resolve_slugs(items)
+
+        # Later duplicates of the same slug win, like repeated save() calls did
+        by_slug = {item['slug']: item for item in items}
+        to_create, to_update, posts = [], [], {}
+        for slug, item in by_slug.items():
+            fields = {
+                'title': item['title'],
+                'category': item.get('category') or 'Career Advice',
+                'content': item.get('content') or '',
+                'author_id': (item.get('author') or author).pk,
+            }
+            post = existing.get(slug)
+            if post is None:
+                post = Post(slug=slug, **fields)
+                to_create.append(post)
+            elif any(getattr(post, name) != value for name, value in fields.items()):
+                for name, value in fields.items():
+                    setattr(post, name, value)
+                post.updated_at = now
+                to_update.append(post)
+            else:
+                counts['unchanged'] += 1
+            posts[slug] = post
+
+        if to_create:
+            Post.objects.bulk_create(to_create, batch_size=batch_size)
+            counts['created'] = len(to_create)
+        if to_update:
+            Post.objects.bulk_update(to_update, ['title', 'category', 'content', 'author', 'updated_at'], batch_size=batch_size)
+            counts['updated'] = len(to_update)
+        if replace:
+            counts['deleted'], _ = Post.objects.exclude(slug__in=list(posts)).delete()
+
+    return counts, posts
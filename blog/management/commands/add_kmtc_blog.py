@@ -1,10 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
-from blog.models import Post
-from django.utils.text import slugify
-from django.utils import timezone
-import requests
-from django.core.files.base import ContentFile
+from blog.images import attach_images
+from blog.loader import bulk_load_posts
 
 class Command(BaseCommand):
     help = "Adds a comprehensive KMTC blog post with detailed information"
@@ -255,35 +252,19 @@ KMTC opens applications twice per year - September intake and March intake. The
 
 KMTC offers unmatched value for mid-level medical training. With strategic planning - from choosing the right campus to securing financing to positioning yourself for international opportunities - you can transform a KMTC diploma into a six-figure career within 5 years of graduation. The key is to be intentional about every decision from application to career launch."""
 
-        # Check if post exists to update, or create new
-        post, created = Post.objects.get_or_create(
-            title=title,
-            defaults={
-                'slug': slugify(title),
-                'category': 'Career Advice',
-                'content': content,
-                'author': author,
-                'created_at': timezone.now()
-            }
-        )
-
-        if not created:
-            # Update existing if found
-            post.content = content
-            post.save()
-            self.stdout.write(f"Updated existing post: {title}")
-        else:
+        # Upsert by slug so re-running updates the same post instead of duplicating it
+        counts, posts = bulk_load_posts([{'title': title, 'category': 'Career Advice', 'content': content}], author)
+        post = next(iter(posts.values()))
+
+        if counts['created']:
             self.stdout.write(f"Created new post: {title}")
+        else:
+            self.stdout.write(f"Updated existing post: {title}")
 
         # Download and save image
         self.stdout.write("Downloading KMTC image...")
-        try:
-            response = requests.get(image_url, timeout=15)
-            if response.status_code == 200:
-                file_name = f"blog_kmtc_{post.id}.jpg"
-                post.image.save(file_name, ContentFile(response.content), save=True)
-                self.stdout.write(self.style.SUCCESS("✓ Image attached successfully."))
+        for post, error in attach_images({post: [image_url]}, filename='blog_kmtc_{id}.jpg', timeout=15):
+            if error:
+                self.stdout.write(self.style.ERROR(f"Failed to download image. {error}"))
             else:
-                self.stdout.write(self.style.ERROR("Failed to download image."))
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(f"Error downloading image: {e}"))
\ No newline at end of file
+                self.stdout.write(self.style.SUCCESS("✓ Image attached successfully."))
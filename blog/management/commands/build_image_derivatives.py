@@ -0,0 +1,62 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.core.management.base import BaseCommand
+from blog.derivatives import read_image, render_variants, store_variants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Generates thumbnail/medium WebP and JPEG variants for every blog image using a process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 1,
+            help='Processes used for resizing (default: number of CPUs)'
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Rebuild variants even for posts that already have them'
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['force']:
+            posts = posts.filter(image_variants={})
+
+        # 1. Group posts by stored file so a shared image is resized once
+        by_image = {}
+        for post in posts:
+            by_image.setdefault(post.image.name, []).append(post)
+
+        if not by_image:
+            self.stdout.write(self.style.SUCCESS("All blog images already have variants."))
+            return
+
+        self.stdout.write(f"Resizing {len(by_image)} images with {options['workers']} workers...")
+
+        # 2. Resize in worker processes; storage writes and DB updates stay in this process
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            futures = {}
+            for image_name, group in by_image.items():
+                try:
+                    futures[pool.submit(render_variants, read_image(group[0]))] = image_name
+                except OSError as e:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f"x Missing file {image_name} ({e})"))
+
+            for future in as_completed(futures):
+                image_name = futures[future]
+                try:
+                    record = store_variants(image_name, future.result())
+                except Exception as e:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f"x Could not resize {image_name} ({e})"))
+                    continue
+                Post.objects.filter(pk__in=[p.pk for p in by_image[image_name]]).update(image_variants=record)
+                done += 1
+
+        self.stdout.write(self.style.SUCCESS(f"DONE! {done} images resized, {failed} failed."))
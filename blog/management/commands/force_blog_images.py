@@ -1,38 +1,51 @@
-import requests
 from django.core.management.base import BaseCommand
-from django.core.files.base import ContentFile
+from blog.images import ImageFetcher, ImageStore
 from blog.models import Post
-import time
+
+# PRIMARY LINKS (High Quality)
+IMAGE_MAP = {
+    'Medicine': 'https://images.unsplash.com/photo-1576091160399-112ba8d25d1d?w=800&q=80',
+    'Engineering': 'https://images.unsplash.com/photo-1503387762-592deb58ef4e?w=800&q=80',
+    'ICT': 'https://images.unsplash.com/photo-1517694712202-14dd9538aa97?w=800&q=80',
+    'Business': 'https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=800&q=80',
+    'Money': 'https://images.unsplash.com/photo-1579621970563-ebec7560ff3e?w=800&q=80',
+    'Law': 'https://images.unsplash.com/photo-1589829085413-56de8ae18c73?w=800&q=80',
+    'University': 'https://images.unsplash.com/photo-1541339907198-e08756dedf3f?w=800&q=80',
+    'Graduation': 'https://images.unsplash.com/photo-1627556592933-ffe99c1cd9eb?w=800&q=80',
+    'General': 'https://images.unsplash.com/photo-1454165804606-c3d57bc86b40?w=800&q=80'
+}
+
+# BACKUP LINKS (If primary fails)
+BACKUP_MAP = {
+    'Medicine': 'https://images.unsplash.com/photo-1505751172876-fa1923c5c528?w=800&q=80',
+    'Engineering': 'https://images.unsplash.com/photo-1581094794329-cd136df4bf75?w=800&q=80',
+    'ICT': 'https://images.unsplash.com/photo-1587620962725-abab7fe55159?w=800&q=80',
+    'University': 'https://images.unsplash.com/photo-1562774053-701939374585?w=800&q=80',
+    'General': 'https://images.unsplash.com/photo-1497633762265-9d179a990aa6?w=800&q=80'
+}
 
 class Command(BaseCommand):
     help = "Force updates blog images using reliable stock photos with backups"
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Number of images downloaded at the same time (default: 8)'
+        )
+        parser.add_argument(
+            '--retries',
+            type=int,
+            default=3,
+            help='Attempts per URL before trying the backup (default: 3)'
+        )
+
+    def handle(self, *args, **options):
         posts = Post.objects.all()
         self.stdout.write("Starting Image Update...")
 
-        # PRIMARY LINKS (High Quality)
-        IMAGE_MAP = {
-            'Medicine': 'https://images.unsplash.com/photo-1576091160399-112ba8d25d1d?w=800&q=80',
-            'Engineering': 'https://images.unsplash.com/photo-1503387762-592deb58ef4e?w=800&q=80',
-            'ICT': 'https://images.unsplash.com/photo-1517694712202-14dd9538aa97?w=800&q=80',
-            'Business': 'https://images.unsplash.com/photo-1460925895917-afdab827c52f?w=800&q=80',
-            'Money': 'https://images.unsplash.com/photo-1579621970563-ebec7560ff3e?w=800&q=80',
-            'Law': 'https://images.unsplash.com/photo-1589829085413-56de8ae18c73?w=800&q=80',
-            'University': 'https://images.unsplash.com/photo-1541339907198-e08756dedf3f?w=800&q=80',
-            'Graduation': 'https://images.unsplash.com/photo-1627556592933-ffe99c1cd9eb?w=800&q=80',
-            'General': 'https://images.unsplash.com/photo-1454165804606-c3d57bc86b40?w=800&q=80'
-        }
-
-        # BACKUP LINKS (If primary fails)
-        BACKUP_MAP = {
-            'Medicine': 'https://images.unsplash.com/photo-1505751172876-fa1923c5c528?w=800&q=80',
-            'Engineering': 'https://images.unsplash.com/photo-1581094794329-cd136df4bf75?w=800&q=80',
-            'ICT': 'https://images.unsplash.com/photo-1587620962725-abab7fe55159?w=800&q=80',
-            'University': 'https://images.unsplash.com/photo-1562774053-701939374585?w=800&q=80',
-            'General': 'https://images.unsplash.com/photo-1497633762265-9d179a990aa6?w=800&q=80'
-        }
-
+        jobs = {}
         for post in posts:
             # Check if image works (size > 0)
             if post.image:
@@ -43,8 +56,6 @@ class Command(BaseCommand):
                 except:
                     pass # Image file missing, so re-download
 
-            self.stdout.write(f"Updating: {post.title}...")
-            
             # 1. Determine the category
             key = 'General'
             title_lower = post.title.lower()
@@ -57,24 +68,30 @@ class Command(BaseCommand):
             elif 'univ' in title_lower or 'kuccps' in title_lower: key = 'University'
             elif 'degree' in title_lower or 'diploma' in title_lower: key = 'Graduation'
             
-            urls_to_try = [IMAGE_MAP.get(key), BACKUP_MAP.get(key, BACKUP_MAP['General'])]
+            jobs[post.id] = (post, key, [IMAGE_MAP.get(key), BACKUP_MAP.get(key, BACKUP_MAP['General'])])
 
-            # 2. Attempt Download
-            success = False
-            for url in urls_to_try:
-                if not url: continue
-                try:
-                    response = requests.get(url, timeout=15)
-                    if response.status_code == 200:
-                        filename = f"blog_{post.id}.jpg"
-                        post.image.save(filename, ContentFile(response.content), save=True)
-                        self.stdout.write(self.style.SUCCESS(f"✓ DONE ({key})"))
-                        success = True
-                        break
-                except Exception:
+        # 2. Download concurrently; many posts share a stock photo, so the store keeps one copy of each
+        self.stdout.write(f"Updating {len(jobs)} images ({options['concurrency']} at a time)...")
+        fetcher = ImageFetcher(concurrency=options['concurrency'], retries=options['retries'])
+        store = ImageStore(post for post in posts if post.id not in jobs)
+
+        failed = 0
+        try:
+            for post_id, content, url_index, error in fetcher.fetch_all(
+                (post_id, urls) for post_id, (post, key, urls) in jobs.items()
+            ):
+                post, key = jobs[post_id][:2]
+                if content is None:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f"x Failed all attempts for {post.title} ({error})"))
                     continue
-            
-            if not success:
-                self.stdout.write(self.style.ERROR(f"x Failed all attempts for {post.title}"))
 
-        self.stdout.write(self.style.SUCCESS("\nAll images updated successfully!"))
\ No newline at end of file
+                store.save(post, content, f"blog_{post.id}.jpg")
+                self.stdout.write(self.style.SUCCESS(f"✓ DONE: {post.title} ({key})"))
+        finally:
+            fetcher.close()
+
+        if failed:
+            self.stdout.write(self.style.WARNING(f"\n{failed} images could not be downloaded."))
+        else:
+            self.stdout.write(self.style.SUCCESS("\nAll images updated successfully!"))
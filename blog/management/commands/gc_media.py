@@ -0,0 +1,79 @@
+import os
+import time
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import models
+
+from blog.derivatives import variant_files
+from blog.models import Post
+
+
+def referenced_media():
+    """Every storage name still pointed at by a FileField/ImageField or a blog image variant."""
+    names = set()
+    for model in apps.get_models():
+        for field in model._meta.get_fields():
+            if isinstance(field, models.FileField):
+                names.update(
+                    model._default_manager.exclude(**{field.name: ''})
+                    .exclude(**{f'{field.name}__isnull': True})
+                    .values_list(field.name, flat=True)
+                )
+    for record in Post.objects.exclude(image_variants={}).values_list('image_variants', flat=True):
+        names.update(variant_files(record))
+    return names
+
+
+class Command(BaseCommand):
+    help = "Deletes media files that no model references any more (orphans from re-downloads and old names)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='List the orphaned files without deleting them'
+        )
+        parser.add_argument(
+            '--min-age',
+            type=int,
+            default=60,
+            help='Only delete files older than this many minutes, so in-flight uploads survive (default: 60)'
+        )
+
+    def handle(self, *args, **options):
+        root = default_storage.location
+        if not os.path.isdir(root):
+            self.stdout.write(self.style.WARNING(f"No media directory at {root}"))
+            return
+
+        # 1. Everything the database still points at
+        referenced = referenced_media()
+        cutoff = time.time() - options['min_age'] * 60
+
+        # 2. Walk MEDIA_ROOT and drop anything unreferenced and old enough
+        removed = freed = kept = 0
+        for directory, _, filenames in os.walk(root, topdown=False):
+            for filename in filenames:
+                full_path = os.path.join(directory, filename)
+                name = os.path.relpath(full_path, root).replace(os.sep, '/')
+                if name in referenced or os.path.getmtime(full_path) > cutoff:
+                    kept += 1
+                    continue
+
+                size = os.path.getsize(full_path)
+                if options['dry_run']:
+                    self.stdout.write(f"Would delete {name} ({size / 1024:.0f} KiB)")
+                else:
+                    default_storage.delete(name)
+                removed += 1
+                freed += size
+
+            # Clean up empty hash directories
+            if not options['dry_run'] and directory != root and not os.listdir(directory):
+                os.rmdir(directory)
+
+        verb = "Would free" if options['dry_run'] else "Freed"
+        self.stdout.write(self.style.SUCCESS(
+            f"DONE! {removed} orphaned files, {kept} kept. {verb} {freed / 1024:.0f} KiB."
+        ))
@@ -0,0 +1,82 @@
+import json
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.images import attach_images
+from blog.loader import bulk_load_posts
+
+
+class Command(BaseCommand):
+    help = "Bulk imports blog posts from a JSON array of {title, category, content, slug?, image?} in one transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'file',
+            help='JSON file with a list of posts'
+        )
+        parser.add_argument(
+            '--author',
+            type=str,
+            default=None,
+            help='Username credited as author (default: first superuser)'
+        )
+        parser.add_argument(
+            '--replace',
+            action='store_true',
+            help='Delete posts that are not in the file'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Rows per bulk insert/update (default: 500)'
+        )
+        parser.add_argument(
+            '--no-images',
+            action='store_true',
+            help="Skip downloading the 'image' URLs"
+        )
+
+    def handle(self, *args, **options):
+        # 1. Read and check the file
+        try:
+            with open(options['file'], 'r', encoding='utf-8') as f:
+                items = json.load(f)
+        except FileNotFoundError:
+            raise CommandError(f"File not found: {options['file']}")
+        except ValueError as e:
+            raise CommandError(f"Could not parse JSON: {e}")
+
+        if not isinstance(items, list):
+            raise CommandError("Expected a JSON list of posts")
+        for i, item in enumerate(items):
+            if not isinstance(item, dict) or not item.get('title'):
+                raise CommandError(f"Post #{i} has no title")
+
+        # 2. Author
+        if options['author']:
+            author = User.objects.filter(username=options['author']).first()
+        else:
+            author = User.objects.filter(is_superuser=True).first()
+        if not author:
+            raise CommandError("No author found. Pass --author or create a superuser first.")
+
+        # 3. Upsert everything at once
+        counts, posts = bulk_load_posts(items, author, replace=options['replace'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"DONE! {counts['created']} created, {counts['updated']} updated, "
+            f"{counts['unchanged']} unchanged, {counts['deleted']} deleted."
+        ))
+
+        # 4. Images for posts that don't have one yet
+        if options['no_images']:
+            return
+        jobs = {posts[item['slug']]: [item['image']] for item in items
+                if item.get('image') and not posts[item['slug']].image}
+        failed = 0
+        for post, error in attach_images(jobs):
+            if error:
+                failed += 1
+                self.stdout.write(self.style.WARNING(f"Image failed for {post.title}: {error}"))
+        if jobs:
+            self.stdout.write(f"{len(jobs) - failed} images downloaded, {failed} failed.")
@@ -1,8 +1,6 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
-from blog.models import Post
-from django.utils.text import slugify # <-- IMPORT THIS
-from django.utils import timezone
+from blog.loader import bulk_load_posts
 
 class Command(BaseCommand):
     help = "Populate the blog with sample data"
@@ -18,10 +16,6 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.ERROR("Error: No Admin user found. Please create a superuser first using 'python manage.py createsuperuser'"))
                 return
 
-        # Clear old posts to avoid duplicates and slug conflicts
-        Post.objects.all().delete()
-        self.stdout.write("Old blog posts deleted.")
-
         # Sample Data
         samples = [
             {
@@ -85,18 +79,9 @@ class Command(BaseCommand):
             }
         ]
 
-        # Create Posts
-        for sample in samples:
-            # THIS IS THE FIX: Generate a slug from the title
-            slug = slugify(sample['title'])
-            
-            Post.objects.create(
-                title=sample['title'],
-                slug=slug,  # <--- We now provide the slug explicitly
-                category=sample['category'],
-                content=sample['content'],
-                author=author,
-                created_at=timezone.now()
-            )
-
-        self.stdout.write(self.style.SUCCESS(f"Successfully added {len(samples)} sample blog posts!"))
\ No newline at end of file
+        # Create Posts (one transaction; posts not in the samples are removed, existing ones are updated in place)
+        counts, _ = bulk_load_posts(samples, author, replace=True)
+        self.stdout.write(self.style.SUCCESS(
+            f"Blog populated: {counts['created']} created, {counts['updated']} updated, "
+            f"{counts['unchanged']} unchanged, {counts['deleted']} old posts deleted."
+        ))
@@ -1,14 +1,32 @@
-import requests
 from django.core.management.base import BaseCommand
-from django.core.files.base import ContentFile
+from blog.images import ImageFetcher, ImageStore
 from blog.models import Post
-import time
 import urllib.parse
 
+# URL for AI Generator
+AI_IMAGE_URL = "https://image.pollinations.ai/prompt/{prompt}?width=800&height=500&nologo=true&seed={seed}"
+
+# URL for Fallback (Reliable Placeholder)
+FALLBACK_IMAGE_URL = "https://placehold.co/800x500/2c3e50/ffffff.png?text={text}"
+
 class Command(BaseCommand):
     help = "Automatically generates and saves AI images for blog posts (with Retry & Fallback)"
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=8,
+            help='Number of images downloaded at the same time (default: 8)'
+        )
+        parser.add_argument(
+            '--retries',
+            type=int,
+            default=3,
+            help='Attempts per URL before falling back (default: 3)'
+        )
+
+    def handle(self, *args, **options):
         posts = Post.objects.all()
         
         if not posts.exists():
@@ -30,14 +48,13 @@ class Command(BaseCommand):
             'Money': 'kenyan shillings money finance graph business growth success',
         }
 
+        jobs = {}
         for post in posts:
             # Skip if it already has an image
             if post.image:
                 self.stdout.write(f"Skipping '{post.title}' (Image exists)")
                 continue
 
-            self.stdout.write(f"Generating image for: {post.title}...")
-            
             # 1. Determine the prompt
             search_term = prompts.get(post.category, 'education students learning')
             
@@ -47,45 +64,37 @@ class Command(BaseCommand):
             elif 'Law' in post.title: search_term = prompts['Law']
             elif 'Pay' in post.title or 'Job' in post.title: search_term = prompts['Money']
 
-            # Encode the prompt for the URL
-            encoded_prompt = urllib.parse.quote(search_term)
-            
-            # URL for AI Generator
-            ai_url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width=800&height=500&nologo=true&seed={post.id}"
-            
-            # URL for Fallback (Reliable Placeholder)
-            fallback_url = f"https://placehold.co/800x500/2c3e50/ffffff.png?text={urllib.parse.quote(post.category)}"
+            jobs[post.id] = (post, [
+                AI_IMAGE_URL.format(prompt=urllib.parse.quote(search_term), seed=post.id),
+                FALLBACK_IMAGE_URL.format(text=urllib.parse.quote(post.category)),
+            ])
+
+        if not jobs:
+            self.stdout.write(self.style.SUCCESS("\nProcess Complete!"))
+            return
+
+        # 2. Download concurrently; the fallback is only tried once the AI URL has used up its retries
+        self.stdout.write(f"Generating {len(jobs)} images ({options['concurrency']} at a time)...")
+        fetcher = ImageFetcher(concurrency=options['concurrency'], retries=options['retries'], timeout=60)
+        store = ImageStore(posts.exclude(image='').exclude(image__isnull=True))
 
-            # 2. Try to download (with retries)
-            success = False
-            for attempt in range(1, 4): # Try 3 times
-                try:
-                    # Increased timeout to 60 seconds
-                    response = requests.get(ai_url, timeout=60)
-                    
-                    if response.status_code == 200:
-                        filename = f"blog_{post.id}.jpg"
-                        post.image.save(filename, ContentFile(response.content), save=True)
-                        self.stdout.write(self.style.SUCCESS(f"✓ Saved AI image for {post.title}"))
-                        success = True
-                        break
-                    else:
-                        self.stdout.write(self.style.WARNING(f"  Attempt {attempt}: AI Server returned {response.status_code}"))
-                
-                except Exception as e:
-                    self.stdout.write(self.style.WARNING(f"  Attempt {attempt}: Timeout or Error ({str(e)})"))
-                    time.sleep(2) # Wait 2 seconds before retry
+        try:
+            for post_id, content, url_index, error in fetcher.fetch_all(
+                (post_id, urls) for post_id, (post, urls) in jobs.items()
+            ):
+                post = jobs[post_id][0]
+                if content is None:
+                    self.stdout.write(self.style.ERROR(f"Critical: Could not save any image for {post.title} ({error})"))
+                    continue
 
-            # 3. Use Fallback if AI fails
-            if not success:
-                self.stdout.write(self.style.ERROR(f"x Failed to get AI image. Using fallback."))
-                try:
-                    response = requests.get(fallback_url, timeout=10)
-                    if response.status_code == 200:
-                        filename = f"blog_{post.id}_placeholder.jpg"
-                        post.image.save(filename, ContentFile(response.content), save=True)
-                        self.stdout.write(self.style.SUCCESS(f"✓ Saved fallback image for {post.title}"))
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(f"Critical: Could not save any image for {post.title}"))
+                # 3. Save on this thread; identical bytes are stored once and shared
+                if url_index == 0:
+                    store.save(post, content, f"blog_{post.id}.jpg")
+                    self.stdout.write(self.style.SUCCESS(f"✓ Saved AI image for {post.title}"))
+                else:
+                    store.save(post, content, f"blog_{post.id}_placeholder.jpg")
+                    self.stdout.write(self.style.SUCCESS(f"✓ Saved fallback image for {post.title}"))
+        finally:
+            fetcher.close()
 
-        self.stdout.write(self.style.SUCCESS("\nProcess Complete!"))
\ No newline at end of file
+        self.stdout.write(self.style.SUCCESS("\nProcess Complete!"))
@@ -1,10 +1,7 @@
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
-from blog.models import Post
-from django.utils.text import slugify
-from django.utils import timezone
-import requests
-from django.core.files.base import ContentFile
+from blog.images import attach_images
+from blog.loader import bulk_load_posts
 
 class Command(BaseCommand):
     help = "Wipes and repopulates blog with PREMIUM content and images"
@@ -19,11 +16,7 @@ class Command(BaseCommand):
         except:
             return
 
-        # 2. Clear Old Data to ensure no "boring" posts remain
-        self.stdout.write("Deleting old posts...")
-        Post.objects.all().delete()
-
-        # 3. Define Premium Content Data
+        # 2. Define Premium Content Data
         # Note: The text includes the [LOCKED CONTENT STARTS HERE] marker for your paywall logic.
         
         data = [
@@ -140,28 +133,19 @@ You do not have to start from Year 1.
             }
         ]
 
-        # 4. Create Posts & Download Images
+        # 3. Create Posts in one transaction; old "boring" posts not in this list are deleted
         self.stdout.write(f"Creating {len(data)} Premium Posts...")
-        
-        for item in data:
-            self.stdout.write(f"Processing: {item['title']}...")
-            post = Post.objects.create(
-                title=item['title'],
-                slug=slugify(item['title']),
-                category=item['category'],
-                content=item['content'],
-                author=author,
-                created_at=timezone.now()
-            )
-            
-            # Download Image
-            try:
-                response = requests.get(item['image'], timeout=10)
-                if response.status_code == 200:
-                    file_name = f"blog_{post.id}.jpg"
-                    post.image.save(file_name, ContentFile(response.content), save=True)
-                    self.stdout.write(self.style.SUCCESS(f"✓ Created & Image Saved"))
-            except Exception as e:
-                self.stdout.write(self.style.WARNING(f"Image failed for {item['title']}: {e}"))
-
-        self.stdout.write(self.style.SUCCESS("BLOG REPOPULATION COMPLETE!"))
\ No newline at end of file
+        counts, posts = bulk_load_posts(data, author, replace=True)
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {counts['created']} created, {counts['updated']} updated, "
+            f"{counts['unchanged']} unchanged, {counts['deleted']} old posts deleted"
+        ))
+
+        # 4. Download Images (concurrently, only for posts that don't have one yet)
+        image_urls = {item['slug']: item['image'] for item in data}
+        jobs = {post: [image_urls[slug]] for slug, post in posts.items() if not post.image}
+        for post, error in attach_images(jobs):
+            if error:
+                self.stdout.write(self.style.WARNING(f"Image failed for {post.title}: {error}"))
+            else:
+                self.stdout.write(self.style.SUCCESS(f"✓ Image Saved: {post.title}"))
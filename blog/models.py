@@ -16,6 +16,8 @@ class Post(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE, default=1)
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES, default='Career Advice')
     image = models.ImageField(upload_to='blog_images/', blank=True, null=True)
+    # Resized WebP/JPEG copies of image with their dimensions (see blog/derivatives.py)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     content = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -23,8 +25,56 @@ class Post(models.Model):
     class Meta:
         ordering = ['-created_at']
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Read the raw value so deferred loads (.only()) don't trigger a query
+        image = self.__dict__.get('image')
+        self._saved_image_name = getattr(image, 'name', image) or None
+
     def __str__(self):
         return self.title
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Build the responsive variants whenever a new image is attached
+        if 'image' in self.__dict__ and (self.image.name or None) != self._saved_image_name:
+            from blog.derivatives import build_derivatives
+            build_derivatives(self)
+            self._saved_image_name = self.image.name or None
+
+    def image_srcset(self, ext):
+        """'url 320w, url 640w' for the given variant format ('webp' or 'jpeg')."""
+        from blog.derivatives import VARIANT_WIDTHS
+        from django.core.files.storage import default_storage
+
+        candidates = []
+        for variant in VARIANT_WIDTHS:
+            entry = self.image_variants.get(variant)
+            if entry and entry.get(ext):
+                candidates.append(f"{default_storage.url(entry[ext])} {entry['width']}w")
+        original = self.image_variants.get('original')
+        if ext == 'jpeg' and original and candidates:
+            candidates.append(f"{self.image.url} {original['width']}w")
+        return ', '.join(candidates)
+
+    @property
+    def webp_srcset(self):
+        return self.image_srcset('webp')
+
+    @property
+    def jpeg_srcset(self):
+        return self.image_srcset('jpeg')
+
+    @property
+    def thumbnail(self):
+        """The smallest JPEG variant as {url, width, height}, falling back to the original."""
+        from django.core.files.storage import default_storage
+
+        entry = self.image_variants.get('thumb')
+        if entry:
+            return {'url': default_storage.url(entry['jpeg']), 'width': entry['width'], 'height': entry['height']}
+        original = self.image_variants.get('original', {})
+        return {'url': self.image.url, 'width': original.get('width'), 'height': original.get('height')}
         
     def get_read_time(self):
         words = len(self.content.split())
@@ -1,3 +1,402 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from unittest import mock
+
+from PIL import Image
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.derivatives import render_variants
+from blog.images import ImageFetcher, ImageStore
+from blog.loader import bulk_load_posts
+from blog.models import Post
+from coursereviews.media import is_content_addressed, serve_media
+from coursereviews.testing import QueryBudgetMixin
+from students.models import Payment
+
+
+# ==========================================
+# LOCAL IMAGE SERVER (stands in for unsplash / pollinations)
+# ==========================================
+class ImageServer:
+    """
+    Serves image bytes on 127.0.0.1 from a background thread.
+    Routes: /img/<name> returns the bytes in `images`, /flaky/<name> answers 503
+    until it has failed `fail_first` times, anything else is a 404.
+    """
+
+    def __init__(self, images, fail_first=2):
+        self.images = images
+        self.fail_first = fail_first
+        self.hits = {}
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                route, _, name = self.path.lstrip('/').partition('/')
+                with server.lock:
+                    server.hits[self.path] = server.hits.get(self.path, 0) + 1
+                    hits = server.hits[self.path]
+                if route == 'flaky' and hits <= server.fail_first:
+                    self.send_response(503)
+                    self.end_headers()
+                    return
+                body = server.images.get(name.split('?')[0]) if route in ('img', 'flaky') else None
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'image/png')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.httpd.server_port}/{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class ImageTestCase(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        media = override_settings(MEDIA_ROOT=self.media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        User.objects.create_user(id=1, username='admin')
+
+    def make_post(self, title, category='Career Advice'):
+        return Post.objects.create(title=title, slug=title.lower().replace(' ', '-'),
+                                   category=category, content='Body text')
+
+
+# ==========================================
+# DOWNLOADER
+# ==========================================
+class ImageFetcherTests(ImageTestCase):
+    def test_retries_with_backoff_then_falls_back(self):
+        with ImageServer({'a': b'A' * 10, 'b': b'B' * 10}) as server:
+            fetcher = ImageFetcher(concurrency=4, retries=3, backoff=0.001)
+            try:
+                # 503 twice then OK on the third attempt
+                self.assertEqual(fetcher.fetch([server.url('flaky/a')]), (b'A' * 10, 0, None))
+                # 404 is not retried; the backup URL is used instead
+                content, index, _ = fetcher.fetch([server.url('missing/x'), server.url('img/b')])
+            finally:
+                fetcher.close()
+            self.assertEqual((content, index), (b'B' * 10, 1))
+            self.assertEqual(server.hits['/flaky/a'], 3)
+            self.assertEqual(server.hits['/missing/x'], 1)
+
+    def test_fetch_all_reports_failures(self):
+        with ImageServer({'a': b'A'}) as server:
+            fetcher = ImageFetcher(concurrency=2, retries=2, backoff=0.001)
+            try:
+                results = {key: (content, error) for key, content, _, error in fetcher.fetch_all(
+                    [(1, [server.url('img/a')]), (2, [server.url('img/nope')])]
+                )}
+            finally:
+                fetcher.close()
+        self.assertEqual(results[1], (b'A', None))
+        self.assertIsNone(results[2][0])
+        self.assertIn('404', results[2][1])
+
+    def test_store_keeps_one_copy_of_identical_bytes(self):
+        first, second = self.make_post('One'), self.make_post('Two')
+        store = ImageStore()
+        self.assertTrue(store.save(first, b'same bytes', 'blog_1.jpg'))
+        self.assertFalse(store.save(second, b'same bytes', 'blog_2.jpg'))
+        second.refresh_from_db()
+        self.assertEqual(second.image.name, first.image.name)
+
+        # A new store picks up existing files by content
+        third = self.make_post('Three')
+        self.assertFalse(ImageStore([first]).save(third, b'same bytes', 'blog_3.jpg'))
+
+
+# ==========================================
+# COMMANDS
+# ==========================================
+class BlogImageCommandTests(ImageTestCase):
+    def test_force_blog_images_offline(self):
+        posts = [self.make_post('Medicine Careers'), self.make_post('Study Medicine Abroad'),
+                 self.make_post('Law School Guide')]
+        with ImageServer({'med': b'MED', 'law-backup': b'LAW'}) as server:
+            image_map = {'Medicine': server.url('img/med'), 'Law': server.url('img/law')}
+            backup_map = {'Law': server.url('img/law-backup'), 'General': server.url('img/none')}
+            with mock.patch.dict('blog.management.commands.force_blog_images.IMAGE_MAP', image_map, clear=True), \
+                    mock.patch.dict('blog.management.commands.force_blog_images.BACKUP_MAP', backup_map, clear=True):
+                call_command('force_blog_images', retries=1, stdout=StringIO())
+            # Both medicine posts share one download's file
+            self.assertEqual(server.hits['/img/med'], 2)
+
+        medicine, abroad, law = [Post.objects.get(pk=p.pk) for p in posts]
+        self.assertEqual(medicine.image.name, abroad.image.name)
+        self.assertEqual(law.image.read(), b'LAW')
+
+    def test_populate_blog_images_uses_fallback(self):
+        post = self.make_post('KUCCPS Tips', category='KUCCPS Updates')
+        with ImageServer({'placeholder': b'PLACEHOLDER'}) as server:
+            with mock.patch('blog.management.commands.populate_blog_images.AI_IMAGE_URL',
+                            server.url('img/ai?prompt={prompt}&seed={seed}')), \
+                    mock.patch('blog.management.commands.populate_blog_images.FALLBACK_IMAGE_URL',
+                               server.url('img/placeholder?text={text}')):
+                out = StringIO()
+                call_command('populate_blog_images', retries=1, stdout=out)
+
+        post.refresh_from_db()
+        self.assertEqual(post.image.read(), b'PLACEHOLDER')
+        self.assertIn('Saved fallback image', out.getvalue())
+
+
+# ==========================================
+# RESPONSIVE DERIVATIVES
+# ==========================================
+def jpeg_bytes(width=800, height=500, color=(200, 60, 40)):
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), color).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+class ImageDerivativeTests(ImageTestCase):
+    def test_render_variants_sizes_and_formats(self):
+        rendered = render_variants(jpeg_bytes())
+        self.assertEqual(rendered['original'], {'width': 800, 'height': 500})
+        self.assertEqual((rendered['thumb']['width'], rendered['thumb']['height']), (320, 200))
+        self.assertEqual((rendered['medium']['width'], rendered['medium']['height']), (640, 400))
+        self.assertTrue(rendered['thumb']['webp'].startswith(b'RIFF'))
+        self.assertTrue(rendered['thumb']['jpeg'].startswith(b'\xff\xd8'))
+        self.assertLess(len(rendered['thumb']['jpeg']), len(jpeg_bytes()))
+
+        # Small images are never upscaled
+        small = render_variants(jpeg_bytes(200, 100))
+        self.assertEqual(small['medium']['width'], 200)
+
+    def test_variants_built_when_image_is_attached(self):
+        post = self.make_post('With Image')
+        post.image.save('blog_1.jpg', ContentFile(jpeg_bytes()), save=True)
+
+        post.refresh_from_db()
+        self.assertEqual(post.image_variants['thumb']['width'], 320)
+        self.assertIn(' 320w', post.webp_srcset)
+        self.assertIn(' 800w', post.jpeg_srcset)
+        self.assertEqual(post.thumbnail['height'], 200)
+
+        # Saving other fields leaves the variants alone; an undecodable image clears them
+        post.title = 'Renamed'
+        post.save()
+        self.assertTrue(Post.objects.get(pk=post.pk).image_variants)
+        post.image.save('broken.jpg', ContentFile(b'not an image'), save=True)
+        self.assertEqual(Post.objects.get(pk=post.pk).image_variants, {})
+
+    def test_bulk_command_and_list_page(self):
+        posts = [self.make_post('First'), self.make_post('Second')]
+        store = ImageStore()
+        for post in posts:
+            store.save(post, jpeg_bytes(), f'blog_{post.id}.jpg')
+        Post.objects.update(image_variants={})
+
+        out = StringIO()
+        call_command('build_image_derivatives', workers=2, stdout=out)
+        self.assertIn('1 images resized', out.getvalue())
+        for post in Post.objects.all():
+            self.assertEqual(post.image_variants['medium']['width'], 640)
+
+        response = self.client.get(reverse('blog_list'))
+        self.assertContains(response, 'type="image/webp"', count=2)
+        self.assertContains(response, '320w')
+
+
+# ==========================================
+# CONTENT-ADDRESSED STORAGE
+# ==========================================
+class ContentAddressedStorageTests(ImageTestCase):
+    def test_identical_bytes_are_stored_once(self):
+        first = default_storage.save('blog_images/blog_1.jpg', ContentFile(b'stock photo'))
+        second = default_storage.save('blog_images/blog_2_placeholder.JPG', ContentFile(b'stock photo'))
+        other = default_storage.save('blog_images/blog_3.jpg', ContentFile(b'another photo'))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertTrue(is_content_addressed(first))
+        self.assertTrue(first.startswith('blog_images/') and first.endswith('.jpg'))
+        self.assertEqual(len(os.listdir(os.path.dirname(default_storage.path(first)))), 1)
+
+    def test_media_urls_are_cached_forever(self):
+        name = default_storage.save('blog_images/blog_1.jpg', ContentFile(b'stock photo'))
+        legacy = 'blog_images/blog_4_money.jpg'
+        with open(os.path.join(self.media_root, legacy), 'wb') as f:
+            f.write(b'old copy')
+
+        response = serve_media(RequestFactory().get('/media/' + name), name)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertNotIn('Cache-Control', serve_media(RequestFactory().get('/media/' + legacy), legacy))
+
+    def test_gc_media_removes_only_orphans(self):
+        post = self.make_post('Kept')
+        post.image.save('blog_1.jpg', ContentFile(jpeg_bytes()), save=True)
+        post.refresh_from_db()
+        kept = [post.image.name] + [post.image_variants['thumb']['webp']]
+        orphan = default_storage.save('blog_images/blog_4_money.jpg', ContentFile(b'old copy'))
+
+        out = StringIO()
+        call_command('gc_media', dry_run=True, min_age=0, stdout=out)
+        self.assertIn(orphan, out.getvalue())
+        self.assertTrue(default_storage.exists(orphan))
+
+        call_command('gc_media', min_age=0, stdout=StringIO())
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertFalse(os.path.exists(os.path.dirname(default_storage.path(orphan))))
+        for name in kept:
+            self.assertTrue(default_storage.exists(name))
+
+        # Recent files survive the default grace period
+        fresh = default_storage.save('blog_images/new.jpg', ContentFile(b'uploading'))
+        call_command('gc_media', stdout=StringIO())
+        self.assertTrue(default_storage.exists(fresh))
+
+        # Re-uploading an orphan's bytes restarts its grace period
+        reused = default_storage.save('blog_images/blog_5.jpg', ContentFile(b'old again'))
+        os.utime(default_storage.path(reused), (0, 0))
+        self.assertEqual(default_storage.save('blog_images/blog_6.jpg', ContentFile(b'old again')), reused)
+        call_command('gc_media', stdout=StringIO())
+        self.assertTrue(default_storage.exists(reused))
+
+
+# ==========================================
+# BULK LOADER
+# ==========================================
+class BulkLoaderTests(ImageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.author = User.objects.get(pk=1)
+
+    def articles(self, n):
+        return [{'title': f'Article {i}', 'category': 'Career Advice', 'content': f'Body {i}'} for i in range(n)]
+
+    def test_hundreds_of_posts_in_a_handful_of_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            counts, posts = bulk_load_posts(self.articles(300), self.author)
+        self.assertEqual(counts['created'], 300)
+        self.assertLessEqual(len(queries), 6)
+        self.assertEqual(Post.objects.count(), 300)
+        self.assertEqual(posts['article-7'].title, 'Article 7')
+
+        # Re-running is a no-op; a changed article is updated in place
+        items = self.articles(300)
+        items[5]['content'] = 'New body'
+        counts, _ = bulk_load_posts(items, self.author)
+        self.assertEqual((counts['created'], counts['updated'], counts['unchanged']), (0, 1, 299))
+        self.assertEqual(Post.objects.get(slug='article-5').content, 'New body')
+
+    def test_slug_collisions_are_stable(self):
+        self.make_post('C Careers')  # slug c-careers, already in the database
+        items = [
+            {'title': 'C Careers', 'content': 'x'},
+            {'title': 'C++ Careers', 'content': 'y'},
+            {'title': 'C# Careers', 'content': 'z'},
+        ]
+        bulk_load_posts(items, self.author)
+        self.assertEqual([item['slug'] for item in items], ['c-careers', 'c-careers-2', 'c-careers-3'])
+
+        counts, _ = bulk_load_posts([dict(item, slug=None) for item in items], self.author)
+        self.assertEqual(counts['created'], 0)
+        self.assertEqual(Post.objects.get(slug='c-careers-3').title, 'C# Careers')
+
+    def test_slug_clashing_with_an_earlier_import_is_suffixed(self):
+        bulk_load_posts([{'title': 'C Careers', 'content': 'x'}], self.author)
+        bulk_load_posts([{'title': 'C++ Careers', 'content': 'y'}], self.author)
+        items = [{'title': 'C# Careers', 'content': 'z'}, {'title': 'C++ Careers', 'content': 'y'}]
+        with CaptureQueriesContext(connection) as queries:
+            counts, _ = bulk_load_posts(items, self.author)
+
+        self.assertEqual([item['slug'] for item in items], ['c-careers-3', 'c-careers-2'])
+        self.assertEqual((counts['created'], counts['unchanged']), (1, 1))
+        self.assertEqual(Post.objects.get(slug='c-careers').title, 'C Careers')
+        self.assertEqual(Post.objects.get(slug='c-careers-2').title, 'C++ Careers')
+        self.assertLessEqual(len(queries), 6)
+
+    def test_replace_removes_posts_not_in_the_import(self):
+        self.make_post('Old Post')
+        counts, _ = bulk_load_posts(self.articles(2), self.author, replace=True)
+        self.assertEqual(counts['deleted'], 1)
+        self.assertEqual(sorted(Post.objects.values_list('slug', flat=True)), ['article-0', 'article-1'])
+
+    def test_load_blog_posts_command(self):
+        User.objects.filter(pk=1).update(is_superuser=True)
+        items = self.articles(3)
+        with ImageServer({'a': jpeg_bytes()}) as server:
+            items[0]['image'] = server.url('img/a')
+            path = os.path.join(self.media_root, 'posts.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(items, f)
+            out = StringIO()
+            call_command('load_blog_posts', path, stdout=out)
+
+        self.assertIn('3 created', out.getvalue())
+        self.assertTrue(Post.objects.get(slug='article-0').image_variants)
+        self.assertFalse(Post.objects.get(slug='article-1').image)
+
+
+# ==========================================
+# QUERY BUDGETS
+# ==========================================
+class BlogQueryCountTests(QueryBudgetMixin, TestCase):
+
+    def setUp(self):
+        self.reader = User.objects.create_user(username='reader', password='pw')
+        Payment.objects.create(user=self.reader, has_paid=True)
+        self.add_posts(0, 6)
+        self.post = Post.objects.order_by('id').first()
+        self.client.force_login(self.reader)
+
+    def add_posts(self, start, count):
+        # A different author per post, so reading post.author in a loop would show up as N+1
+        for i in range(start, start + count):
+            author = User.objects.create_user(username=f'author{i}')
+            Post.objects.create(title=f'Post {i}', slug=f'post-{i}', author=author, content='Body ' * 50,
+                                category='Career Advice' if i % 2 else 'University News')
+
+    def test_blog_list(self):
+        self.assertQueryBudget('/blog/', 4)
+        self.assertQueryBudget('/blog/?category=University+News', 4)
+        self.assertConstantQueries('/blog/', lambda: self.add_posts(100, 6))
+
+    def test_blog_detail(self):
+        url = f'/blog/{self.post.id}/'
+        self.assertQueryBudget(url, 5)
+        self.assertConstantQueries(url, lambda: self.add_posts(100, 6))
+
+    def test_anonymous_reader(self):
+        self.client.logout()
+        self.assertQueryBudget('/blog/', 1)
+        self.assertQueryBudget(f'/blog/{self.post.id}/', 2)
 
-# Create your tests here.
@@ -1,5 +1,36 @@
+"""
+ASGI entry point.
+
+The read-heavy public pages (home, blog list/detail, robots.txt, sitemap.xml)
+are async views, so under ASGI one worker keeps many slow mobile clients in
+flight instead of blocking a whole process on each of them.
+
+Deployment modes (Render start command):
+
+    # Sync WSGI (one request per worker at a time)
+    gunicorn coursereviews.wsgi:application --workers 2
+
+    # ASGI: gunicorn process management with uvicorn workers (recommended)
+    gunicorn coursereviews.asgi:application -k uvicorn_worker.UvicornWorker --workers 2
+
+    # ASGI without gunicorn (local development)
+    uvicorn coursereviews.asgi:application --port 8000
+
+Static files are not served by Django middleware (WhiteNoise's is sync-only and
+would put every async view behind a thread hop): AsyncStaticFiles answers
+STATIC_URL before Django, see coursereviews/static_files.py. In production put
+a CDN or nginx in front of /static/ where you can.
+
+Compare the two on your own data with:
+
+    python manage.py loadtest_views --slow-clients 10
+"""
+
 import os
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
+from coursereviews.static_files import static_asgi_application
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "coursereviews.settings")
-application = get_asgi_application()
+application = static_asgi_application(get_asgi_application(), settings)
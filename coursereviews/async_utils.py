@@ -0,0 +1,19 @@
+"""
+Helpers for the async public views.
+
+Templates read `user` (auth context processor) and messages lazily, which would
+hit the session table from inside the event loop. Resolving the user first also
+loads the session, so rendering afterwards needs no sync DB access.
+"""
+
+
+async def aload_user(request):
+    """Resolves request.user with the async auth API and caches it on the request."""
+    user = await request.auser()
+    request.user = user
+    return user
+
+
+async def alist(queryset):
+    """Evaluates a queryset with the async ORM so templates receive plain lists."""
+    return [obj async for obj in queryset]
@@ -0,0 +1,160 @@
+"""
+Scripted student journey for the benchmark suite.
+
+One journey is: signup -> enter grades -> submit payment -> (admin approval)
+-> results -> favourite a course -> read and post a review. It runs either
+in-process through Django's test Client (exact queries per request) or over
+HTTP against a running server (real throughput; queries are read from an
+X-Query-Count response header when the server sends one).
+"""
+
+import json
+import time
+from collections import namedtuple
+
+from coursereviews.loadtest import summarize
+
+Sample = namedtuple('Sample', 'step status latency queries ok')
+
+JOURNEY_PREFIX = 'bench_journey_'
+JOURNEY_PASSWORD = 'Journey-pass-2025'
+
+GRADES = {
+    'mean_grade': 'B+',
+    'mathematics': 10, 'english': 11, 'kiswahili': 9,
+    'biology': 10, 'physics': 9, 'chemistry': 10,
+    'history': 8, 'geography': 9, 'computer_studies': 11,
+}
+
+
+class InProcessClient:
+    """Django test Client that records latency and queries for every request."""
+
+    def __init__(self):
+        from django.test import Client
+        self.client = Client()
+        self.samples = []
+
+    def request(self, step, method, path, data=None, expect=200):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = getattr(self.client, method.lower())(path, data or {})
+            latency = time.perf_counter() - start
+        self.samples.append(Sample(step, response.status_code, latency, len(queries), response.status_code == expect))
+        return response.status_code
+
+
+class HttpClient:
+    """requests.Session against a running server; handles the CSRF cookie like a browser."""
+
+    def __init__(self, base_url, timeout=60):
+        import requests
+        self.base_url = base_url.rstrip('/')
+        self.session = requests.Session()
+        self.timeout = timeout
+        self.samples = []
+
+    def request(self, step, method, path, data=None, expect=200):
+        import requests
+
+        payload = dict(data or {})
+        headers = {}
+        if method == 'POST':
+            token = self.session.cookies.get('csrftoken', '')
+            payload['csrfmiddlewaretoken'] = token
+            headers['Referer'] = self.base_url + path
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, data=payload or None, headers=headers,
+                                            allow_redirects=False, timeout=self.timeout)
+        except requests.RequestException:
+            self.samples.append(Sample(step, 0, time.perf_counter() - start, None, False))
+            return 0
+        latency = time.perf_counter() - start
+        queries = response.headers.get('X-Query-Count')
+        self.samples.append(Sample(step, response.status_code, latency,
+                                   int(queries) if queries is not None else None, response.status_code == expect))
+        return response.status_code
+
+
+def run_journey(client, n, course_id, approve):
+    """Walks one new student through the site. `approve(username)` stands in for the admin approving payment."""
+    username = f"{JOURNEY_PREFIX}{n}"
+
+    client.request('signup', 'GET', '/students/signup/')
+    if client.request('signup_submit', 'POST', '/students/signup/', {
+        'username': username, 'email': f"{username}@example.com",
+        'password1': JOURNEY_PASSWORD, 'password2': JOURNEY_PASSWORD,
+    }, expect=302) != 302:
+        return False
+
+    client.request('enter_grades', 'GET', '/students/enter-grades/')
+    client.request('enter_grades_submit', 'POST', '/students/enter-grades/', GRADES, expect=302)
+    client.request('payment', 'GET', '/students/payment/')
+    client.request('payment_submit', 'POST', '/students/payment/', {'mpesa_code': f"BJ{n:08d}"}, expect=302)
+    approve(username)
+
+    client.request('results', 'GET', '/students/results/')
+    client.request('favorite', 'POST', f'/students/toggle-favorite/{course_id}/', expect=302)
+    client.request('course_reviews', 'GET', f'/students/course/{course_id}/reviews/')
+    client.request('review_submit', 'POST', f'/students/course/{course_id}/reviews/', {
+        'rating': 4, 'comment': 'Solid course with good attachment opportunities.',
+    }, expect=302)
+    client.request('favorites', 'GET', '/students/my-favorites/')
+    return True
+
+
+def summarize_samples(samples, elapsed, journeys):
+    """Per-step and overall stats: throughput, p50/p95/p99 (ms), errors and mean queries per request."""
+    steps = {}
+    for sample in samples:
+        steps.setdefault(sample.step, []).append(sample)
+
+    def stats_for(group):
+        stats = summarize([s.latency for s in group if s.ok], elapsed, errors=sum(1 for s in group if not s.ok))
+        counted = [s.queries for s in group if s.queries is not None]
+        stats['queries'] = sum(counted) / len(counted) if counted else None
+        return stats
+
+    report = stats_for(samples)
+    report['journeys'] = journeys
+    report['journeys_per_second'] = journeys / elapsed if elapsed else 0.0
+    report['steps'] = {step: stats_for(group) for step, group in steps.items()}
+    return report
+
+
+def find_regressions(report, baseline, threshold=0.25, query_threshold=0):
+    """
+    Compares a report with a saved baseline. A step regresses when its p95
+    grows by more than `threshold` (fraction) or its mean queries grow by more
+    than `query_threshold`; overall throughput regresses when it drops by
+    more than `threshold`. Returns human-readable regression messages.
+    """
+    regressions = []
+    if baseline.get('throughput') and report['throughput'] < baseline['throughput'] * (1 - threshold):
+        regressions.append(
+            f"throughput {report['throughput']:.1f} req/s < baseline {baseline['throughput']:.1f} req/s"
+        )
+    for step, base in baseline.get('steps', {}).items():
+        current = report['steps'].get(step)
+        if current is None:
+            continue
+        if base.get('p95') and current['p95'] > base['p95'] * (1 + threshold):
+            regressions.append(f"{step}: p95 {current['p95']:.1f} ms > baseline {base['p95']:.1f} ms")
+        if base.get('queries') is not None and current['queries'] is not None \
+                and current['queries'] > base['queries'] + query_threshold:
+            regressions.append(f"{step}: {current['queries']:.1f} queries > baseline {base['queries']:.1f}")
+    return regressions
+
+
+def save_report(report, filename):
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load_report(filename):
+    with open(filename, 'r', encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,60 @@
+"""
+DATABASES entries from the environment.
+
+DATABASE_URL picks the database (SQLite file when unset); DATABASE_REPLICA_URL
+is built the same way (see coursereviews/routers.py). For PostgreSQL,
+DB_POOL chooses how connections are reused per worker process:
+
+  persistent  (default) each thread keeps its connection for DB_CONN_MAX_AGE seconds
+  psycopg     Django's built-in psycopg 3 pool, DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE
+              connections per process, waiting up to DB_POOL_TIMEOUT for a free one
+  pgbouncer   connections are closed after every request and pgbouncer (transaction
+              pooling) does the reuse; server-side cursors are disabled for it
+
+Connections are health-checked before reuse (DB_CONN_HEALTH_CHECKS, on by
+default), so a restarted or idle-timed-out Postgres does not hand workers a
+dead connection. Size the pool so gunicorn workers x DB_POOL_MAX_SIZE stays
+below Postgres' max_connections.
+"""
+
+import os
+
+import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+
+POOL_MODES = ('persistent', 'psycopg', 'pgbouncer')
+
+
+def _flag(env, name, default):
+    return env.get(name, '1' if default else '0').strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def database_config(default_url, env=None, url_var='DATABASE_URL'):
+    env = os.environ if env is None else env
+    mode = env.get('DB_POOL', 'persistent').strip().lower() or 'persistent'
+    if mode not in POOL_MODES:
+        raise ImproperlyConfigured(f"DB_POOL must be one of {', '.join(POOL_MODES)} (got {mode!r})")
+
+    config = dj_database_url.parse(
+        env.get(url_var) or default_url,
+        conn_max_age=int(env.get('DB_CONN_MAX_AGE', 600)),
+        conn_health_checks=_flag(env, 'DB_CONN_HEALTH_CHECKS', True),
+    )
+    if 'postgresql' not in config['ENGINE']:
+        return config
+
+    options = config.setdefault('OPTIONS', {})
+    options.setdefault('connect_timeout', int(env.get('DB_CONNECT_TIMEOUT', 5)))
+    if mode == 'psycopg':
+        # Pooled connections are returned after every request; persistent ones must be off
+        config['CONN_MAX_AGE'] = 0
+        options['pool'] = {
+            'min_size': int(env.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(env.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': float(env.get('DB_POOL_TIMEOUT', 10)),
+            'max_idle': float(env.get('DB_POOL_MAX_IDLE', 300)),
+        }
+    elif mode == 'pgbouncer':
+        config['CONN_MAX_AGE'] = 0
+        config['DISABLE_SERVER_SIDE_CURSORS'] = True
+    return config
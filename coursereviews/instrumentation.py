@@ -0,0 +1,273 @@
+"""
+Opt-in per-request instrumentation.
+
+RequestMetricsMiddleware records, per URL name: SQL query count, time spent in
+the database, template rendering time, the remaining Python time and response
+size. Aggregates are kept in memory per worker process (shown on the staff page
+at /owner/metrics/) and each request can also be appended as a JSON line to a
+rotating log for offline analysis (`manage.py request_metrics_report`).
+
+Enable with REQUEST_METRICS_ENABLED = True. When disabled the middleware raises
+MiddlewareNotUsed, so Django drops it and no hooks are installed.
+"""
+
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from logging.handlers import RotatingFileHandler
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+# Upper bounds of the histogram buckets (the last bucket is open-ended)
+DURATION_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500]
+QUERY_BUCKETS = [0, 1, 2, 5, 10, 20, 50, 100]
+
+LOG_NAME = 'coursereviews.request_metrics'
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestTimer:
+    """Collects what one request spends in SQL and templates."""
+
+    __slots__ = ('queries', 'db_time', 'template_time', 'template_depth')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+
+
+def _record_query(execute, sql, params, many, context):
+    timer = _current.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timer.queries += 1
+        timer.db_time += time.perf_counter() - start
+
+
+def _install_query_hook(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _install_template_hook():
+    from django.template.backends.django import Template
+
+    if getattr(Template.render, '_request_metrics', False):
+        return
+    original = Template.render
+
+    def render(self, context=None, request=None):
+        timer = _current.get()
+        if timer is None:
+            return original(self, context, request)
+        timer.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return original(self, context, request)
+        finally:
+            timer.template_depth -= 1
+            if timer.template_depth == 0:
+                timer.template_time += time.perf_counter() - start
+
+    render._request_metrics = True
+    Template.render = render
+
+
+def _histogram_index(buckets, value):
+    return bisect_left(buckets, value)
+
+
+def histogram_percentile(buckets, counts, p):
+    """Upper bound of the bucket holding the p-th percentile (None for the open-ended bucket)."""
+    total = sum(counts)
+    if not total:
+        return 0
+    target = p / 100 * total
+    seen = 0
+    for i, count in enumerate(counts):
+        seen += count
+        if seen >= target:
+            return buckets[i] if i < len(buckets) else None
+    return None
+
+
+class ViewMetrics:
+    """Running totals and histograms for one URL name."""
+
+    def __init__(self, name):
+        self.name = name
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.queries = 0
+        self.max_queries = 0
+        self.bytes = 0
+        self.duration_counts = [0] * (len(DURATION_BUCKETS_MS) + 1)
+        self.query_counts = [0] * (len(QUERY_BUCKETS) + 1)
+
+    def add(self, record):
+        self.count += 1
+        self.errors += record['status'] >= 500
+        self.total_ms += record['total_ms']
+        self.max_ms = max(self.max_ms, record['total_ms'])
+        self.db_ms += record['db_ms']
+        self.template_ms += record['template_ms']
+        self.queries += record['queries']
+        self.max_queries = max(self.max_queries, record['queries'])
+        self.bytes += record['bytes'] or 0
+        self.duration_counts[_histogram_index(DURATION_BUCKETS_MS, record['total_ms'])] += 1
+        self.query_counts[_histogram_index(QUERY_BUCKETS, record['queries'])] += 1
+
+    def summary(self):
+        n = self.count or 1
+        return {
+            'name': self.name,
+            'count': self.count,
+            'errors': self.errors,
+            'avg_ms': self.total_ms / n,
+            'max_ms': self.max_ms,
+            'p50_ms': histogram_percentile(DURATION_BUCKETS_MS, self.duration_counts, 50),
+            'p95_ms': histogram_percentile(DURATION_BUCKETS_MS, self.duration_counts, 95),
+            'avg_db_ms': self.db_ms / n,
+            'avg_template_ms': self.template_ms / n,
+            'avg_python_ms': max(0.0, (self.total_ms - self.db_ms - self.template_ms) / n),
+            'avg_queries': self.queries / n,
+            'max_queries': self.max_queries,
+            'avg_kb': self.bytes / n / 1024,
+            'duration_histogram': list(zip(DURATION_BUCKETS_MS + [None], self.duration_counts)),
+            'query_histogram': list(zip(QUERY_BUCKETS + [None], self.query_counts)),
+        }
+
+
+class MetricsStore:
+    """Thread-safe aggregation of request records by URL name."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+        self.started = time.time()
+
+    def add(self, record):
+        with self._lock:
+            view = self._views.get(record['view'])
+            if view is None:
+                view = self._views[record['view']] = ViewMetrics(record['view'])
+            view.add(record)
+
+    def summaries(self):
+        with self._lock:
+            rows = [view.summary() for view in self._views.values()]
+        return sorted(rows, key=lambda row: row['count'] * row['avg_ms'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+            self.started = time.time()
+
+
+# Aggregates for this worker process
+metrics = MetricsStore()
+
+
+def _build_log():
+    filename = getattr(settings, 'REQUEST_METRICS_LOG', None)
+    if not filename:
+        return None
+    logger = logging.getLogger(LOG_NAME)
+    if not logger.handlers:
+        handler = RotatingFileHandler(
+            filename,
+            maxBytes=getattr(settings, 'REQUEST_METRICS_LOG_MAX_BYTES', 10 * 1024 * 1024),
+            backupCount=getattr(settings, 'REQUEST_METRICS_LOG_BACKUPS', 5),
+            encoding='utf-8',
+        )
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+class RequestMetricsMiddleware:
+    """Times every request and records it in `metrics` (and the rolling log, if configured)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', False):
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.log = _build_log()
+        self.headers = getattr(settings, 'REQUEST_METRICS_HEADERS', False)
+        connection_created.connect(_install_query_hook, dispatch_uid='request_metrics_queries')
+        for connection in connections.all(initialized_only=True):
+            _install_query_hook(connection)
+        _install_template_hook()
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = RequestTimer()
+        token = _current.set(timer)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, timer, time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        timer = RequestTimer()
+        token = _current.set(timer)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, timer, time.perf_counter() - start)
+        return response
+
+    def record(self, request, response, timer, elapsed):
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'ts': round(time.time(), 3),
+            'view': (match.view_name if match else None) or '<unresolved>',
+            'method': request.method,
+            'status': response.status_code,
+            'total_ms': round(elapsed * 1000, 3),
+            'db_ms': round(timer.db_time * 1000, 3),
+            'template_ms': round(timer.template_time * 1000, 3),
+            'queries': timer.queries,
+            'bytes': None if response.streaming else len(response.content),
+        }
+        metrics.add(record)
+        if self.log is not None:
+            self.log.info(json.dumps(record, separators=(',', ':')))
+        if self.headers:
+            response['X-Query-Count'] = str(timer.queries)
+            response['Server-Timing'] = (
+                f"db;dur={record['db_ms']}, tpl;dur={record['template_ms']}, total;dur={record['total_ms']}"
+            )
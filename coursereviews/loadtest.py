@@ -0,0 +1,173 @@
+"""
+Small asyncio HTTP load generator used by the load-test commands.
+
+It speaks plain HTTP/1.1 over asyncio streams (no third-party client), keeps
+connections alive when the server allows it, and reports throughput and
+latency percentiles. `slow_clients` opens connections that trickle their
+request headers, the way stalled mobile clients do, to show how many workers
+they tie up.
+"""
+
+import asyncio
+import math
+import time
+from urllib.parse import urlsplit
+
+
+def percentile(values, p):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Throughput and p50/p95/p99 (milliseconds) for a list of latencies in seconds."""
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'elapsed': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 50) * 1000,
+        'p95': percentile(latencies, 95) * 1000,
+        'p99': percentile(latencies, 99) * 1000,
+    }
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection; reconnects when the server closes it."""
+
+    def __init__(self, host, port, timeout=30):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+        self.reader = self.writer = None
+
+    async def request(self, method, path, headers=None, body=b''):
+        """Returns (status, headers dict, body bytes)."""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}", "Connection: keep-alive"]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        if body:
+            lines.append(f"Content-Length: {len(body)}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+        await self.writer.drain()
+
+        return await asyncio.wait_for(self._read_response(), self.timeout)
+
+    async def _read_response(self):
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Server closed the connection")
+        status = int(status_line.split()[1])
+
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers.setdefault(name.strip().lower(), []).append(value.strip())
+        headers = {name: ', '.join(values) for name, values in response_headers.items()}
+        headers['set-cookie'] = response_headers.get('set-cookie', [])
+
+        if 'content-length' in headers:
+            body = await self.reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = b''
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                chunk = await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                body += chunk[:-2]
+        else:
+            body = await self.reader.read()
+            await self.close()
+
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, headers, body
+
+
+async def _hold_slow_client(host, port, stop):
+    """Sends a request one header line every second until told to stop."""
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError:
+        return
+    try:
+        writer.write(f"GET / HTTP/1.1\r\nHost: {host}\r\n".encode('latin-1'))
+        while not stop.is_set():
+            await asyncio.sleep(1)
+            writer.write(b"X-Slow: 1\r\n")
+            await writer.drain()
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        writer.close()
+
+
+async def run_load(base_url, paths, concurrency=20, total_requests=1000, slow_clients=0, timeout=30):
+    """
+    Fetches `paths` round-robin from base_url with `concurrency` parallel
+    keep-alive clients until total_requests have been sent.
+    Returns summarize() stats plus per-path stats under 'paths'.
+    """
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+
+    stop = asyncio.Event()
+    holders = [asyncio.create_task(_hold_slow_client(host, port, stop)) for _ in range(slow_clients)]
+    if holders:
+        await asyncio.sleep(0.5)
+
+    counter = iter(range(total_requests))
+    latencies = {path: [] for path in paths}
+    errors = 0
+
+    async def client():
+        nonlocal errors
+        connection = Connection(host, port, timeout=timeout)
+        try:
+            for i in counter:
+                path = paths[i % len(paths)]
+                start = time.perf_counter()
+                try:
+                    status, _, _ = await connection.request('GET', path)
+                except (OSError, ConnectionError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError):
+                    errors += 1
+                    await connection.close()
+                    continue
+                if status >= 400:
+                    errors += 1
+                else:
+                    latencies[path].append(time.perf_counter() - start)
+        finally:
+            await connection.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await asyncio.gather(*holders)
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    stats = summarize(all_latencies, elapsed, errors)
+    stats['paths'] = {path: summarize(values, elapsed) for path, values in latencies.items()}
+    return stats
@@ -0,0 +1,72 @@
+"""
+Content-addressed media storage.
+
+Uploaded files are stored as <upload dir>/<2 hex>/<sha256><ext>, so identical
+bytes share one file and a name never changes meaning. That makes every media
+URL safe to cache forever; orphans left behind are removed by `manage.py gc_media`.
+"""
+
+import hashlib
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.core.files.utils import validate_file_name
+from django.views.static import serve
+
+CONTENT_ADDRESSED_RE = re.compile(r'(^|/)([0-9a-f]{2})/\2[0-9a-f]{62}(\.[a-z0-9]+)?$')
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def is_content_addressed(name):
+    return bool(CONTENT_ADDRESSED_RE.search(name))
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """FileSystemStorage that names files by the SHA-256 of their bytes and never writes a file twice."""
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+        content.seek(0)
+
+        directory, filename = posixpath.split(name.replace('\\', '/'))
+        ext = os.path.splitext(filename)[1].lower()
+        digest = digest.hexdigest()
+        return posixpath.join(directory, digest[:2], digest + ext)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+
+        validate_file_name(name, allow_relative_path=True)
+        name = self.hashed_name(name, content)
+        try:
+            # Reused: refresh the mtime, so gc_media's grace period covers this upload
+            # until the row pointing at it is committed
+            os.utime(self.path(name))
+            return name
+        except FileNotFoundError:
+            pass
+
+        saved = self._save(name, content)
+        if saved != name:
+            # Another writer stored the same bytes first; keep theirs
+            self.delete(saved)
+        return name
+
+
+def serve_media(request, path):
+    """django.views.static.serve for MEDIA_ROOT, with far-future caching for content-addressed files."""
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if is_content_addressed(path):
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    return response
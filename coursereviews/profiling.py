@@ -0,0 +1,223 @@
+"""
+Sampling profiler for production requests.
+
+SamplingProfilerMiddleware profiles a fraction of requests to the views in
+PROFILE_VIEWS (PROFILE_SAMPLE_RATE), or any request from a staff user that
+sends an `X-Profile: 1` header. While a request is profiled a background
+thread snapshots the stack of the thread running the view every
+PROFILE_INTERVAL_MS; other threads running the same view for concurrent
+requests are left to their own samplers. Stacks are aggregated per view into flamegraph-compatible
+collapsed-stack files ("frame;frame;frame count") under PROFILE_DIR, one file
+per view, process and rotation period; the oldest files beyond
+PROFILE_MAX_FILES are deleted.
+
+Render with flamegraph.pl, speedscope or `manage.py profile_report`.
+"""
+
+import functools
+import glob
+import inspect
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+FILE_SUFFIX = '.collapsed'
+
+
+@functools.lru_cache(maxsize=4096)
+def frame_label(code):
+    filename = code.co_filename
+    for root in sys.path:
+        if root and filename.startswith(root + os.sep):
+            filename = filename[len(root) + 1:]
+            break
+    return f"{code.co_qualname} ({filename})".replace(';', ':').replace(' ', '_')
+
+
+class StackSampler(threading.Thread):
+    """
+    Samples the stack of thread `thread` (by threading.get_ident()) below
+    `code` until stopped; with thread=None, of any thread whose frames contain
+    `code`.
+    """
+
+    def __init__(self, code, interval, thread=None):
+        super().__init__(daemon=True, name='profile-sampler')
+        self.code = code
+        self.interval = interval
+        self.thread = thread
+        self.stacks = Counter()
+        self.samples = 0
+        self._done = threading.Event()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._done.wait(self.interval):
+            frames = sys._current_frames()
+            if self.thread is not None:
+                frames = {self.thread: frames[self.thread]} if self.thread in frames else {}
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                stack = self.sample(frame)
+                if stack:
+                    self.stacks[stack] += 1
+                    self.samples += 1
+
+    def sample(self, frame):
+        """Collapsed stack from the view frame down to the leaf, or None if the view is not running here."""
+        labels = []
+        while frame is not None:
+            labels.append(frame.f_code)
+            if frame.f_code is self.code:
+                return ';'.join(frame_label(code) for code in reversed(labels))
+            frame = frame.f_back
+        return None
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        return self.stacks
+
+
+class ProfileSink:
+    """Per-view stack counts for the current period, flushed to PROFILE_DIR."""
+
+    def __init__(self, directory, rotate_seconds, max_files):
+        self.directory = directory
+        self.rotate_seconds = rotate_seconds
+        self.max_files = max_files
+        self._lock = threading.Lock()
+        self._period = None
+        self._stacks = {}
+
+    def path_for(self, view, period):
+        name = view.replace(':', '-').replace(os.sep, '-')
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.gmtime(period * self.rotate_seconds))
+        return os.path.join(self.directory, f"{name}.{stamp}.{os.getpid()}{FILE_SUFFIX}")
+
+    def add(self, view, stacks):
+        period = int(time.time() // self.rotate_seconds)
+        with self._lock:
+            if period != self._period:
+                self._period = period
+                self._stacks = {}
+                rotated = True
+            else:
+                rotated = False
+            counts = self._stacks.setdefault(view, Counter())
+            counts.update(stacks)
+
+            # The counter holds the whole period, so the file is rewritten (atomically) rather than appended
+            os.makedirs(self.directory, exist_ok=True)
+            path = self.path_for(view, period)
+            tmp = f"{path}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                for stack, count in counts.most_common():
+                    f.write(f"{stack} {count}\n")
+            os.replace(tmp, path)
+            if rotated:
+                self.prune()
+        return path
+
+    def prune(self):
+        files = sorted(glob.glob(os.path.join(self.directory, f"*{FILE_SUFFIX}")), key=os.path.getmtime)
+        for path in files[:max(0, len(files) - self.max_files)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def read_collapsed(paths):
+    """Merges collapsed-stack files into one Counter."""
+    stacks = Counter()
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                if stack and count.isdigit():
+                    stacks[stack] += int(count)
+    return stacks
+
+
+class SamplingProfilerMiddleware:
+    """Profiles sampled requests to PROFILE_VIEWS, or staff requests with `X-Profile: 1`."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.rate = getattr(settings, 'PROFILE_SAMPLE_RATE', 0.0)
+        self.on_header = getattr(settings, 'PROFILE_ON_HEADER', False)
+        if self.rate <= 0 and not self.on_header:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        self.views = set(getattr(settings, 'PROFILE_VIEWS', ()))
+        self.interval = getattr(settings, 'PROFILE_INTERVAL_MS', 5) / 1000
+        self.sink = ProfileSink(
+            settings.PROFILE_DIR,
+            getattr(settings, 'PROFILE_ROTATE_SECONDS', 3600),
+            getattr(settings, 'PROFILE_MAX_FILES', 48),
+        )
+
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.finish(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        # Async views run on this (the event loop's) thread; process_view may not
+        request._profile_loop_thread = threading.get_ident()
+        return self.finish(request, await self.get_response(request))
+
+    def finish(self, request, response):
+        sampler = getattr(request, '_profile_sampler', None)
+        if sampler is not None:
+            stacks = sampler.stop()
+            if stacks:
+                self.sink.add(request.resolver_match.view_name, stacks)
+            response['X-Profile-Samples'] = str(sampler.samples)
+        return response
+
+    def should_profile(self, request):
+        if self.on_header and request.META.get(PROFILE_HEADER) == '1':
+            user = getattr(request, 'user', None)
+            if user is not None and user.is_staff:
+                return True
+        return (
+            self.rate > 0
+            and request.resolver_match.view_name in self.views
+            and random.random() < self.rate
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.should_profile(request):
+            return None
+        # The view function's own code object marks where its stacks start (works for
+        # sync views and for async views running on an event-loop thread)
+        code = getattr(inspect.unwrap(view_func), '__code__', None)
+        if code is None:
+            return None
+        # Only the thread that runs this request's view, so concurrent requests to the
+        # same view are not counted here too. Sync views run on the thread calling
+        # process_view (both are thread-sensitive under ASGI).
+        if iscoroutinefunction(view_func):
+            thread = getattr(request, '_profile_loop_thread', None)
+        else:
+            thread = threading.get_ident()
+        request._profile_sampler = StackSampler(code, self.interval, thread)
+        request._profile_sampler.start()
+        return None
@@ -0,0 +1,148 @@
+"""
+Read-replica routing.
+
+When DATABASE_REPLICA_URL is set, settings add a 'replica' database. Reads
+only go there inside `use_replica` views (home, blog, sitemap) or a
+`replica_reads()` block (the catalog part of results); everything else,
+all writes, and the auth/session tables stay on 'default'.
+
+Read-your-writes: ReplicaPinMiddleware notes any INSERT/UPDATE/DELETE made on
+the primary while handling a request and sets a short-lived cookie; while it is
+present (REPLICA_STICKY_SECONDS) that browser's reads stay on the primary, so a
+student never sees a favourite, review or payment "disappear" because the
+replica is a few seconds behind.
+"""
+
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+
+REPLICA_ALIAS = 'replica'
+PIN_COOKIE = 'primary_pin'
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLAC')
+
+# Tables whose reads must always see the latest write (logins, sessions)
+PRIMARY_ONLY_APPS = {'auth', 'sessions', 'contenttypes', 'admin'}
+
+
+class RoutingState:
+    """What the current request is allowed to read from the replica."""
+
+    __slots__ = ('pinned', 'wrote')
+
+    def __init__(self, pinned=False):
+        self.pinned = pinned
+        self.wrote = False
+
+
+_state = ContextVar('db_routing_state', default=None)
+_replica = ContextVar('db_use_replica', default=False)
+
+
+def replica_configured():
+    return REPLICA_ALIAS in connections.settings
+
+
+@contextmanager
+def replica_reads():
+    """Reads inside the block may come from the replica (unless the request is pinned)."""
+    token = _replica.set(True)
+    try:
+        yield
+    finally:
+        _replica.reset(token)
+
+
+def _note_write(execute, sql, params, many, context):
+    state = _state.get()
+    if state is not None and not state.wrote and sql.lstrip()[:6].upper() in WRITE_STATEMENTS:
+        state.wrote = True
+    return execute(sql, params, many, context)
+
+
+def _install_write_hook(connection, **kwargs):
+    # Only real INSERT/UPDATE/DELETE statements pin; get_or_create() that finds its row does not
+    if connection.alias == DEFAULT_DB_ALIAS and _note_write not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_note_write)
+
+
+def use_replica(view):
+    """View decorator: the whole view may read from the replica. Works for sync and async views."""
+    if iscoroutinefunction(view):
+        @functools.wraps(view)
+        async def wrapper(*args, **kwargs):
+            with replica_reads():
+                return await view(*args, **kwargs)
+    else:
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            with replica_reads():
+                return view(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+
+    def db_for_read(self, model, **hints):
+        if not _replica.get() or model._meta.app_label in PRIMARY_ONLY_APPS or not replica_configured():
+            return None
+        state = _state.get()
+        if state is not None and (state.pinned or state.wrote):
+            return None
+        return REPLICA_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        return True
+
+
+class ReplicaPinMiddleware:
+    """Keeps a browser on the primary for REPLICA_STICKY_SECONDS after it wrote something."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replica_configured():
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.sticky_seconds = getattr(settings, 'REPLICA_STICKY_SECONDS', 15)
+        connection_created.connect(_install_write_hook, dispatch_uid='replica_pin_writes')
+        for connection in connections.all(initialized_only=True):
+            _install_write_hook(connection)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        state = RoutingState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(state, response)
+
+    async def __acall__(self, request):
+        state = RoutingState(pinned=PIN_COOKIE in request.COOKIES)
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        return self.pin(state, response)
+
+    def pin(self, state, response):
+        if state.wrote:
+            response.set_cookie(PIN_COOKIE, '1', max_age=self.sticky_seconds, httponly=True, samesite='Lax')
+        return response
@@ -46,11 +46,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'coursereviews.instrumentation.RequestMetricsMiddleware',
+    'coursereviews.routers.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'coursereviews.profiling.SamplingProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -122,26 +124,35 @@ USE_TZ = True
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
-import dj_database_url
+from coursereviews.database import database_config
 import os
 
 # --- STATIC FILES (WhiteNoise) ---
+# Served in front of Django by wsgi.py/asgi.py, not by middleware: WhiteNoiseMiddleware
+# is sync-only and would make every async view hop threads (coursereviews/static_files.py)
 STATIC_URL = '/static/'
 # This is where files go when you run collectstatic
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
-# This compresses files to make your site faster
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 # --- DATABASE CONFIGURATION ---
-# This automatically switches between SQLite (Local) and PostgreSQL (Render)
+# This automatically switches between SQLite (Local) and PostgreSQL (Render).
+# Connections are health-checked before reuse; DB_POOL=psycopg|pgbouncer and
+# DB_POOL_MAX_SIZE etc. control pooling (see coursereviews/database.py)
 DATABASES = {
-    'default': dj_database_url.config(
+    'default': database_config(
         # Fallback to SQLite if we are on your laptop
-        default='sqlite:///' + os.path.join(BASE_DIR, 'db.sqlite3'),
-        conn_max_age=600
+        default_url='sqlite:///' + os.path.join(BASE_DIR, 'db.sqlite3'),
     )
 }
 
+# Optional read replica for the public read views (see coursereviews/routers.py)
+if os.environ.get('DATABASE_REPLICA_URL'):
+    DATABASES['replica'] = database_config(None, url_var='DATABASE_REPLICA_URL')
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+DATABASE_ROUTERS = ['coursereviews.routers.ReplicaRouter']
+# After a browser writes anything, its reads stay on the primary this long
+REPLICA_STICKY_SECONDS = 15
+
 # --- SECURITY ---
 # Allow the website to run on Render's URL
 ALLOWED_HOSTS = ['*']  # For testing. Ideally, put your Render URL here later.
@@ -154,6 +165,34 @@ MEDIA_URL = '/media/'
 # The folder on your computer where files are saved
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# --- FILE STORAGE ---
+# Media is stored by content hash (coursereviews/media.py): identical uploads share one file
+# and URLs are immutable, so they are served with far-future cache headers.
+# Clean up orphaned files with: python manage.py gc_media
+STORAGES = {
+    'default': {
+        'BACKEND': 'coursereviews.media.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# --- CATALOG SNAPSHOT ---
+# Binary copy of the course catalog that workers memory-map for read-only lookups.
+# Rebuild with: python manage.py build_catalog_snapshot
+CATALOG_SNAPSHOT_PATH = os.path.join(BASE_DIR, 'catalog.snapshot')
+
+# --- COHORT ADMISSION MODEL ---
+# Percentile tables and competition ratios behind the results page's probabilities.
+# Rebuild nightly with: python manage.py build_cohort_model
+COHORT_MODEL_PATH = os.path.join(BASE_DIR, 'cohort_model.json')
+
+# --- "ALSO SAVED" RECOMMENDATIONS ---
+# Co-occurrence counts kept between runs so refreshes only recount changed students.
+# Refresh with: python manage.py refresh_recommendations
+RECOMMENDER_STATE_PATH = os.path.join(BASE_DIR, 'recommender.state')
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -170,4 +209,25 @@ MPESA_CONSUMER_SECRET = 'VS8Yy0pVoTlqK7AeGE3kW22ThH9gadGAa4NuoICvClwAa8eHS3reOvd
 MPESA_PASSKEY = 'bfb279f9aa9bdbcf158e97dd71a467cd2e0c893059b10f78e6b72ada1ed2c919' # Standard Sandbox Passkey
 MPESA_SHORTCODE = '174379' # Standard Sandbox Shortcode
 MPESA_EXPRESS_SHORTCODE = '174379'
-MPESA_TYPE = 'CustomerPayBillOnline'
\ No newline at end of file
+MPESA_TYPE = 'CustomerPayBillOnline'
+
+# --- REQUEST METRICS ---
+# Per-view query counts and DB/template/Python timings, shown at /owner/metrics/.
+# Off by default; when off the middleware removes itself and costs nothing.
+REQUEST_METRICS_ENABLED = os.environ.get('REQUEST_METRICS', '') == '1'
+# Optional JSON-lines log (rotated) for offline analysis: python manage.py request_metrics_report
+REQUEST_METRICS_LOG = os.environ.get('REQUEST_METRICS_LOG') or None
+# Adds X-Query-Count and Server-Timing response headers (read by run_benchmarks --url)
+REQUEST_METRICS_HEADERS = DEBUG
+
+# --- SAMPLING PROFILER ---
+# Stack samples for a fraction of requests to the views below, written as
+# flamegraph-compatible collapsed stacks to PROFILE_DIR: python manage.py profile_report
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0') or 0)
+PROFILE_VIEWS = ['students:results', 'students:enter_grades', 'blog_list']
+# Staff can also profile any request by sending the header "X-Profile: 1"
+PROFILE_ON_HEADER = os.environ.get('PROFILE_ON_HEADER', '') == '1'
+PROFILE_DIR = os.environ.get('PROFILE_DIR') or os.path.join(BASE_DIR, 'profiles')
+PROFILE_INTERVAL_MS = 5
+PROFILE_ROTATE_SECONDS = 3600  # one file per view, process and hour
+PROFILE_MAX_FILES = 48
@@ -0,0 +1,85 @@
+"""
+Static files served in front of Django rather than from MIDDLEWARE.
+
+WhiteNoiseMiddleware is sync-only. Under ASGI one sync middleware makes Django
+adapt the whole chain, so every async view paid a sync_to_async thread hop
+just to let WhiteNoise look at the path. Static requests are now answered
+before Django sees them:
+
+- WSGI (wsgi.py): the WhiteNoise WSGI app wraps Django.
+- ASGI (asgi.py): AsyncStaticFiles below, which reuses WhiteNoise's index of
+  STATIC_ROOT (compressed variants, ETag/304, Range, cache headers) but
+  answers on the event loop. Only reads of the file body go to a thread.
+
+Both serve what `collectstatic` put in STATIC_ROOT (build.sh runs it). Before
+the first collectstatic, and only with DEBUG on, Django's own static handlers
+serve from the app directories instead, as runserver does. A CDN or nginx in
+front of /static/ takes these requests off the app servers entirely; the
+wrappers then only see cache misses.
+"""
+
+import asyncio
+import os
+
+from whitenoise import WhiteNoise
+
+CHUNK_SIZE = 64 * 1024
+
+
+def static_wsgi_application(application, settings):
+    """Django's WSGI app with STATIC_URL answered first."""
+    if os.path.isdir(settings.STATIC_ROOT):
+        return WhiteNoise(application, root=settings.STATIC_ROOT, prefix=settings.STATIC_URL)
+    if settings.DEBUG:
+        from django.contrib.staticfiles.handlers import StaticFilesHandler
+        return StaticFilesHandler(application)
+    return application
+
+
+def static_asgi_application(application, settings):
+    """Django's ASGI app with STATIC_URL answered first, without leaving the event loop."""
+    if os.path.isdir(settings.STATIC_ROOT):
+        return AsyncStaticFiles(application, root=settings.STATIC_ROOT, prefix=settings.STATIC_URL)
+    if settings.DEBUG:
+        from django.contrib.staticfiles.handlers import ASGIStaticFilesHandler
+        return ASGIStaticFilesHandler(application)
+    return application
+
+
+class AsyncStaticFiles:
+    """ASGI app serving the files under `root` at `prefix`; everything else goes to `application`."""
+
+    def __init__(self, application, root, prefix):
+        self.application = application
+        self.files = WhiteNoise(None, root=root, prefix=prefix).files
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            static_file = self.files.get(scope['path'])
+            if static_file is not None:
+                return await self.serve(static_file, scope, send)
+        return await self.application(scope, receive, send)
+
+    @staticmethod
+    async def serve(static_file, scope, send):
+        # WhiteNoise reads request headers in WSGI environ form
+        environ = {
+            'HTTP_' + name.decode('latin-1').upper().replace('-', '_'): value.decode('latin-1')
+            for name, value in scope['headers']
+        }
+        response = static_file.get_response(scope['method'], environ)
+        await send({
+            'type': 'http.response.start',
+            'status': int(response.status),
+            'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in response.headers],
+        })
+        if response.file is None:
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        with response.file:
+            while True:
+                chunk = await asyncio.to_thread(response.file.read, CHUNK_SIZE)
+                more_body = len(chunk) == CHUNK_SIZE
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
+                if not more_body:
+                    break
@@ -0,0 +1,41 @@
+"""
+Query-count assertions shared by the apps' tests.
+
+assertQueryBudget fails when a page needs more SQL queries than its budget;
+assertConstantQueries fails when adding rows adds queries (an N+1, e.g. a
+template reading `post.author` or `review.user` without select_related).
+Both run in-process against the test database. Streamed responses are read
+to the end inside the count, so queries made while streaming are included.
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+
+    def count_queries(self, url, client=None, method='get', data=None, status=200):
+        client = client or self.client
+        with CaptureQueriesContext(connection) as queries:
+            response = getattr(client, method)(url, data or {})
+            if response.streaming:
+                b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, status, url)
+        return len(queries), queries
+
+    def assertQueryBudget(self, url, budget, **kwargs):
+        count, queries = self.count_queries(url, **kwargs)
+        if count > budget:
+            sql = '\n'.join(f"  {q['sql']}" for q in queries.captured_queries)
+            self.fail(f"{url} ran {count} queries (budget {budget}):\n{sql}")
+        return count
+
+    def assertConstantQueries(self, url, grow, **kwargs):
+        """Runs the request, calls grow() to add rows, and checks the query count did not change."""
+        before, _ = self.count_queries(url, **kwargs)
+        grow()
+        after, queries = self.count_queries(url, **kwargs)
+        if after != before:
+            sql = '\n'.join(f"  {q['sql']}" for q in queries.captured_queries)
+            self.fail(f"{url} went from {before} to {after} queries as data grew (N+1?):\n{sql}")
+        return after
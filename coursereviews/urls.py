@@ -1,19 +1,11 @@
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path, include
 from django.conf import settings
-from django.conf.urls.static import static
+from coursereviews.media import serve_media
 
 # --- SEO IMPORTS ---
 # These are needed for the sitemap and robots.txt features
-from django.contrib.sitemaps.views import sitemap
-from courses.sitemaps import StaticViewSitemap, BlogSitemap
-from courses.views import robots_txt
-
-# Define which sitemaps to include
-sitemaps = {
-    'static': StaticViewSitemap,
-    'blog': BlogSitemap,
-}
+from courses.views import robots_txt, sitemap_xml
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -27,7 +19,7 @@ urlpatterns = [
     
     # --- SEO URLS ---
     # 1. Sitemap Index (XML file for Google)
-    path('sitemap.xml', sitemap, {'sitemaps': sitemaps}, name='django.contrib.sitemaps.views.sitemap'),
+    path('sitemap.xml', sitemap_xml, name='django.contrib.sitemaps.views.sitemap'),
     
     # 2. Robots.txt (Text file for crawlers)
     path('robots.txt', robots_txt, name='robots_txt'),
@@ -37,5 +29,8 @@ urlpatterns = [
 ]
 
 # --- Serve Media Files (Images) During Development ---
+# Content-addressed files are sent with Cache-Control: immutable
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
+    urlpatterns += [
+        re_path(r'^%s(?P<path>.*)$' % settings.MEDIA_URL.lstrip('/'), serve_media),
+    ]
\ No newline at end of file
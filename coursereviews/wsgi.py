@@ -1,6 +1,10 @@
 import os
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
+from coursereviews.static_files import static_wsgi_application
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'coursereviews.settings')
 
-application = get_wsgi_application()
\ No newline at end of file
+# Static files are answered before Django (see coursereviews/static_files.py)
+application = static_wsgi_application(get_wsgi_application(), settings)
\ No newline at end of file
@@ -1,16 +1,17 @@
 from django.contrib import admin
+from .fuzzy import fuzzy_matches
 from .models import Course, CourseReview # Removed University
 
 # --- COURSE MANAGEMENT ---
 @admin.register(Course)
 class CourseAdmin(admin.ModelAdmin):
     # Shows these columns in the admin list
-    list_display = ('name', 'level', 'path', 'min_mean_grade', 'min_cluster_points')
+    list_display = ('name', 'level', 'path', 'min_mean_grade', 'min_cluster_points', 'favorite_count')
     
     # Adds filter options on the side
     list_filter = ('level', 'path', 'min_mean_grade')
     
-    # Adds a search bar
+    # Adds a search bar (plus misspelt names, see get_search_results)
     search_fields = ('name', 'description')
     
     # Organizes the edit form layout
@@ -20,13 +21,22 @@ class CourseAdmin(admin.ModelAdmin):
             'fields': ('name', 'level', 'path', 'description') 
         }),
         ('Requirements', {
-            'fields': ('min_mean_grade', 'min_cluster_points', 'subject_requirements')
+            'fields': ('min_mean_grade', 'min_cluster_points', 'capacity', 'subject_requirements')
         }),
         ('Career Path', {
             'fields': ('career_path_info',)
         }),
     )
 
+    def get_search_results(self, request, queryset, search_term):
+        # Also list courses whose name is a near miss ("pharmarcy"), within the active filters
+        fuzzy = queryset
+        queryset, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        if search_term:
+            ids = [course_id for course_id, _ in fuzzy_matches(search_term)]
+            queryset |= fuzzy.filter(id__in=ids)
+        return queryset, may_have_duplicates
+
 # --- REVIEW MANAGEMENT (View Feedback) ---
 @admin.register(CourseReview)
 class CourseReviewAdmin(admin.ModelAdmin):
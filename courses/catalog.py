@@ -0,0 +1,152 @@
+import hashlib
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.db import transaction
+
+from courses.generation import GRADE_RANKS, canonical_path
+from courses.models import Course
+from courses.snapshot import CatalogSnapshot, SnapshotWriter
+
+logger = logging.getLogger(__name__)
+
+# Fields copied from the generator's JSON into Course, in a fixed order so the
+# row hash is stable.
+COURSE_FIELDS = (
+    'name', 'level', 'path', 'min_mean_grade', 'min_cluster_points',
+    'subject_requirements', 'description', 'career_path_info',
+)
+
+def program_to_course_fields(program):
+    """Maps one generator program dict onto Course field values."""
+    requirements = program.get('subject_requirements') or []
+    if isinstance(requirements, (list, tuple)):
+        requirements = "; ".join(str(r).strip() for r in requirements)
+
+    return {
+        'name': (program.get('program_name') or '').strip(),
+        'level': (program.get('level') or '').strip(),
+        'path': canonical_path(program.get('path')),
+        'min_mean_grade': (program.get('min_mean_grade') or 'Any').strip(),
+        'min_cluster_points': float(program.get('min_cluster_points') or 0.0),
+        'subject_requirements': requirements.strip(),
+        'description': (program.get('description') or '').strip(),
+        'career_path_info': (program.get('career_path') or '').strip(),
+    }
+
+
+def course_key(fields):
+    """Natural key used to match incoming records with existing rows."""
+    return (fields['name'].strip().lower(), fields['level'].strip().lower())
+
+
+def course_hash(fields):
+    """Content hash of a course's catalog fields, used to skip unchanged rows."""
+    normalised = [
+        fields.get('name') or '',
+        fields.get('level') or '',
+        fields.get('path') or '',
+        fields.get('min_mean_grade') or 'Any',
+        float(fields.get('min_cluster_points') or 0.0),
+        fields.get('subject_requirements') or '',
+        fields.get('description') or '',
+        fields.get('career_path_info') or '',
+    ]
+    payload = json.dumps(normalised, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def upsert_courses(records, batch_size=1000):
+    """
+    Inserts or updates Course rows from an iterable of field dicts.
+    Rows are matched on (name, level); records whose content hash matches the
+    existing row are skipped. Returns counts of created/updated/unchanged rows.
+    """
+    existing = {}
+    for row in Course.objects.values('id', *COURSE_FIELDS).iterator(chunk_size=2000):
+        existing[course_key(row)] = (row['id'], course_hash(row))
+
+    counts = {'created': 0, 'updated': 0, 'unchanged': 0}
+    seen = set()
+    to_create = []
+    to_update = []
+
+    def flush():
+        if to_create:
+            Course.objects.bulk_create(to_create, batch_size=batch_size)
+            counts['created'] += len(to_create)
+            to_create.clear()
+        if to_update:
+            Course.objects.bulk_update(to_update, COURSE_FIELDS, batch_size=batch_size)
+            counts['updated'] += len(to_update)
+            to_update.clear()
+
+    with transaction.atomic():
+        for fields in records:
+            if not fields['name'] or not fields['level']:
+                continue
+            key = course_key(fields)
+            if key in seen:
+                continue
+            seen.add(key)
+
+            current = existing.get(key)
+            if current is None:
+                to_create.append(Course(**fields))
+            elif current[1] == course_hash(fields):
+                counts['unchanged'] += 1
+            else:
+                to_update.append(Course(id=current[0], **fields))
+
+            if len(to_create) + len(to_update) >= batch_size:
+                flush()
+        flush()
+
+    return counts
+
+
+# --- CATALOG SNAPSHOT (read-only lookups without the DB) ---
+
+_snapshot = None
+_snapshot_stamp = None
+
+
+def write_catalog_snapshot(filename=None):
+    """Writes the Course table to a catalog snapshot; returns the number of rows."""
+    filename = filename or settings.CATALOG_SNAPSHOT_PATH
+    writer = SnapshotWriter()
+    rows = Course.objects.order_by('id').values_list(
+        'id', 'name', 'level', 'path', 'min_mean_grade', 'min_cluster_points'
+    )
+    for course_id, name, level, path, grade, points in rows.iterator(chunk_size=2000):
+        writer.add(name, level, path, GRADE_RANKS.get(grade, 0), points, course_id=course_id)
+    writer.write(filename)
+    return len(writer)
+
+
+def get_catalog_snapshot():
+    """
+    This worker's memory-mapped CatalogSnapshot, or None if none has been built.
+    The file is re-mapped when it is replaced, so a rebuild is picked up
+    without restarting workers. A file in another format (one left by an older
+    release, say) also counts as none, so callers fall back to the database
+    until it is rebuilt; it is only opened again once it changes.
+    """
+    global _snapshot, _snapshot_stamp
+    filename = settings.CATALOG_SNAPSHOT_PATH
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+
+    stamp = (filename, stat.st_ino, stat.st_mtime_ns)
+    if stamp != _snapshot_stamp:
+        try:
+            _snapshot = CatalogSnapshot(filename)
+        except ValueError as exc:
+            logger.warning("Ignoring catalog snapshot: %s. Rebuild it with 'python manage.py build_catalog_snapshot'.", exc)
+            _snapshot = None
+        _snapshot_stamp = stamp
+    return _snapshot
@@ -0,0 +1,292 @@
+"""
+Near-duplicate course detection (MinHash + LSH).
+
+Exact-name checks miss pairs like "Diploma in ICT" / "Diploma in
+Information Technology (ICT)". Names and descriptions are normalised first
+(stopwords dropped, spelled-out acronyms collapsed to the acronyms the
+catalog uses), then each course becomes a set of features: words and
+character trigrams of its name, its path, and word triples of its
+description. Similar sets get similar MinHash signatures, and
+LSH banding puts courses whose signatures agree on a whole band in the same
+bucket, so only those candidate pairs are ever compared.
+
+Signatures use one-permutation hashing: every feature is hashed once (crc32),
+the hash picks one of SIGNATURE_SIZE bins and the bin keeps its minimum;
+empty bins borrow from the next non-empty one. That is one hash per feature
+instead of one per feature per bin. A signature is packed into one int, so
+comparing two is a handful of big-int operations (XOR, fold each bin onto one
+bit, popcount) rather than a loop over bins; most LSH candidates fall below
+the threshold, and they are rejected before any cluster lookup. A 200k-course
+synthetic catalog takes about 20 s and 240 MB in plain Python.
+
+Candidates are confirmed by their estimated Jaccard similarity (share of
+equal bins) and must be the same level; confirmed pairs are joined into
+clusters. merge_cluster() keeps the course with the most reviews and
+favourites and repoints everything else to it.
+"""
+
+import re
+import zlib
+from array import array
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+
+from students.models import Favorite, Placement
+from .models import Course, CourseReview
+
+SIGNATURE_SIZE = 64
+BANDS = 16                  # 16 bands x 4 rows: pairs above ~0.5 similarity almost always collide
+ROWS = SIGNATURE_SIZE // BANDS
+REVIEW_THRESHOLD = 0.6      # clusters listed for review
+MERGE_THRESHOLD = 0.9       # clusters merged automatically with --merge
+MAX_BUCKET = 50             # buckets bigger than this are boilerplate, not duplicates
+
+STOPWORDS = {'in', 'of', 'and', 'the', 'for', 'with', 'a', 'an', 'to', 'on'}
+_WORD = re.compile(r"[a-z0-9]+")
+_ACRONYM = re.compile(r"\b[A-Z]{2,6}\b")
+_PAREN_ACRONYM = re.compile(r"\(([A-Z]{2,6})\)")
+_EMPTY = 0xFFFFFFFF  # > any real value (32-bit hash // 64 fits in 26 bits)
+_BIN_LOW_BITS = int.from_bytes(array('I', [1] * SIGNATURE_SIZE).tobytes(), 'little')
+_BAND_MASK = (1 << (32 * ROWS)) - 1
+_CRC_WORD, _CRC_TRIGRAM, _CRC_PATH, _CRC_SHINGLE = (zlib.crc32(prefix) for prefix in (b'w:', b'c:', b'p:', b'd:'))
+
+
+def catalog_acronyms(names):
+    """Upper-case acronyms used anywhere in course names (ICT, HRM, ECDE, ...), lower-cased."""
+    found = set()
+    for name in names:
+        found.update(a.lower() for a in _ACRONYM.findall(name or ''))
+    return found
+
+
+def _is_subsequence(short, long):
+    letters = iter(long)
+    return all(letter in letters for letter in short)
+
+
+def normalise(text, acronyms=frozenset()):
+    """
+    Lower-case words without stopwords, with spelled-out acronyms collapsed:
+    "Information Technology (ICT)" and "Information Communication
+    Technology" both become "ict" when ICT is a catalog acronym.
+    """
+    text = text or ''
+    # "X Y (ACR)": drop the spelled-out words just before the acronym
+    for match in reversed(list(_PAREN_ACRONYM.finditer(text))):
+        acronym = match.group(1).lower()
+        before = [w for w in _WORD.findall(text[:match.start()].lower()) if w not in STOPWORDS]
+        for length in range(min(len(acronym) + 1, len(before)), 1, -1):
+            initials = ''.join(w[0] for w in before[-length:])
+            if initials[0] == acronym[0] and _is_subsequence(initials, acronym):
+                before = before[:-length]
+                break
+        text = ' '.join(before) + f' {acronym} ' + text[match.end():]
+
+    words = [w for w in _WORD.findall(text.lower()) if w not in STOPWORDS]
+    if not acronyms:
+        return words
+    # Runs of words whose initials spell a known acronym
+    collapsed, i = [], 0
+    while i < len(words):
+        for length in range(min(6, len(words) - i), 1, -1):
+            if ''.join(w[0] for w in words[i:i + length]) in acronyms:
+                collapsed.append(''.join(w[0] for w in words[i:i + length]))
+                i += length
+                break
+        else:
+            collapsed.append(words[i])
+            i += 1
+    return collapsed
+
+
+def features(name, path, description, acronyms=frozenset()):
+    """
+    Feature set of one course, as 32-bit hashes: crc32 of "w:<word>",
+    "c:<name trigram>", "p:<path>" and "d:<description word triple>". Each
+    hash continues from the crc32 of its prefix, so no prefixed strings are built.
+    """
+    words = normalise(name, acronyms)
+    compact = ' '.join(words).encode('utf-8')  # ASCII: normalise keeps [a-z0-9] only
+    found = {zlib.crc32(word.encode('utf-8'), _CRC_WORD) for word in words}
+    found.update(zlib.crc32(compact[i:i + 3], _CRC_TRIGRAM) for i in range(len(compact) - 2))
+    found.add(zlib.crc32((path or '').lower().encode('utf-8'), _CRC_PATH))
+    text = normalise(description, acronyms)
+    found.update(zlib.crc32(' '.join(text[i:i + 3]).encode('utf-8'), _CRC_SHINGLE) for i in range(len(text) - 2))
+    return found
+
+
+def signature(hashes):
+    """
+    One-permutation MinHash signature of a feature set: SIGNATURE_SIZE 32-bit
+    bins packed into one int (bin i in bits 32i to 32i + 31).
+    """
+    bins = [_EMPTY] * SIGNATURE_SIZE
+    for h in hashes:
+        i = h % SIGNATURE_SIZE
+        value = h // SIGNATURE_SIZE
+        if value < bins[i]:
+            bins[i] = value
+    # Densify: an empty bin takes the next non-empty bin's value, tagged with the distance
+    # (values fit in 26 bits, so the tag cannot make it equal to a real one)
+    if _EMPTY in bins and len(set(bins)) > 1:
+        for i in range(SIGNATURE_SIZE):
+            if bins[i] == _EMPTY:
+                step = 1
+                while bins[(i + step) % SIGNATURE_SIZE] == _EMPTY:
+                    step += 1
+                bins[i] = bins[(i + step) % SIGNATURE_SIZE] | (step << 26)
+    return int.from_bytes(array('I', bins).tobytes(), 'little')
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of two signatures (share of equal bins)."""
+    # Fold each 32-bit bin of a ^ b onto its lowest bit (the shifts add up to 31,
+    # so no bit crosses into the bin below), then count the bins that differ
+    diff = a ^ b
+    diff |= diff >> 16
+    diff |= diff >> 8
+    diff |= diff >> 4
+    diff |= diff >> 2
+    diff |= diff >> 1
+    return (SIGNATURE_SIZE - (diff & _BIN_LOW_BITS).bit_count()) / SIGNATURE_SIZE
+
+
+class _Clusters:
+    """Union-find over course ids."""
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        root = x
+        while self.parent.get(root, root) != root:
+            root = self.parent[root]
+        while x != root:  # path compression
+            self.parent[x], x = root, self.parent[x]
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        self.parent.setdefault(b, b)
+        self.parent[a] = b
+
+    def groups(self):
+        found = defaultdict(list)
+        for x in self.parent:
+            found[self.find(x)].append(x)
+        return [sorted(members) for members in found.values() if len(members) > 1]
+
+
+def find_duplicates(rows, threshold=REVIEW_THRESHOLD):
+    """
+    rows: iterable of (id, name, level, path, description).
+    Returns (clusters, skipped buckets): each cluster a sorted list of ids
+    whose members are linked by pairs at least `threshold` similar.
+    """
+    rows = list(rows)
+    acronyms = catalog_acronyms(row[1] for row in rows)
+    signatures = {}
+    levels = {}
+    for course_id, name, level, path, description in rows:
+        signatures[course_id] = signature(features(name, path, description, acronyms))
+        levels[course_id] = (level or '').lower()
+    del rows
+
+    # similarity() >= threshold, as a number of bins allowed to differ
+    max_differing = max((k for k in range(SIGNATURE_SIZE + 1) if (SIGNATURE_SIZE - k) / SIGNATURE_SIZE >= threshold),
+                        default=-1)
+
+    # One band at a time keeps only one set of buckets in memory
+    clusters = _Clusters()
+    skipped = 0
+    for band in range(BANDS):
+        shift = band * ROWS * 32
+        buckets = defaultdict(list)
+        for course_id, sig in signatures.items():
+            buckets[(levels[course_id], (sig >> shift) & _BAND_MASK)].append(course_id)
+        for members in buckets.values():
+            if len(members) < 2:
+                continue
+            if len(members) > MAX_BUCKET:
+                skipped += 1
+                continue
+            # Most candidates fall short of the threshold, so that is checked
+            # (similarity() inlined: the hottest loop) before looking up clusters
+            sigs = [signatures[course_id] for course_id in members]
+            for i, sig_a in enumerate(sigs):
+                for j in range(i + 1, len(sigs)):
+                    diff = sig_a ^ sigs[j]
+                    diff |= diff >> 16
+                    diff |= diff >> 8
+                    diff |= diff >> 4
+                    diff |= diff >> 2
+                    diff |= diff >> 1
+                    if (diff & _BIN_LOW_BITS).bit_count() > max_differing:
+                        continue
+                    a, b = members[i], members[j]
+                    root_a, root_b = clusters.find(a), clusters.find(b)
+                    # Both clusters' first members must agree too, so chains of
+                    # slightly-different names do not snowball into one cluster
+                    if root_a != root_b and similarity(signatures[root_a], signatures[root_b]) >= threshold:
+                        clusters.union(a, b)
+    return clusters.groups(), skipped
+
+
+def course_rows():
+    return Course.objects.values_list('id', 'name', 'level', 'path', 'description').iterator(chunk_size=5000)
+
+
+def usage_counts(course_ids, batch=2000):
+    """{course_id: reviews + favourites} for the given courses."""
+    counts = defaultdict(int)
+    course_ids = list(course_ids)
+    for i in range(0, len(course_ids), batch):
+        chunk = course_ids[i:i + batch]
+        for model in (CourseReview, Favorite):
+            rows = model.objects.filter(course_id__in=chunk).order_by().values_list('course_id').annotate(n=Count('id'))
+            for course_id, n in rows:
+                counts[course_id] += n
+    return counts
+
+
+def choose_keeper(course_ids, usage=None):
+    """The cluster member students use most (reviews + favourites), oldest first on ties."""
+    usage = usage_counts(course_ids) if usage is None else usage
+    return max(sorted(course_ids), key=lambda c: (usage.get(c, 0), -c))
+
+
+def _repeated_users(model, course_ids):
+    rows = model.objects.filter(course_id__in=course_ids).order_by().values('user_id').annotate(n=Count('id'))
+    return list(rows.filter(n__gt=1).values_list('user_id', flat=True))
+
+
+@transaction.atomic
+def merge_cluster(course_ids, keeper=None):
+    """
+    Repoints reviews, favourites and placements of a cluster to one course
+    and deletes the rest. Where a student already reviewed or saved the kept
+    course, their duplicate review/favourite is dropped. Returns the kept id.
+    """
+    keeper = keeper or choose_keeper(course_ids)
+    others = [c for c in course_ids if c != keeper]
+
+    reviewed = CourseReview.objects.filter(course_id=keeper).values('user_id')
+    CourseReview.objects.filter(course_id__in=others, user_id__in=reviewed).delete()
+    saved = Favorite.objects.filter(course_id=keeper).values('user_id')
+    Favorite.objects.filter(course_id__in=others, user_id__in=saved).delete()
+    # A student may have saved two of the duplicates: keep one of them
+    for user_id in _repeated_users(Favorite, others):
+        extra = Favorite.objects.filter(course_id__in=others, user_id=user_id).order_by('saved_at', 'id')[1:]
+        Favorite.objects.filter(id__in=list(extra.values_list('id', flat=True))).delete()
+    for user_id in _repeated_users(CourseReview, others):
+        extra = CourseReview.objects.filter(course_id__in=others, user_id=user_id).order_by('-created_at', '-id')[1:]
+        CourseReview.objects.filter(id__in=list(extra.values_list('id', flat=True))).delete()
+
+    CourseReview.objects.filter(course_id__in=others).update(course_id=keeper)
+    Favorite.objects.filter(course_id__in=others).update(course_id=keeper)
+    Placement.objects.filter(course_id__in=others).update(course_id=keeper)
+    Course.objects.filter(id__in=others).delete()
+    Favorite.recount([keeper])
+    return keeper
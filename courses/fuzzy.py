@@ -0,0 +1,185 @@
+"""
+Trigram fuzzy matching of course names, for misspelt searches
+("pharmarcy", "enginering") that icontains misses.
+
+Words are split into trigrams the way PostgreSQL's pg_trgm does it: lower
+case, two spaces before and one after each word ("  p", " ph", "pha", ...,
+"cy "). A course matches when most of the query's trigrams appear in its
+name: the score is shared trigrams / query trigrams, which is pg_trgm's
+word_similarity without the contiguity check. Ties are ranked by the
+similarity of the whole name, so shorter names come first. The threshold is
+below pg_trgm's default (0.6): one swapped letter in a short word
+("nurisng") only keeps half the trigrams. Queries shorter than
+FUZZY_MIN_LENGTH are left to icontains, as "law" would match every "La...".
+
+On PostgreSQL the `name %> query` operator does the work, backed by the GIN
+trigram index from migration 0005, with the threshold set for the query's
+transaction. Elsewhere (SQLite) each worker keeps an
+inverted index from trigram to distinct names, built from the catalog
+snapshot when there is one (no query) or from the Course table, and rebuilt
+like the what-if arrays: when the snapshot changes, or every FUZZY_INDEX_TTL
+seconds. Only the rarest query trigrams are used to find candidates (a name
+missing all of them cannot reach the threshold), so common trigrams such as
+"  d" from "Diploma" are rarely walked.
+
+Callers that only show some courses (the results page shows those within the
+student's grade) pass them as a queryset, so the limit applies to the courses
+they can show: the WHERE clause on PostgreSQL, batches of FUZZY_BATCH
+candidates checked against the queryset elsewhere.
+"""
+
+import math
+import re
+import time
+from collections import defaultdict
+
+from django.db import connections, transaction
+from django.db.models import F, Value
+
+from courses.catalog import get_catalog_snapshot
+from courses.models import Course
+
+FUZZY_THRESHOLD = 0.5
+FUZZY_MIN_LENGTH = 4
+FUZZY_LIMIT = 200
+FUZZY_INDEX_TTL = 300
+FUZZY_BATCH = 500
+_WORD = re.compile(r'[^\W_]+')
+
+
+def trigrams(text):
+    """pg_trgm-style trigram set of a text."""
+    found = set()
+    for word in _WORD.findall((text or '').casefold()):
+        padded = f'  {word} '
+        found.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return found
+
+
+class TrigramIndex:
+    """Inverted trigram index over the distinct course names."""
+
+    def __init__(self, rows):
+        self.names = []        # name text, by name number
+        self.grams = []        # trigram set, by name number
+        self.course_ids = []   # [course ids], by name number
+        self.postings = defaultdict(list)
+        numbers = {}
+        for course_id, name in rows:
+            number = numbers.get(name)
+            if number is None:
+                number = numbers[name] = len(self.names)
+                self.names.append(name)
+                self.grams.append(frozenset(trigrams(name)))
+                self.course_ids.append([])
+                for gram in self.grams[number]:
+                    self.postings[gram].append(number)
+            self.course_ids[number].append(course_id)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls((snapshot.course_id(i), snapshot.name(i)) for i in range(len(snapshot)))
+
+    @classmethod
+    def from_database(cls):
+        return cls(Course.objects.values_list('id', 'name').iterator(chunk_size=5000))
+
+    def search(self, query, limit=FUZZY_LIMIT, threshold=FUZZY_THRESHOLD):
+        """[(course_id, score)] best first; limit=None returns every match."""
+        wanted = trigrams(query)
+        if not wanted:
+            return []
+        need = math.ceil(threshold * len(wanted))
+        # A name sharing `need` trigrams has at least one among the rarest len - need + 1
+        rarest = sorted(wanted, key=lambda gram: len(self.postings.get(gram, ())))
+        candidates = set()
+        for gram in rarest[:len(wanted) - need + 1]:
+            candidates.update(self.postings.get(gram, ()))
+
+        scored = []
+        for number in candidates:
+            shared = len(wanted & self.grams[number])
+            if shared >= need:
+                similarity = shared / (len(wanted) + len(self.grams[number]) - shared)
+                scored.append((-shared, -similarity, self.names[number], number))
+        scored.sort()
+
+        found = []
+        for minus_shared, _, _, number in scored:
+            score = round(-minus_shared / len(wanted), 3)
+            found.extend((course_id, score) for course_id in self.course_ids[number])
+            if limit is not None and len(found) >= limit:
+                break
+        return found[:limit]
+
+
+_index = None
+_index_source = None
+
+
+def get_trigram_index():
+    """This worker's TrigramIndex, rebuilt when the catalog snapshot changes (or after FUZZY_INDEX_TTL)."""
+    global _index, _index_source
+    snapshot = get_catalog_snapshot()
+    source = snapshot if snapshot is not None else int(time.monotonic() // FUZZY_INDEX_TTL)
+    if _index is None or source != _index_source:
+        _index = TrigramIndex.from_snapshot(snapshot) if snapshot is not None else TrigramIndex.from_database()
+        _index_source = source
+    return _index
+
+
+def reset_trigram_index():
+    global _index, _index_source
+    _index = _index_source = None
+
+
+def _postgres_matches(query, limit, courses):
+    # psycopg is only importable where PostgreSQL is configured
+    from django.contrib.postgres.lookups import TrigramWordSimilar
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    alias = courses.db
+    rows = (
+        courses
+        .filter(TrigramWordSimilar(F('name'), Value(query)))  # name %> query: uses the GIN index
+        .annotate(similarity=TrigramWordSimilarity(query, 'name'))
+        .order_by('-similarity', 'name')
+        .values_list('id', 'similarity')[:limit]
+    )
+    with transaction.atomic(using=alias):
+        with connections[alias].cursor() as cursor:
+            # Local to the transaction (SET LOCAL), so pooled connections keep the default
+            cursor.execute("SELECT set_config('pg_trgm.word_similarity_threshold', %s, true)", [str(FUZZY_THRESHOLD)])
+        return [(course_id, round(similarity, 3)) for course_id, similarity in rows]
+
+
+def _restrict(matches, courses, limit):
+    # Best first, so stop as soon as `limit` of them are in `courses`
+    courses = courses.order_by().values_list('id', flat=True)
+    found = []
+    for start in range(0, len(matches), FUZZY_BATCH):
+        batch = matches[start:start + FUZZY_BATCH]
+        allowed = set(courses.filter(id__in=[course_id for course_id, _ in batch]))
+        found.extend(match for match in batch if match[0] in allowed)
+        if len(found) >= limit:
+            break
+    return found[:limit]
+
+
+def fuzzy_matches(query, limit=FUZZY_LIMIT, courses=None):
+    """
+    [(course_id, score 0-1)] of courses whose name is close to `query`, best
+    first, optionally only among `courses` (a Course queryset). Reads from the
+    database Course reads are routed to (so it follows replica_reads()).
+    """
+    query = (query or '').strip()[:100]
+    if len(query) < FUZZY_MIN_LENGTH:
+        return []
+    restricted = courses is not None
+    if not restricted:
+        courses = Course.objects.all()
+    if connections[courses.db].vendor == 'postgresql':
+        return _postgres_matches(query, limit, courses)
+    if not restricted:
+        return get_trigram_index().search(query, limit)
+    return _restrict(get_trigram_index().search(query, limit=None), courses, limit)
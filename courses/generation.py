@@ -0,0 +1,462 @@
+import hashlib
+import json
+import os
+import random
+import re
+import shutil
+import tempfile
+import textwrap
+
+from courses.snapshot import SnapshotWriter
+
+# Seed used when a generator is run without --seed.
+DEFAULT_SEED = 0
+
+DB_FILENAME = "courses_db.json"
+
+LEVEL_ORDER = ["Degree", "Diploma", "Certificate", "Artisan"]
+
+# Lowest cluster points a program may require at each level
+LEVEL_MIN_POINTS = {"Degree": 7, "Diploma": 5, "Certificate": 4, "Artisan": 2}
+
+# KCSE mean grades ranked from 12 (A) down to 1 (E); 'Any' means no minimum
+GRADE_RANKS = {
+    'A': 12, 'A-': 11, 'B+': 10, 'B': 9, 'B-': 8,
+    'C+': 7, 'C': 6, 'C-': 5, 'D+': 4, 'D': 3, 'D-': 2, 'E': 1, 'Any': 0,
+}
+
+REQUIRED_FIELDS = [
+    "program_name", "level", "path", "min_mean_grade",
+    "min_cluster_points", "subject_requirements", "description",
+    "career_path", "duration", "exam_body", "metadata"
+]
+
+
+# Canonical Course.path for the generator's free-text paths
+# ("ICT & Computing > Information Technology"). First match wins, so the more
+# specific families come before the catch-all ones.
+PATH_KEYWORDS = [
+    ('ICT', ('ict', 'computer', 'computing', 'software', 'it', 'information', 'cyber', 'network')),
+    ('Medicine', ('medicine', 'medical', 'health', 'nursing', 'pharmacy', 'clinical', 'dental')),
+    ('Engineering', ('engineering', 'electrical', 'electronic', 'mechanical', 'automotive', 'motor',
+                     'construction', 'building', 'civil', 'masonry', 'carpentry', 'plumbing', 'welding')),
+    ('Law', ('law', 'legal', 'criminology')),
+    ('Education', ('education', 'teaching', 'teacher')),
+    ('Agriculture', ('agriculture', 'agricultural', 'farming', 'food', 'veterinary', 'environment')),
+    ('Hospitality', ('hospitality', 'tourism', 'hotel', 'catering', 'beauty', 'hairdressing', 'cosmetology')),
+    ('Business', ('business', 'economics', 'accounting', 'accounts', 'finance', 'management', 'commerce',
+                  'procurement', 'marketing')),
+    ('Science', ('science', 'sciences', 'mathematics', 'statistics')),
+    ('Arts', ('arts', 'art', 'media', 'journalism', 'design', 'music', 'fashion')),
+]
+
+
+def canonical_path(raw_path):
+    """
+    Maps a generator path string onto one of Course.PATH_CHOICES.
+    The top-level category (before '>') decides first; the sub-category is only
+    consulted when the top level is ambiguous.
+    """
+    parts = [part.strip().lower() for part in (raw_path or '').split('>')]
+    for text in (parts[0], ' '.join(parts)):
+        words = set(re.findall(r'[a-z]+', text))
+        for path_key, keywords in PATH_KEYWORDS:
+            if words.intersection(keywords):
+                return path_key
+    return 'Others'
+
+
+def course_rng(*natural_key, seed=DEFAULT_SEED):
+    """
+    Returns a random.Random seeded from a course's natural key (e.g. name, level).
+    The same key and seed always draw the same grades and points, so re-running
+    a generator produces an identical catalog instead of reshuffling every row.
+    """
+    key = "\x1f".join(str(part) for part in (seed,) + tuple(natural_key))
+    digest = hashlib.sha256(key.encode('utf-8')).digest()
+    return random.Random(int.from_bytes(digest[:8], 'big'))
+
+
+def iter_json_array(fp, chunk_size=64 * 1024):
+    """
+    Yields the items of a top-level JSON array one at a time.
+    Reads the file in chunks and decodes each element as soon as it is complete,
+    so memory stays bounded by the largest single record rather than the file.
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+    started = False
+
+    while True:
+        # Skip whitespace and separators between elements
+        while pos < len(buf) and buf[pos] in ' \t\r\n,':
+            pos += 1
+
+        if pos >= len(buf) and not eof:
+            chunk = fp.read(chunk_size)
+            if chunk:
+                buf = buf[pos:] + chunk
+                pos = 0
+                continue
+            eof = True
+
+        if pos >= len(buf):
+            if started:
+                raise ValueError("Unexpected end of file inside JSON array")
+            return
+
+        if not started:
+            if buf[pos] != '[':
+                raise ValueError("Expected a JSON array at the top level")
+            started = True
+            pos += 1
+            continue
+
+        if buf[pos] == ']':
+            return
+
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            item, end = None, None
+
+        # An element touching the end of the buffer may be truncated; read more first
+        if end is None or (end == len(buf) and not eof):
+            chunk = fp.read(chunk_size)
+            if not chunk:
+                if end is None:
+                    raise ValueError(f"Malformed JSON element at offset {pos}")
+                eof = True
+            else:
+                buf = buf[pos:] + chunk
+                pos = 0
+            continue
+
+        yield item
+        pos = end
+
+
+def iter_db(filename=DB_FILENAME):
+    """Streams the programs of an existing generator database (nothing if missing)."""
+    if not os.path.exists(filename):
+        return
+    with open(filename, "r", encoding="utf-8") as f:
+        yield from iter_json_array(f)
+
+
+def program_key(course):
+    """Generator programs are unique by (program_name, level), case-insensitively."""
+    return (
+        str(course.get("program_name", "")).strip().lower(),
+        str(course.get("level", "")).strip().lower(),
+    )
+
+
+def iter_programs(filename):
+    """Streams programs from a generator JSON array or an NDJSON export shard."""
+    if filename.endswith(".ndjson"):
+        with open(filename, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        yield from iter_db(filename)
+
+
+def _safe_name(text):
+    safe = str(text).strip().replace("/", "_").replace(" ", "_").lower()
+    return "".join(c for c in safe if c.isalnum() or c == "_") or "other"
+
+
+def _file_sha256(filename):
+    digest = hashlib.sha256()
+    with open(filename, "rb") as f:
+        for block in iter(lambda: f.read(64 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class JsonArrayWriter:
+    """
+    Writes a JSON array one element at a time, byte-for-byte the same layout as
+    json.dump(items, f, ensure_ascii=False, indent=2). Output goes to a
+    temporary file that only replaces the target on commit().
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.tmp_filename = filename + ".tmp"
+        self.count = 0
+        self._file = open(self.tmp_filename, "w", encoding="utf-8")
+        self._file.write("[")
+
+    def write(self, item):
+        text = json.dumps(item, ensure_ascii=False, indent=2)
+        self._file.write(",\n" if self.count else "\n")
+        self._file.write(textwrap.indent(text, "  ", lambda line: True))
+        self.count += 1
+
+    def close(self):
+        if not self._file.closed:
+            self._file.write("\n]" if self.count else "]")
+            self._file.close()
+
+    def commit(self):
+        self.close()
+        os.replace(self.tmp_filename, self.filename)
+
+    def discard(self):
+        self.close()
+        os.remove(self.tmp_filename)
+
+
+class ShardedExport:
+    """
+    Writes programs as NDJSON shards, one per (level, canonical path), e.g.
+    exports/degree/ict.ndjson, plus a sidecar exports/index.json.
+
+    Lines in a shard are ordered by ascending grade rank, and the index records
+    the byte offset and length of every grade-rank run, so a consumer can seek
+    straight to one slice (or to everything up to a student's grade, which is a
+    prefix of the shard). Shards whose content hash is unchanged are left
+    untouched on disk; shards that are no longer produced are removed.
+    """
+
+    INDEX_FILENAME = "index.json"
+
+    def __init__(self, output_dir="exports"):
+        self.output_dir = output_dir
+        self.written = []
+        self.unchanged = []
+        self._counts = {}
+        self._shards = {}
+        self._tmp_dir = tempfile.mkdtemp(prefix=".build-", dir=output_dir)
+        self._tmp_files = {}
+
+    def add(self, course):
+        level = str(course.get("level", ""))
+        path = canonical_path(course.get("path"))
+        shard = f"{_safe_name(level)}/{_safe_name(path)}.ndjson"
+        if shard not in self._tmp_files:
+            self._shards[shard] = (level, path)
+            self._counts[shard] = 0
+            tmp_name = os.path.join(self._tmp_dir, f"{len(self._tmp_files)}.tmp")
+            self._tmp_files[shard] = open(tmp_name, "w", encoding="utf-8")
+
+        # Generation metadata changes every run; leaving it out keeps shard hashes stable
+        record = {k: v for k, v in course.items() if k != "metadata"}
+        rank = GRADE_RANKS.get(course.get("min_mean_grade"), 0)
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        self._tmp_files[shard].write(f"{rank:02d}\t{line}\n")
+        self._counts[shard] += 1
+
+    def counts(self):
+        return dict(sorted(self._counts.items()))
+
+    def commit(self):
+        old_index = load_export_index(self.output_dir)
+        old_hashes = {s["file"]: s["sha256"] for s in old_index.get("shards", [])}
+
+        shards = []
+        for shard, tmp in sorted(self._tmp_files.items()):
+            tmp.close()
+            entry, content = self._sorted_shard(shard, tmp.name)
+            shards.append(entry)
+
+            filename = os.path.join(self.output_dir, shard)
+            if (old_hashes.get(shard) == entry["sha256"] and os.path.exists(filename)
+                    and _file_sha256(filename) == entry["sha256"]):
+                self.unchanged.append(shard)
+                continue
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            with open(filename + ".tmp", "wb") as f:
+                f.write(content)
+            os.replace(filename + ".tmp", filename)
+            self.written.append(shard)
+
+        for shard in set(old_hashes) - set(self._tmp_files):
+            stale = os.path.join(self.output_dir, shard)
+            if os.path.exists(stale):
+                os.remove(stale)
+
+        index_file = os.path.join(self.output_dir, self.INDEX_FILENAME)
+        with open(index_file + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "shards": shards}, f, ensure_ascii=False, indent=2)
+        os.replace(index_file + ".tmp", index_file)
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+    def discard(self):
+        for tmp in self._tmp_files.values():
+            tmp.close()
+        shutil.rmtree(self._tmp_dir, ignore_errors=True)
+
+    def _sorted_shard(self, shard, tmp_name):
+        """Orders one shard by grade rank (stable) and builds its index entry."""
+        with open(tmp_name, "r", encoding="utf-8") as f:
+            tagged = [line.split("\t", 1) for line in f]
+        tagged.sort(key=lambda pair: pair[0])
+
+        level, path = self._shards[shard]
+        runs = []
+        chunks = []
+        offset = 0
+        for rank_text, line in tagged:
+            data = line.encode("utf-8")
+            rank = int(rank_text)
+            if not runs or runs[-1]["grade_rank"] != rank:
+                runs.append({"grade_rank": rank, "offset": offset, "length": 0, "count": 0})
+            runs[-1]["length"] += len(data)
+            runs[-1]["count"] += 1
+            chunks.append(data)
+            offset += len(data)
+
+        content = b"".join(chunks)
+        entry = {
+            "file": shard,
+            "level": level,
+            "path": path,
+            "count": len(tagged),
+            "bytes": len(content),
+            "sha256": hashlib.sha256(content).hexdigest(),
+            "grade_ranks": runs,
+        }
+        return entry, content
+
+
+def load_export_index(output_dir="exports"):
+    """The sidecar index of an NDJSON export directory ({} if there is none)."""
+    index_file = os.path.join(output_dir, ShardedExport.INDEX_FILENAME)
+    if not os.path.exists(index_file):
+        return {}
+    with open(index_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_export_slice(output_dir, level, path, grade_rank=None, max_grade_rank=None, index=None):
+    """
+    Yields the exported programs for one level and canonical path, seeking
+    straight to the bytes the index lists. Pass grade_rank for one rank, or
+    max_grade_rank for everything a student with that grade qualifies for.
+    """
+    index = index if index is not None else load_export_index(output_dir)
+    for shard in index.get("shards", []):
+        if shard["level"] != level or shard["path"] != path:
+            continue
+
+        runs = shard["grade_ranks"]
+        if grade_rank is not None:
+            runs = [r for r in runs if r["grade_rank"] == grade_rank]
+        elif max_grade_rank is not None:
+            runs = [r for r in runs if r["grade_rank"] <= max_grade_rank]
+        if not runs:
+            return
+
+        start = runs[0]["offset"]
+        end = runs[-1]["offset"] + runs[-1]["length"]
+        with open(os.path.join(output_dir, shard["file"]), "rb") as f:
+            f.seek(start)
+            for line in f.read(end - start).splitlines():
+                yield json.loads(line)
+        return
+
+
+class CatalogBuild:
+    """
+    Single pass over generated programs: deduplicates, validates, collects
+    statistics and streams the main database plus the NDJSON export shards
+    (see ShardedExport), so no list of every program is ever held in memory.
+    With snapshot_filename set, a binary catalog snapshot (courses.snapshot)
+    is written alongside. Nothing replaces the existing files until commit().
+    """
+
+    def __init__(self, db_filename=DB_FILENAME, output_dir="exports", validate=True,
+                 snapshot_filename=None):
+        os.makedirs(output_dir, exist_ok=True)
+        self.db_filename = db_filename
+        self.output_dir = output_dir
+        self.validate = validate
+        self.snapshot_filename = snapshot_filename
+        self._snapshot = SnapshotWriter() if snapshot_filename else None
+        self.stats = {
+            "total_courses": 0,
+            "by_level": {},
+            "by_path": {},
+            "by_exam_body": {},
+            "by_duration": {}
+        }
+        self.errors = []
+        self.warnings = []
+        self._seen = set()
+        self._db_writer = JsonArrayWriter(db_filename)
+        self.exports = ShardedExport(output_dir)
+
+    def add(self, course):
+        """Adds one program; returns False if its (name, level) was already added."""
+        key = program_key(course)
+        if key in self._seen:
+            return False
+        self._seen.add(key)
+
+        if self.validate:
+            self._check(self.stats["total_courses"] + 1, course)
+        self._count(course)
+
+        self._db_writer.write(course)
+        self.exports.add(course)
+
+        if self._snapshot is not None:
+            self._snapshot.add(
+                course.get("program_name"),
+                course.get("level"),
+                canonical_path(course.get("path")),
+                GRADE_RANKS.get(course.get("min_mean_grade"), 0),
+                course.get("min_cluster_points"),
+            )
+        return True
+
+    def add_all(self, courses):
+        """Adds every program from an iterable; returns how many were new."""
+        return sum(1 for course in courses if self.add(course))
+
+    def commit(self):
+        self._db_writer.commit()
+        self.exports.commit()
+        if self._snapshot is not None:
+            self._snapshot.write(self.snapshot_filename)
+
+    def discard(self):
+        self._db_writer.discard()
+        self.exports.discard()
+
+    def _count(self, course):
+        self.stats["total_courses"] += 1
+        for stat, field in (("by_level", "level"), ("by_path", "path"),
+                            ("by_exam_body", "exam_body"), ("by_duration", "duration")):
+            value = course.get(field)
+            self.stats[stat][value] = self.stats[stat].get(value, 0) + 1
+
+    def _check(self, idx, course):
+        name = course.get("program_name", "Unknown")
+
+        missing = [f for f in REQUIRED_FIELDS if f not in course]
+        if missing:
+            self.errors.append(f"Course #{idx} ({name}) missing fields: {missing}")
+
+        level = course.get("level")
+        if level not in LEVEL_ORDER:
+            self.errors.append(f"Course #{idx} has invalid level: {level}")
+
+        points = course.get("min_cluster_points", 0)
+        expected_min = LEVEL_MIN_POINTS.get(level, 0)
+        if points < expected_min:
+            self.errors.append(
+                f"Course #{idx} ({name}) has insufficient "
+                f"cluster points ({points}) for {level} (minimum: {expected_min})"
+            )
+
+        if len(course.get("description", "").strip()) < 100:
+            self.warnings.append(f"Course #{idx} ({name}) has short description")
+        if len(course.get("career_path", "").strip()) < 100:
+            self.warnings.append(f"Course #{idx} ({name}) has short career path")
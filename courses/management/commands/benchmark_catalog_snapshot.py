@@ -0,0 +1,118 @@
+import json
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from django.core.management.base import BaseCommand
+from django.conf import settings
+
+from courses.generation import GRADE_RANKS, JsonArrayWriter, canonical_path, iter_db
+from courses.snapshot import CatalogSnapshot, SnapshotWriter
+
+
+def current_rss_kb():
+    """Resident set size of this process in KiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure_json(filename):
+    """Loads the JSON catalog the way consumers do today and builds the same lookup columns."""
+    before = current_rss_kb()
+    start = time.perf_counter()
+    with open(filename, 'r', encoding='utf-8') as f:
+        programs = json.load(f)
+    rows = [
+        (p['program_name'], p['level'], canonical_path(p['path']),
+         GRADE_RANKS.get(p['min_mean_grade'], 0), float(p['min_cluster_points']))
+        for p in programs
+    ]
+    load_time = time.perf_counter() - start
+    rss = current_rss_kb() - before
+
+    start = time.perf_counter()
+    qualified = sum(1 for row in rows if row[3] <= 7 and row[4] <= 30.0)
+    scan_time = time.perf_counter() - start
+    return load_time, rss, scan_time, qualified
+
+
+def measure_snapshot(filename):
+    """Maps the snapshot and scans the same columns."""
+    before = current_rss_kb()
+    start = time.perf_counter()
+    snapshot = CatalogSnapshot(filename)
+    load_time = time.perf_counter() - start
+    rss = current_rss_kb() - before
+
+    start = time.perf_counter()
+    ranks, points = snapshot._grade_ranks, snapshot._cluster_points
+    qualified = sum(1 for i in range(len(snapshot)) if ranks[i] <= 7 and points[i] <= 30.0)
+    scan_time = time.perf_counter() - start
+    return load_time, rss, scan_time, qualified
+
+
+class Command(BaseCommand):
+    help = "Compares load time and memory of the JSON catalog against the binary catalog snapshot."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--courses',
+            type=int,
+            default=20000,
+            help='Size of the synthetic catalog, built by repeating courses_db.json (default: 20000)'
+        )
+        parser.add_argument(
+            '--source',
+            type=str,
+            default=os.path.join(settings.BASE_DIR, "courses_db.json"),
+            help='Generator JSON to use as the template programs'
+        )
+
+    def handle(self, *args, **options):
+        templates = list(iter_db(options['source']))
+        if not templates:
+            self.stdout.write(self.style.ERROR(f"No programs found in {options['source']}"))
+            return
+
+        with tempfile.TemporaryDirectory() as tmp:
+            json_file = os.path.join(tmp, 'catalog.json')
+            snapshot_file = os.path.join(tmp, 'catalog.snapshot')
+
+            # 1. Build both formats from the same synthetic programs
+            writer = JsonArrayWriter(json_file)
+            snapshot = SnapshotWriter()
+            for i in range(options['courses']):
+                program = dict(templates[i % len(templates)])
+                program['program_name'] = f"{program['program_name']} #{i}"
+                writer.write(program)
+                snapshot.add(program['program_name'], program['level'], canonical_path(program['path']),
+                             GRADE_RANKS.get(program['min_mean_grade'], 0), program['min_cluster_points'])
+            writer.commit()
+            snapshot.write(snapshot_file)
+
+            # 2. Measure each in a fresh interpreter so RSS is not shared between runs
+            ctx = multiprocessing.get_context('spawn')
+            with ctx.Pool(1) as pool:
+                json_result = pool.apply(measure_json, (json_file,))
+            with ctx.Pool(1) as pool:
+                snapshot_result = pool.apply(measure_snapshot, (snapshot_file,))
+
+            sizes = (os.path.getsize(json_file), os.path.getsize(snapshot_file))
+
+        self.stdout.write(f"\nCatalog of {options['courses']} courses\n")
+        self.stdout.write(f"{'':12s} {'file size':>12s} {'load':>10s} {'RSS added':>12s} {'full scan':>10s}")
+        for label, size, (load_time, rss, scan_time, qualified) in (
+            ('JSON', sizes[0], json_result),
+            ('Snapshot', sizes[1], snapshot_result),
+        ):
+            self.stdout.write(
+                f"{label:12s} {size / 1024:>9.0f} KiB {load_time * 1000:>7.1f} ms "
+                f"{rss:>8d} KiB {scan_time * 1000:>7.1f} ms"
+            )
+        if json_result[3] != snapshot_result[3]:
+            self.stdout.write(self.style.ERROR("Formats disagree on the scan result!"))
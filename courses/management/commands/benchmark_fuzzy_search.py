@@ -0,0 +1,99 @@
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.fuzzy import fuzzy_matches, reset_trigram_index, trigrams
+from courses.models import Course
+
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def misspell(word, rng):
+    """One typo of the kinds students make: a dropped, doubled, swapped or wrong letter."""
+    i = rng.randrange(1, len(word) - 1)  # first letter kept, as people rarely get it wrong
+    kind = rng.choice(('drop', 'double', 'swap', 'replace'))
+    if kind == 'drop':
+        return word[:i] + word[i + 1:]
+    if kind == 'double':
+        return word[:i] + word[i] + word[i:]
+    if kind == 'swap':
+        return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+    return word[:i] + rng.choice(LETTERS.replace(word[i], '')) + word[i + 1:]
+
+
+class Command(BaseCommand):
+    help = ("Measures recall and latency of fuzzy course search against plain icontains "
+            "on a corpus of misspelt words taken from the Course table.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queries',
+            type=int,
+            default=500,
+            help='Number of misspelt queries (default: 500)'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=10,
+            help='A query counts as found when a course named with the right word is in the top N (default: 10)'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for the corpus (default: 42)'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        names = list(Course.objects.values_list('id', 'name'))
+        if not names:
+            raise CommandError("No courses to search: load the catalog first (load_courses_json)")
+        name_of = dict(names)
+
+        # 1. Corpus: real words from course names (5+ letters), each with one typo
+        vocabulary = sorted({
+            word for _, name in names for word in name.lower().split() if len(word) >= 5 and word.isalpha()
+        })
+        corpus = []
+        while len(corpus) < options['queries']:
+            word = rng.choice(vocabulary)
+            typo = misspell(word, rng)
+            if typo != word:
+                corpus.append((word, typo))
+
+        # 2. Index build (first query of a worker)
+        reset_trigram_index()
+        start = time.perf_counter()
+        fuzzy_matches('warm up')
+        build_time = time.perf_counter() - start
+
+        # 3. Recall and latency
+        fuzzy_hits = plain_hits = 0
+        fuzzy_times, plain_times = [], []
+        for word, typo in corpus:
+            start = time.perf_counter()
+            matches = fuzzy_matches(typo)
+            fuzzy_times.append(time.perf_counter() - start)
+            top = matches[:options['top']]
+            if any(word in name_of[course_id].lower().split() for course_id, _ in top):
+                fuzzy_hits += 1
+
+            start = time.perf_counter()
+            found = Course.objects.filter(name__icontains=typo).exists()
+            plain_times.append(time.perf_counter() - start)
+            plain_hits += found
+
+        self.stdout.write(f"\n{len(names)} courses, {len(vocabulary)} distinct words, {len(corpus)} misspelt queries")
+        self.stdout.write(f"Trigram index build: {build_time * 1000:.0f} ms "
+                          f"({len(trigrams(' '.join(vocabulary)))} distinct trigrams)\n")
+        self.stdout.write(f"{'':10s} {'recall':>8s} {'p50':>9s} {'p95':>9s} {'max':>9s}")
+        for label, hits, times in (('icontains', plain_hits, plain_times), ('trigram', fuzzy_hits, fuzzy_times)):
+            times = sorted(times)
+            p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+            self.stdout.write(
+                f"{label:10s} {hits / len(corpus):>7.1%} {statistics.median(times) * 1000:>6.2f} ms "
+                f"{p95 * 1000:>6.2f} ms {times[-1] * 1000:>6.2f} ms"
+            )
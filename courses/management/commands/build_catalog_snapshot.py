@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.conf import settings
+
+from courses.catalog import write_catalog_snapshot
+
+
+class Command(BaseCommand):
+    help = "Writes the Course table to the memory-mapped catalog snapshot used for read-only lookups."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Snapshot file to write (default: settings.CATALOG_SNAPSHOT_PATH)'
+        )
+
+    def handle(self, *args, **options):
+        output = options['output'] or settings.CATALOG_SNAPSHOT_PATH
+        count = write_catalog_snapshot(output)
+        self.stdout.write(self.style.SUCCESS(f"Snapshot of {count} courses written to {output}"))
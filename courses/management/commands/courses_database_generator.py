@@ -8,40 +8,18 @@ Generates ALL qualification levels with detailed information:
 - ARTISAN: D- minimum (2 points)
 
 Version: 2.0 - Complete Edition 2025
+
+Usage (from the project root): python -m courses.management.commands.courses_database_generator
 """
 
-import json
 import os
 from datetime import datetime
-from typing import List, Dict
-
-DB_FILENAME = "courses_db.json"
+from typing import Dict, Iterator, List
 
-def load_db(filename: str = DB_FILENAME) -> List[Dict]:
-    """Load existing database or return empty list."""
-    if not os.path.exists(filename):
-        return []
-    with open(filename, "r", encoding="utf-8") as f:
-        return json.load(f)
+from courses.generation import DB_FILENAME, LEVEL_ORDER, CatalogBuild, ShardedExport, iter_db
 
-def save_db(courses: List[Dict], filename: str = DB_FILENAME):
-    """Save courses database to JSON file."""
-    with open(filename, "w", encoding="utf-8") as f:
-        json.dump(courses, f, ensure_ascii=False, indent=2)
+SNAPSHOT_FILENAME = os.path.join("exports", "catalog.snapshot")
 
-def deduplicate(existing: List[Dict], new: List[Dict]) -> List[Dict]:
-    """
-    Merge lists with no duplicates by (program_name, level).
-    Updates existing entries with new data.
-    """
-    key_map = {
-        (c["program_name"].strip().lower(), c["level"].strip().lower()): c 
-        for c in existing
-    }
-    for c in new:
-        key = (c["program_name"].strip().lower(), c["level"].strip().lower())
-        key_map[key] = c
-    return list(key_map.values())
 
 def make_program(
     program_name: str,
@@ -78,13 +56,12 @@ def make_program(
 # DEGREE PROGRAMS (Minimum: C+ / 7 points)
 # ============================================================
 
-def generate_degree_programs(self) -> List[Dict]:
+def generate_degree_programs() -> Iterator[Dict]:
     """Generate degree programs"""
     level = "Degree"
-    programs = []
 
     # COMPUTER SCIENCE & IT
-    programs.append(make_program(
+    yield make_program(
         "Bachelor of Science in Computer Science",
         level,
         "Science & IT > Computer Science",
@@ -121,9 +98,9 @@ def generate_degree_programs(self) -> List[Dict]:
         ),
         "4 years (8 semesters)",
         "University Senate / Commission for University Education (CUE)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Bachelor of Science in Information Technology",
         level,
         "Science & IT > Information Technology",
@@ -160,10 +137,10 @@ def generate_degree_programs(self) -> List[Dict]:
         ),
         "4 years (8 semesters)",
         "University Senate / CUE"
-    ))
+    )
 
     # ENGINEERING PROGRAMS
-    programs.append(make_program(
+    yield make_program(
         "Bachelor of Engineering (Electrical and Electronic Engineering)",
         level,
         "Engineering > Electrical & Electronic",
@@ -201,9 +178,9 @@ def generate_degree_programs(self) -> List[Dict]:
         ),
         "5 years (10 semesters)",
         "Engineers Board of Kenya (EBK) / CUE"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Bachelor of Engineering (Civil Engineering)",
         level,
         "Engineering > Civil",
@@ -243,9 +220,9 @@ def generate_degree_programs(self) -> List[Dict]:
         ),
         "5 years (10 semesters)",
         "Engineers Board of Kenya (EBK) / CUE"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Bachelor of Engineering (Mechanical Engineering)",
         level,
         "Engineering > Mechanical",
@@ -286,10 +263,10 @@ def generate_degree_programs(self) -> List[Dict]:
         ),
         "5 years (10 semesters)",
         "Engineers Board of Kenya (EBK) / CUE"
-    ))
+    )
 
     # BUSINESS & COMMERCE
-    programs.append(make_program(
+    yield make_program(
         "Bachelor of Commerce (Accounting)",
         level,
         "Business & Economics > Accounting",
@@ -331,9 +308,9 @@ def generate_degree_programs(self) -> List[Dict]:
         ),
         "4 years (8 semesters)",
         "University Senate / CUE / ICPAK exemptions"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Bachelor of Commerce (Finance)",
         level,
         "Business & Economics > Finance",
@@ -379,9 +356,9 @@ def generate_degree_programs(self) -> List[Dict]:
         ),
         "4 years (8 semesters)",
         "University Senate / CUE"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Bachelor of Business Administration",
         level,
         "Business & Economics > Management",
@@ -428,10 +405,10 @@ def generate_degree_programs(self) -> List[Dict]:
         ),
         "4 years (8 semesters)",
         "University Senate / CUE"
-    ))
+    )
 
     # HEALTH SCIENCES
-    programs.append(make_program(
+    yield make_program(
         "Bachelor of Medicine and Bachelor of Surgery (MBChB)",
         level,
         "Health Sciences > Medicine",
@@ -469,9 +446,9 @@ def generate_degree_programs(self) -> List[Dict]:
         ),
         "6 years (12 semesters including internship)",
         "Medical Practitioners and Dentists Council (MPDC) / CUE"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Bachelor of Pharmacy",
         level,
         "Health Sciences > Pharmacy",
@@ -513,9 +490,9 @@ def generate_degree_programs(self) -> List[Dict]:
         ),
         "5 years (10 semesters including internship)",
         "Pharmacy and Poisons Board (PPB) / CUE"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Bachelor of Science in Nursing",
         level,
         "Health Sciences > Nursing",
@@ -557,10 +534,10 @@ def generate_degree_programs(self) -> List[Dict]:
         ),
         "4 years (8 semesters)",
         "Nursing Council of Kenya (NCK) / CUE"
-    ))
+    )
 
     # EDUCATION
-    programs.append(make_program(
+    yield make_program(
         "Bachelor of Education (Science)",
         level,
         "Education > Science Education",
@@ -600,9 +577,9 @@ def generate_degree_programs(self) -> List[Dict]:
         ),
         "4 years (8 semesters)",
         "Teachers Service Commission (TSC) / CUE"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Bachelor of Education (Arts)",
         level,
         "Education > Arts Education",
@@ -642,22 +619,20 @@ def generate_degree_programs(self) -> List[Dict]:
         ),
         "4 years (8 semesters)",
         "Teachers Service Commission (TSC) / CUE"
-    ))
+    )
 
-    return programs
 
 
 # ============================================================
 # DIPLOMA PROGRAMS (Minimum: C- / 5 points)
 # ============================================================
 
-def generate_diploma_programs() -> List[Dict]:
+def generate_diploma_programs() -> Iterator[Dict]:
     """Generate comprehensive diploma programs."""
     level = "Diploma"
-    programs = []
 
     # ICT DIPLOMAS
-    programs.append(make_program(
+    yield make_program(
         "Diploma in Information Technology",
         level,
         "ICT > Information Technology",
@@ -691,9 +666,9 @@ def generate_diploma_programs() -> List[Dict]:
         ),
         "2-3 years (4-6 semesters)",
         "KNEC / Technical and Vocational Education and Training Authority (TVETA)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Diploma in Software Engineering",
         level,
         "ICT > Software Engineering",
@@ -731,9 +706,9 @@ def generate_diploma_programs() -> List[Dict]:
         ),
         "2-3 years (4-6 semesters)",
         "KNEC / TVETA"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Diploma in Computer Networking",
         level,
         "ICT > Computer Networking",
@@ -772,10 +747,10 @@ def generate_diploma_programs() -> List[Dict]:
         ),
         "2-3 years (4-6 semesters)",
         "KNEC / TVETA / Cisco Academy alignment"
-    ))
+    )
 
     
-    programs.append(make_program(
+    yield make_program(
         "Diploma in Business Management",
         level,
         "Business > Management",
@@ -813,9 +788,9 @@ def generate_diploma_programs() -> List[Dict]:
         ),
         "2-3 years (4-6 semesters)",
         "KNEC / TVETA"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Diploma in Accounting",
         level,
         "Business > Accounting",
@@ -854,9 +829,9 @@ def generate_diploma_programs() -> List[Dict]:
         ),
         "2-3 years (4-6 semesters)",
         "KNEC / TVETA / ICPAK (some exemptions)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Diploma in Sales and Marketing",
         level,
         "Business > Marketing",
@@ -897,9 +872,9 @@ def generate_diploma_programs() -> List[Dict]:
         ),
         "2-3 years (4-6 semesters)",
         "KNEC / TVETA / CIM Kenya"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Diploma in Supply Chain Management",
         level,
         "Business > Supply Chain",
@@ -938,10 +913,10 @@ def generate_diploma_programs() -> List[Dict]:
         ),
         "2-3 years (4-6 semesters)",
         "KNEC / TVETA / KISM affiliation"
-    ))
+    )
 
     # ENGINEERING DIPLOMAS
-    programs.append(make_program(
+    yield make_program(
         "Diploma in Electrical and Electronic Engineering",
         level,
         "Engineering > Electrical & Electronic",
@@ -981,9 +956,9 @@ def generate_diploma_programs() -> List[Dict]:
         ),
         "3 years (6 semesters)",
         "KNEC / TVETA / Engineers Board of Kenya (Technician level)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Diploma in Civil Engineering",
         level,
         "Engineering > Civil",
@@ -1024,9 +999,9 @@ def generate_diploma_programs() -> List[Dict]:
         ),
         "3 years (6 semesters)",
         "KNEC / TVETA / Engineers Board of Kenya (Technician level)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Diploma in Mechanical Engineering",
         level,
         "Engineering > Mechanical",
@@ -1066,10 +1041,10 @@ def generate_diploma_programs() -> List[Dict]:
         ),
         "3 years (6 semesters)",
         "KNEC / TVETA / Engineers Board of Kenya (Technician level)"
-    ))
+    )
 
     # HEALTH SCIENCES DIPLOMAS
-    programs.append(make_program(
+    yield make_program(
         "Diploma in Clinical Medicine and Surgery",
         level,
         "Health Sciences > Clinical Medicine",
@@ -1109,9 +1084,9 @@ def generate_diploma_programs() -> List[Dict]:
         ),
         "3 years (6 semesters)",
         "Clinical Officers Council / KNEC / TVETA"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Diploma in Kenya Registered Community Health Nursing",
         level,
         "Health Sciences > Community Health Nursing",
@@ -1152,9 +1127,9 @@ def generate_diploma_programs() -> List[Dict]:
         ),
         "2.5-3 years (5-6 semesters)",
         "Nursing Council of Kenya / KNEC / TVETA"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Diploma in Pharmaceutical Technology",
         level,
         "Health Sciences > Pharmacy",
@@ -1196,25 +1171,23 @@ def generate_diploma_programs() -> List[Dict]:
         ),
         "3 years (6 semesters)",
         "Pharmacy and Poisons Board / KNEC / TVETA"
-    ))
+    )
 
-    return programs
 
 
 # ============================================================
 # CERTIFICATE PROGRAMS (Minimum: D+ / 4 points)
 # ============================================================
 
-def generate_certificate_programs() -> List[Dict]:
+def generate_certificate_programs() -> Iterator[Dict]:
     """
     Generate comprehensive Certificate (Craft) programs.
     Minimum requirement: D+ (4 points) in KCSE.
     """
     level = "Certificate"
-    programs = []
 
     # BUSINESS & MANAGEMENT CERTIFICATES
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Business Management",
         level,
         "Business & Management > Business Administration",
@@ -1255,9 +1228,9 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Human Resource Management",
         level,
         "Business & Management > Human Resource",
@@ -1301,9 +1274,9 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Sales and Marketing",
         level,
         "Business & Management > Sales & Marketing",
@@ -1350,9 +1323,9 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Supply Chain Management",
         level,
         "Business & Management > Supply Chain & Logistics",
@@ -1399,10 +1372,10 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # ICT & COMPUTING CERTIFICATES
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Information Communication Technology",
         level,
         "ICT & Computing > Information Technology",
@@ -1449,9 +1422,9 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Computer Hardware and Networking",
         level,
         "ICT & Computing > Computer Hardware & Networks",
@@ -1502,10 +1475,10 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # ENGINEERING & TECHNICAL CERTIFICATES
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Electrical and Electronic Engineering",
         level,
         "Engineering & Technology > Electrical & Electronics",
@@ -1559,10 +1532,10 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
   # CONTINUING ENGINEERING & TECHNICAL CERTIFICATES
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Mechanical Engineering",
         level,
         "Engineering & Technology > Mechanical Engineering",
@@ -1612,9 +1585,9 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Building and Civil Engineering",
         level,
         "Engineering & Technology > Civil & Construction",
@@ -1666,9 +1639,9 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Plumbing",
         level,
         "Engineering & Technology > Plumbing",
@@ -1722,10 +1695,10 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # HOSPITALITY & TOURISM CERTIFICATES
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Food and Beverage Sales and Service",
         level,
         "Hospitality & Tourism > Food & Beverage",
@@ -1778,9 +1751,9 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Food and Beverage Production",
         level,
         "Hospitality & Tourism > Culinary Arts",
@@ -1833,9 +1806,9 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Front Office Operations",
         level,
         "Hospitality & Tourism > Hotel Management",
@@ -1890,10 +1863,10 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # AGRICULTURE CERTIFICATES
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Agriculture",
         level,
         "Agriculture & Veterinary > Agriculture",
@@ -1951,9 +1924,9 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Veterinary Laboratory Technology",
         level,
         "Agriculture & Veterinary > Veterinary Science",
@@ -2005,10 +1978,10 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # EDUCATION & SOCIAL SERVICES CERTIFICATES
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Early Childhood Development and Education (ECDE)",
         level,
         "Education & Social Services > Early Childhood Education",
@@ -2061,9 +2034,9 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Certificate in Social Work and Community Development",
         level,
         "Education & Social Services > Social Work",
@@ -2115,25 +2088,23 @@ def generate_certificate_programs() -> List[Dict]:
         ),
         "1 year (2 semesters)",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    return programs
 
 
 # ============================================================
 # ARTISAN PROGRAMS (Minimum: D- / 2 points)
 # ============================================================
 
-def generate_artisan_programs() -> List[Dict]:
+def generate_artisan_programs() -> Iterator[Dict]:
     """
     Generate comprehensive Artisan (Craft) programs.
     Minimum requirement: D- (2 points) in KCSE.
     """
     level = "Artisan"
-    programs = []
 
     # CONSTRUCTION & BUILDING ARTISAN
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Masonry",
         level,
         "Construction & Building Trades > Masonry",
@@ -2185,9 +2156,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months to 1 year",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Carpentry and Joinery",
         level,
         "Construction & Building Trades > Carpentry",
@@ -2242,9 +2213,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months to 1 year",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Plumbing",
         level,
         "Construction & Building Trades > Plumbing",
@@ -2300,9 +2271,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months to 1 year",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Electrical Installation",
         level,
         "Construction & Building Trades > Electrical",
@@ -2359,10 +2330,10 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months to 1 year",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # MECHANICAL & AUTOMOTIVE ARTISAN
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Motor Vehicle Mechanics",
         level,
         "Automotive & Mechanical > Motor Vehicle",
@@ -2422,9 +2393,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months to 1 year",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Welding and Fabrication",
         level,
         "Automotive & Mechanical > Welding",
@@ -2483,10 +2454,10 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months to 1 year",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # BEAUTY & PERSONAL CARE ARTISAN
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Hairdressing and Beauty Therapy",
         level,
         "Beauty & Personal Care > Hairdressing",
@@ -2544,10 +2515,10 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months to 1 year",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # TAILORING & FASHION ARTISAN
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Dress Making and Tailoring",
         level,
         "Fashion & Design > Tailoring",
@@ -2605,10 +2576,10 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months to 1 year",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # FOOD PRODUCTION ARTISAN
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Food and Beverage Production",
         level,
         "Hospitality & Food Service > Food Production",
@@ -2661,10 +2632,10 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months to 1 year",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # ICT ARTISAN
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Information Communication Technology",
         level,
         "ICT & Computing > Basic ICT",
@@ -2687,10 +2658,10 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months to 1 year",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # ADDITIONAL CONSTRUCTION ARTISAN
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Painting and Decoration",
         level,
         "Construction & Building Trades > Painting",
@@ -2710,9 +2681,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Tiling and Floor Laying",
         level,
         "Construction & Building Trades > Tiling",
@@ -2732,9 +2703,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Aluminium and Glass Work",
         level,
         "Construction & Building Trades > Aluminium & Glass",
@@ -2755,9 +2726,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months to 1 year",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Steelwork and Metal Roofing",
         level,
         "Construction & Building Trades > Roofing",
@@ -2776,10 +2747,10 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # ADDITIONAL AUTOMOTIVE ARTISAN
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Auto Electrical Work",
         level,
         "Automotive & Mechanical > Auto Electrical",
@@ -2800,9 +2771,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months to 1 year",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Panel Beating and Spray Painting",
         level,
         "Automotive & Mechanical > Body Work",
@@ -2821,9 +2792,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months to 1 year",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Motorcycle Mechanics",
         level,
         "Automotive & Mechanical > Motorcycle",
@@ -2842,10 +2813,10 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # TEXTILE & LEATHER ARTISAN
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Shoe Making and Repair",
         level,
         "Fashion & Design > Footwear",
@@ -2864,9 +2835,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Upholstery",
         level,
         "Fashion & Design > Upholstery",
@@ -2885,9 +2856,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Leather Work and Bag Making",
         level,
         "Fashion & Design > Leather Craft",
@@ -2906,10 +2877,10 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # AGRICULTURAL ARTISAN
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Greenhouse Construction and Management",
         level,
         "Agriculture & Horticulture > Greenhouse",
@@ -2928,9 +2899,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Poultry Production",
         level,
         "Agriculture & Veterinary > Poultry",
@@ -2949,9 +2920,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Dairy Production and Management",
         level,
         "Agriculture & Veterinary > Dairy",
@@ -2970,9 +2941,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Beekeeping",
         level,
         "Agriculture & Horticulture > Beekeeping",
@@ -2991,10 +2962,10 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # BEAUTY & PERSONAL CARE ARTISAN
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Barbering",
         level,
         "Beauty & Personal Care > Barbering",
@@ -3013,9 +2984,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "3-6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Nail Technology",
         level,
         "Beauty & Personal Care > Nail Care",
@@ -3034,9 +3005,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "3-6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Makeup Artistry",
         level,
         "Beauty & Personal Care > Makeup",
@@ -3055,10 +3026,10 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "3-6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # HOSPITALITY & FOOD ARTISAN
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Pastry and Baking",
         level,
         "Hospitality & Food Service > Baking",
@@ -3077,9 +3048,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Butchery",
         level,
         "Hospitality & Food Service > Butchery",
@@ -3098,10 +3069,10 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # ELECTRONICS ARTISAN
-    programs.append(make_program(
+    yield make_program(
         "Artisan in Mobile Phone Repair",
         level,
         "ICT & Electronics > Phone Repair",
@@ -3120,9 +3091,9 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "3-6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
-    programs.append(make_program(
+    yield make_program(
         "Artisan in TV and Electronics Repair",
         level,
         "ICT & Electronics > Electronics Repair",
@@ -3143,10 +3114,10 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
+    )
 
     # SECURITY & SAFETY ARTISAN
-    programs.append(make_program(
+    yield make_program(
         "Artisan in CCTV Installation and Maintenance",
         level,
         "Security & Technology > CCTV",
@@ -3166,61 +3137,29 @@ def generate_artisan_programs() -> List[Dict]:
         ),
         "3-6 months",
         "Kenya National Examinations Council (KNEC)"
-    ))
-   
-   # ============================================================================
+    )
+
+
+# ============================================================================
 # MAIN EXECUTION AND COORDINATION FUNCTIONS
 # ============================================================================
 
-def generate_all_courses() -> List[Dict]:
+def generate_all_courses() -> Iterator[Dict]:
     """
     Generate complete course database across all qualification levels.
-    Returns list of all courses combined.
+    Programs are yielded one at a time; per-level counts come from the build stats.
     """
-    all_courses = []
-    
     print("🎓 Generating DEGREE programs...")
-    all_courses.extend(generate_degree_programs())
-    print(f"   ✅ Generated {len([c for c in all_courses if c['level'] == 'Degree'])} degree programs")
-    
+    yield from generate_degree_programs()
+
     print("📜 Generating DIPLOMA programs...")
-    all_courses.extend(generate_diploma_programs())
-    print(f"   ✅ Generated {len([c for c in all_courses if c['level'] == 'Diploma'])} diploma programs")
-    
-    print("📋 Generating CERTIFICATE programs...")
-    all_courses.extend(generate_certificate_programs())
-    print(f"   ✅ Generated {len([c for c in all_courses if c['level'] == 'Certificate'])} certificate programs")
-    
-    print("🔧 Generating ARTISAN programs...")
-    all_courses.extend(generate_artisan_programs())
-    print(f"   ✅ Generated {len([c for c in all_courses if c['level'] == 'Artisan'])} artisan programs")
-    
-    return all_courses
+    yield from generate_diploma_programs()
 
+    print("📋 Generating CERTIFICATE programs...")
+    yield from generate_certificate_programs()
 
-def get_database_statistics(courses: List[Dict]) -> Dict:
-    """Generate statistics about the course database."""
-    stats = {
-        "total_courses": len(courses),
-        "by_level": {},
-        "by_path": {},
-        "by_exam_body": {},
-        "by_duration": {}
-    }
-    
-    # Count by level
-    for course in courses:
-        level = course["level"]
-        path = course["path"]
-        exam_body = course["exam_body"]
-        duration = course["duration"]
-        
-        stats["by_level"][level] = stats["by_level"].get(level, 0) + 1
-        stats["by_path"][path] = stats["by_path"].get(path, 0) + 1
-        stats["by_exam_body"][exam_body] = stats["by_exam_body"].get(exam_body, 0) + 1
-        stats["by_duration"][duration] = stats["by_duration"].get(duration, 0) + 1
-    
-    return stats
+    print("🔧 Generating ARTISAN programs...")
+    yield from generate_artisan_programs()
 
 
 def print_statistics(stats: Dict):
@@ -3231,8 +3170,7 @@ def print_statistics(stats: Dict):
     print(f"\n✅ Total Courses: {stats['total_courses']}")
     
     print("\n📚 By Qualification Level:")
-    level_order = ["Degree", "Diploma", "Certificate", "Artisan"]
-    for level in level_order:
+    for level in LEVEL_ORDER:
         count = stats['by_level'].get(level, 0)
         if count > 0:
             print(f"   • {level}: {count} programs")
@@ -3249,54 +3187,13 @@ def print_statistics(stats: Dict):
     print("="*70 + "\n")
 
 
-def validate_database(courses: List[Dict]) -> bool:
+def print_validation(errors: List[str], warnings: List[str]) -> bool:
     """
-    Validate database integrity.
-    Returns True if all validations pass, False otherwise.
+    Print the problems found while building the database.
+    Returns True if there were no errors, False otherwise.
     """
     print("\n🔍 Validating database integrity...")
-    
-    required_fields = [
-        "program_name", "level", "path", "min_mean_grade",
-        "min_cluster_points", "subject_requirements", "description",
-        "career_path", "duration", "exam_body", "metadata"
-    ]
-    
-    valid_levels = ["Degree", "Diploma", "Certificate", "Artisan"]
-    errors = []
-    warnings = []
-    
-    for idx, course in enumerate(courses):
-        # Check required fields
-        missing = [f for f in required_fields if f not in course]
-        if missing:
-            errors.append(f"Course #{idx+1} ({course.get('program_name', 'Unknown')}) missing fields: {missing}")
-        
-        # Validate level
-        if course.get("level") not in valid_levels:
-            errors.append(f"Course #{idx+1} has invalid level: {course.get('level')}")
-        
-        # Validate cluster points against level minimums
-        level_min_points = {
-            "Degree": 7, "Diploma": 5, "Certificate": 4, "Artisan": 2
-        }
-        level = course.get("level")
-        points = course.get("min_cluster_points", 0)
-        expected_min = level_min_points.get(level, 0)
-        
-        if points < expected_min:
-            errors.append(
-                f"Course #{idx+1} ({course.get('program_name')}) has insufficient "
-                f"cluster points ({points}) for {level} (minimum: {expected_min})"
-            )
-        
-        # Check for empty descriptions or career paths
-        if len(course.get("description", "").strip()) < 100:
-            warnings.append(f"Course #{idx+1} ({course.get('program_name')}) has short description")
-        
-        if len(course.get("career_path", "").strip()) < 100:
-            warnings.append(f"Course #{idx+1} ({course.get('program_name')}) has short career path")
-    
+
     if errors:
         print("❌ Validation FAILED:")
         for error in errors[:10]:  # Show first 10 errors
@@ -3304,66 +3201,31 @@ def validate_database(courses: List[Dict]) -> bool:
         if len(errors) > 10:
             print(f"   ... and {len(errors)-10} more errors")
         return False
-    
+
     if warnings:
         print("⚠️  Warnings found:")
         for warning in warnings[:5]:  # Show first 5 warnings
             print(f"   • {warning}")
         if len(warnings) > 5:
             print(f"   ... and {len(warnings)-5} more warnings")
-    
+
     print("✅ Validation PASSED - Database is valid!")
     return True
 
 
-def export_by_level(courses: List[Dict], output_dir: str = "exports"):
-    """Export courses to separate files by qualification level."""
-    os.makedirs(output_dir, exist_ok=True)
-    
-    by_level = {}
-    for course in courses:
-        level = course["level"]
-        if level not in by_level:
-            by_level[level] = []
-        by_level[level].append(course)
-    
-    print("\n📤 Exporting by level:")
-    for level, level_courses in sorted(by_level.items()):
-        filename = os.path.join(output_dir, f"{level.lower()}_courses.json")
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(level_courses, f, ensure_ascii=False, indent=2)
-        print(f"   ✅ {level}: {len(level_courses)} courses → {filename}")
+def print_exports(exports: ShardedExport):
+    """Print the NDJSON export shards written (or left unchanged) by the build."""
+    print("\n📤 Exporting by level and career path:")
+    counts = exports.counts()
+    for shard in exports.written[:10]:  # Show first 10
+        print(f"   ✅ {counts[shard]} courses → {os.path.join(exports.output_dir, shard)}")
+    if len(exports.written) > 10:
+        print(f"   ... and {len(exports.written) - 10} more shards")
+    print(f"   {len(exports.unchanged)} unchanged shards skipped")
+    print(f"   ✅ Offset index → {os.path.join(exports.output_dir, exports.INDEX_FILENAME)}")
 
 
-def export_by_path(courses: List[Dict], output_dir: str = "exports"):
-    """Export courses to separate files by career path."""
-    os.makedirs(output_dir, exist_ok=True)
-    
-    by_path = {}
-    for course in courses:
-        # Get the main path (first part before >)
-        path = course["path"].split(">")[0].strip()
-        if path not in by_path:
-            by_path[path] = []
-        by_path[path].append(course)
-    
-    print("\n📤 Exporting by career path:")
-    exported_count = 0
-    for path, path_courses in sorted(by_path.items()):
-        safe_path = path.replace("/", "_").replace(" ", "_").lower()
-        safe_path = "".join(c for c in safe_path if c.isalnum() or c == "_")
-        filename = os.path.join(output_dir, f"path_{safe_path}.json")
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(path_courses, f, ensure_ascii=False, indent=2)
-        if exported_count < 10:  # Show first 10
-            print(f"   ✅ {path}: {len(path_courses)} courses → {filename}")
-        exported_count += 1
-    
-    if exported_count > 10:
-        print(f"   ... and {exported_count - 10} more path files")
-
-
-def export_summary_report(courses: List[Dict], stats: Dict, output_dir: str = "exports"):
+def export_summary_report(stats: Dict, output_dir: str = "exports"):
     """Export a summary report in text format."""
     os.makedirs(output_dir, exist_ok=True)
     
@@ -3407,42 +3269,37 @@ def main():
     print("="*70)
     print(f"Started: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     
-    # Load existing database
-    print("📂 Loading existing database...")
-    existing_courses = load_db(DB_FILENAME)
-    print(f"   Found {len(existing_courses)} existing courses\n")
-    
-    # Generate new courses
+    # Generate, validate, count and write every file in a single pass.
+    # New programs win over existing ones with the same (program_name, level).
     print("🔄 Generating course database...\n")
-    new_courses = generate_all_courses()
+    build = CatalogBuild(DB_FILENAME, "exports", snapshot_filename=SNAPSHOT_FILENAME)
+    build.add_all(generate_all_courses())
     
-    # Merge and deduplicate
-    print(f"\n🔗 Merging databases...")
-    all_courses = deduplicate(existing_courses, new_courses)
-    print(f"   Total unique courses: {len(all_courses)}")
+    print("\n📂 Merging existing database...")
+    kept = build.add_all(iter_db(DB_FILENAME))
+    print(f"   Kept {kept} existing courses not generated this run")
+    print(f"   Total unique courses: {build.stats['total_courses']}")
     
     # Validate
-    if not validate_database(all_courses):
+    if not print_validation(build.errors, build.warnings):
         print("\n⚠️  Warning: Database contains validation errors!")
         response = input("Continue saving? (y/n): ")
         if response.lower() != 'y':
+            build.discard()
             print("❌ Aborted. Database not saved.")
             return
     
-    # Save main database
+    # Save main database and exports
     print(f"\n💾 Saving to {DB_FILENAME}...")
-    save_db(all_courses, DB_FILENAME)
+    build.commit()
     print(f"   ✅ Saved successfully!")
     
-    # Generate statistics
-    stats = get_database_statistics(all_courses)
-    print_statistics(stats)
+    print_statistics(build.stats)
     
-    # Export categorized files
     print("📤 Exporting categorized files...")
-    export_by_level(all_courses)
-    export_by_path(all_courses)
-    export_summary_report(all_courses, stats)
+    print_exports(build.exports)
+    export_summary_report(build.stats)
+    print(f"   ✅ Catalog snapshot → {SNAPSHOT_FILENAME}")
     
     print("\n" + "="*70)
     print("✨ DATABASE GENERATION COMPLETE!")
@@ -3450,7 +3307,7 @@ def main():
     print(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     print(f"📁 Main database: {DB_FILENAME}")
     print(f"📁 Exports folder: exports/")
-    print(f"📁 Total courses: {len(all_courses)}")
+    print(f"📁 Total courses: {build.stats['total_courses']}")
     print("\n💡 Use this database for:")
     print("   • Course recommendation systems")
     print("   • Student guidance platforms")
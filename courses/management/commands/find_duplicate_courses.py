@@ -0,0 +1,71 @@
+import csv
+import time
+from django.core.management.base import BaseCommand
+
+from courses.dedupe import (
+    MERGE_THRESHOLD, REVIEW_THRESHOLD, choose_keeper, course_rows, find_duplicates, merge_cluster, usage_counts,
+)
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = ("Finds near-duplicate courses (similar name, path and description at the same level) with MinHash/LSH. "
+            "Writes the clusters to a CSV for review, or merges them with --merge.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            type=str,
+            default='duplicate_courses.csv',
+            help='Review CSV to write (one row per course, grouped by cluster)'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=None,
+            help=f'Minimum estimated similarity (default {REVIEW_THRESHOLD}; {MERGE_THRESHOLD} with --merge)'
+        )
+        parser.add_argument(
+            '--merge',
+            action='store_true',
+            help='Merge every cluster into its most used course, repointing reviews, favourites and placements'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        threshold = options['threshold'] or (MERGE_THRESHOLD if options['merge'] else REVIEW_THRESHOLD)
+
+        # 1. Detect
+        clusters, skipped = find_duplicates(course_rows(), threshold=threshold)
+        duplicates = sum(len(cluster) - 1 for cluster in clusters)
+        self.stdout.write(
+            f"{len(clusters)} clusters ({duplicates} duplicate courses) at similarity >= {threshold} "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"{skipped} oversized LSH buckets skipped (boilerplate text)"))
+
+        # 2. Keepers: the most used course in each cluster
+        usage = usage_counts(course_id for cluster in clusters for course_id in cluster)
+        keepers = [choose_keeper(cluster, usage) for cluster in clusters]
+
+        if options['merge']:
+            for cluster, keeper in zip(clusters, keepers):
+                merge_cluster(cluster, keeper)
+            self.stdout.write(self.style.SUCCESS(f"Merged {duplicates} duplicates into {len(clusters)} courses"))
+            return
+
+        # 3. Review file
+        names = {}
+        ids = [course_id for cluster in clusters for course_id in cluster]
+        for i in range(0, len(ids), 2000):
+            for row in Course.objects.filter(id__in=ids[i:i + 2000]).values_list('id', 'name', 'level', 'path'):
+                names[row[0]] = row[1:]
+        with open(options['output'], 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['cluster', 'course_id', 'name', 'level', 'path', 'students', 'keep'])
+            for number, (cluster, keeper) in enumerate(zip(clusters, keepers), start=1):
+                for course_id in cluster:
+                    writer.writerow([number, course_id, *names[course_id], usage.get(course_id, 0),
+                                     'yes' if course_id == keeper else ''])
+        self.stdout.write(self.style.SUCCESS(f"Review file written to {options['output']}"))
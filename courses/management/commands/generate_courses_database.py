@@ -5,12 +5,11 @@ Usage: python manage.py generate_courses_database
 """
 
 from django.core.management.base import BaseCommand
-import json
 import os
 from datetime import datetime
-from typing import List, Dict
+from typing import Dict, Iterator, List
 
-DB_FILENAME = "courses_db.json"
+from courses.generation import DB_FILENAME, LEVEL_ORDER, CatalogBuild, iter_db
 
 class Command(BaseCommand):
     help = 'Generate comprehensive courses database for Kenya (Degree, Diploma, Certificate, Artisan)'
@@ -27,6 +26,17 @@ class Command(BaseCommand):
             action='store_true',
             help='Skip validation step'
         )
+        parser.add_argument(
+            '--snapshot',
+            type=str,
+            default=None,
+            help='Also write a binary catalog snapshot to this file (see courses/snapshot.py)'
+        )
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Use the complete catalog from courses_database_generator (imported only when requested)'
+        )
 
     def handle(self, *args, **options):
         """Main execution handler for Django management command"""
@@ -38,41 +48,50 @@ class Command(BaseCommand):
         output_file = options['output']
         skip_validation = options['skip_validation']
         
-        # Load existing database
-        self.stdout.write("📂 Loading existing database...")
-        existing_courses = self.load_db(output_file)
-        self.stdout.write(f"   Found {len(existing_courses)} existing courses\n")
+        if options['full']:
+            # The full generator is ~3.5k lines of literals; only load it when asked
+            from courses.management.commands import courses_database_generator
+            programs = courses_database_generator.generate_all_courses()
+        else:
+            programs = self.generate_all_courses()
         
-        # Generate new courses
+        # Generate, validate, count and write every file in a single pass.
+        # New programs win over existing ones with the same (program_name, level).
         self.stdout.write("🔄 Generating course database...\n")
-        new_courses = self.generate_all_courses()
+        build = CatalogBuild(output_file, "exports", validate=not skip_validation,
+                             snapshot_filename=options['snapshot'])
+        build.add_all(programs)
         
-        # Merge and deduplicate
-        self.stdout.write(f"\n🔗 Merging databases...")
-        all_courses = self.deduplicate(existing_courses, new_courses)
-        self.stdout.write(f"   Total unique courses: {len(all_courses)}")
+        self.stdout.write(f"\n🔗 Merging existing database...")
+        try:
+            kept = build.add_all(iter_db(output_file))
+        except ValueError:
+            self.stdout.write(self.style.WARNING("   Existing database is unreadable, ignoring the rest of it"))
+            kept = 0
+        self.stdout.write(f"   Kept {kept} existing courses not generated this run")
+        self.stdout.write(f"   Total unique courses: {build.stats['total_courses']}")
         
         # Validate
         if not skip_validation:
-            if not self.validate_database(all_courses):
+            if not self.print_validation(build.errors):
+                build.discard()
                 self.stdout.write(self.style.WARNING("\n⚠️  Warning: Database contains validation errors!"))
                 self.stdout.write("Use --skip-validation to save anyway")
                 return
         
-        # Save main database
+        # Save main database and exports
         self.stdout.write(f"\n💾 Saving to {output_file}...")
-        self.save_db(all_courses, output_file)
+        build.commit()
         self.stdout.write(self.style.SUCCESS(f"   ✅ Saved successfully!"))
         
-        # Generate statistics
-        stats = self.get_database_statistics(all_courses)
-        self.print_statistics(stats)
+        self.print_statistics(build.stats)
         
-        # Export categorized files
         self.stdout.write("📤 Exporting categorized files...")
-        self.export_by_level(all_courses)
-        self.export_by_path(all_courses)
-        self.export_summary_report(all_courses, stats)
+        self.stdout.write(f"   ✅ {len(build.exports.written)} NDJSON shards written, "
+                          f"{len(build.exports.unchanged)} unchanged (index: exports/index.json)")
+        self.export_summary_report(build.stats)
+        if options['snapshot']:
+            self.stdout.write(f"   ✅ Catalog snapshot → {options['snapshot']}")
         
         self.stdout.write("\n" + "="*70)
         self.stdout.write(self.style.SUCCESS("✨ DATABASE GENERATION COMPLETE!"))
@@ -80,38 +99,12 @@ class Command(BaseCommand):
         self.stdout.write(f"Completed: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         self.stdout.write(f"📁 Main database: {output_file}")
         self.stdout.write(f"📁 Exports folder: exports/")
-        self.stdout.write(f"📁 Total courses: {len(all_courses)}\n")
+        self.stdout.write(f"📁 Total courses: {build.stats['total_courses']}\n")
 
     # ============================================================================
     # UTILITY FUNCTIONS
     # ============================================================================
 
-    def load_db(self, filename: str) -> List[Dict]:
-        """Load existing database or return empty list."""
-        if not os.path.exists(filename):
-            return []
-        try:
-            with open(filename, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except:
-            return []
-
-    def save_db(self, courses: List[Dict], filename: str):
-        """Save courses database to JSON file."""
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(courses, f, ensure_ascii=False, indent=2)
-
-    def deduplicate(self, existing: List[Dict], new: List[Dict]) -> List[Dict]:
-        """Merge lists with no duplicates by (program_name, level)."""
-        key_map = {
-            (c["program_name"].strip().lower(), c["level"].strip().lower()): c 
-            for c in existing
-        }
-        for c in new:
-            key = (c["program_name"].strip().lower(), c["level"].strip().lower())
-            key_map[key] = c
-        return list(key_map.values())
-
     def make_program(
         self,
         program_name: str,
@@ -148,39 +141,26 @@ class Command(BaseCommand):
     # COURSE GENERATION FUNCTIONS
     # ============================================================================
 
-    def generate_all_courses(self) -> List[Dict]:
-        """Generate complete course database across all qualification levels."""
-        all_courses = []
-        
+    def generate_all_courses(self) -> Iterator[Dict]:
+        """Generate complete course database across all qualification levels, one program at a time."""
         self.stdout.write("🎓 Generating DEGREE programs...")
-        degree_courses = self.generate_degree_programs()
-        all_courses.extend(degree_courses)
-        self.stdout.write(f"   ✅ Generated {len(degree_courses)} degree programs")
+        yield from self.generate_degree_programs()
         
         self.stdout.write("📜 Generating DIPLOMA programs...")
-        diploma_courses = self.generate_diploma_programs()
-        all_courses.extend(diploma_courses)
-        self.stdout.write(f"   ✅ Generated {len(diploma_courses)} diploma programs")
+        yield from self.generate_diploma_programs()
         
         self.stdout.write("📋 Generating CERTIFICATE programs...")
-        certificate_courses = self.generate_certificate_programs()
-        all_courses.extend(certificate_courses)
-        self.stdout.write(f"   ✅ Generated {len(certificate_courses)} certificate programs")
+        yield from self.generate_certificate_programs()
         
         self.stdout.write("🔧 Generating ARTISAN programs...")
-        artisan_courses = self.generate_artisan_programs()
-        all_courses.extend(artisan_courses)
-        self.stdout.write(f"   ✅ Generated {len(artisan_courses)} artisan programs")
-        
-        return all_courses
+        yield from self.generate_artisan_programs()
 
-    def generate_degree_programs(self) -> List[Dict]:
+    def generate_degree_programs(self) -> Iterator[Dict]:
         """Generate comprehensive degree programs."""
         level = "Degree"
-        programs = []
 
         # COMPUTER SCIENCE & IT
-        programs.append(self.make_program(
+        yield self.make_program(
             "Bachelor of Science in Computer Science",
             level,
             "Science & IT > Computer Science",
@@ -196,9 +176,9 @@ class Command(BaseCommand):
             "Graduates pursue diverse careers as software developers/engineers, full-stack developers, mobile app developers, systems analysts, database administrators, network engineers, data scientists, machine learning engineers, AI specialists, cybersecurity analysts, DevOps engineers, cloud architects, or IT consultants. Starting salaries range from KSh 60,000-150,000 monthly.",
             "4 years (8 semesters)",
             "University Senate / Commission for University Education (CUE)"
-        ))
+        )
 
-        programs.append(self.make_program(
+        yield self.make_program(
             "Bachelor of Science in Information Technology",
             level,
             "Science & IT > Information Technology",
@@ -214,10 +194,10 @@ class Command(BaseCommand):
             "Graduates work as IT support specialists, systems administrators, network administrators, web developers, mobile application developers, database administrators, cloud engineers, cybersecurity analysts, IT project coordinators, or IT consultants. Starting salaries range from KSh 50,000-110,000 monthly.",
             "4 years (8 semesters)",
             "University Senate / CUE"
-        ))
+        )
 
         # ENGINEERING PROGRAMS
-        programs.append(self.make_program(
+        yield self.make_program(
             "Bachelor of Engineering (Electrical and Electronic Engineering)",
             level,
             "Engineering > Electrical & Electronic",
@@ -233,9 +213,9 @@ class Command(BaseCommand):
             "Career opportunities include electrical design engineer, power systems engineer, telecommunications engineer, automation and control engineer, instrumentation engineer, renewable energy consultant, electrical maintenance engineer, project engineer, or consulting engineer. Starting salaries: KSh 70,000-180,000 monthly.",
             "5 years (10 semesters)",
             "Engineers Board of Kenya (EBK) / CUE"
-        ))
+        )
 
-        programs.append(self.make_program(
+        yield self.make_program(
             "Bachelor of Engineering (Civil Engineering)",
             level,
             "Engineering > Civil",
@@ -251,10 +231,10 @@ class Command(BaseCommand):
             "Graduates pursue careers as structural engineers, site engineers, resident engineers, consulting engineers, highway engineers, water and sanitation engineers, geotechnical engineers, project managers, construction managers, or quantity surveyors. Starting salaries: KSh 70,000-200,000 monthly.",
             "5 years (10 semesters)",
             "Engineers Board of Kenya (EBK) / CUE"
-        ))
+        )
 
         # BUSINESS & COMMERCE
-        programs.append(self.make_program(
+        yield self.make_program(
             "Bachelor of Commerce (Accounting)",
             level,
             "Business & Economics > Accounting",
@@ -269,9 +249,9 @@ class Command(BaseCommand):
             "Graduates pursue careers as accountants, auditors, tax consultants, financial analysts, management accountants, budget analysts, financial controllers, or accounting information systems specialists. Starting salaries: KSh 45,000-100,000 monthly. Most pursue CPA (K) certification for enhanced career prospects.",
             "4 years (8 semesters)",
             "University Senate / CUE / ICPAK exemptions"
-        ))
+        )
 
-        programs.append(self.make_program(
+        yield self.make_program(
             "Bachelor of Commerce (Finance)",
             level,
             "Business & Economics > Finance",
@@ -286,19 +266,17 @@ class Command(BaseCommand):
             "Graduates pursue careers as financial analysts, investment analysts, equity research analysts, portfolio managers, credit analysts, relationship managers, treasury officers, financial planners, risk managers, stockbrokers, or fintech specialists. Starting salaries: KSh 50,000-120,000 monthly.",
             "4 years (8 semesters)",
             "University Senate / CUE"
-        ))
+        )
 
         # Add more degree programs here following the same pattern...
         
-        return programs
 
-    def generate_diploma_programs(self) -> List[Dict]:
+    def generate_diploma_programs(self) -> Iterator[Dict]:
         """Generate comprehensive diploma programs."""
         level = "Diploma"
-        programs = []
 
         # ICT DIPLOMAS
-        programs.append(self.make_program(
+        yield self.make_program(
             "Diploma in Information Technology",
             level,
             "ICT > Information Technology",
@@ -313,9 +291,9 @@ class Command(BaseCommand):
             "Graduates work as IT support technicians, computer lab technicians, network administrators, web developers, database assistants, system administrators, help desk officers, or ICT teachers in colleges. Starting salaries: KSh 25,000-50,000 monthly.",
             "2-3 years (4-6 semesters)",
             "KNEC / TVETA"
-        ))
+        )
 
-        programs.append(self.make_program(
+        yield self.make_program(
             "Diploma in Business Management",
             level,
             "Business > Management",
@@ -330,18 +308,16 @@ class Command(BaseCommand):
             "Graduates work as administrative assistants, office administrators, supervisors, junior managers, sales representatives, customer service officers, operations assistants, or start their own small businesses. Starting salaries: KSh 20,000-45,000 monthly.",
             "2-3 years (4-6 semesters)",
             "KNEC / TVETA"
-        ))
+        )
 
         # Add more diploma programs...
         
-        return programs
 
-    def generate_certificate_programs(self) -> List[Dict]:
+    def generate_certificate_programs(self) -> Iterator[Dict]:
         """Generate comprehensive certificate programs."""
         level = "Certificate"
-        programs = []
 
-        programs.append(self.make_program(
+        yield self.make_program(
             "Certificate in Business Management",
             level,
             "Business & Management > Business Administration",
@@ -356,9 +332,9 @@ class Command(BaseCommand):
             "Graduates secure employment as office assistants, administrative clerks, receptionists, customer service representatives, sales assistants, store clerks, cashiers, or start small businesses. Starting salaries: KSh 15,000-30,000 monthly.",
             "1 year (2 semesters)",
             "Kenya National Examinations Council (KNEC)"
-        ))
+        )
 
-        programs.append(self.make_program(
+        yield self.make_program(
             "Certificate in Information Communication Technology",
             level,
             "ICT & Computing > Information Technology",
@@ -373,18 +349,16 @@ class Command(BaseCommand):
             "Graduates secure employment as computer operators, data entry clerks, office assistants, cyber café attendants, IT support assistants, or computer lab assistants. Starting salaries: KSh 15,000-28,000 monthly.",
             "1 year (2 semesters)",
             "Kenya National Examinations Council (KNEC)"
-        ))
+        )
 
         # Add more certificate programs...
         
-        return programs
 
-    def generate_artisan_programs(self) -> List[Dict]:
+    def generate_artisan_programs(self) -> Iterator[Dict]:
         """Generate comprehensive artisan programs."""
         level = "Artisan"
-        programs = []
 
-        programs.append(self.make_program(
+        yield self.make_program(
             "Artisan in Masonry",
             level,
             "Construction & Building Trades > Masonry",
@@ -395,9 +369,9 @@ class Command(BaseCommand):
             "Graduates work as masons, bricklayers, blocklayers, or self-employed contractors. Daily rates: KSh 1,000-1,500. Skilled masons typically earn KSh 25,000-60,000 monthly. Strong demand in construction sector.",
             "6 months to 1 year",
             "Kenya National Examinations Council (KNEC)"
-        ))
+        )
 
-        programs.append(self.make_program(
+        yield self.make_program(
             "Artisan in Carpentry and Joinery",
             level,
             "Construction & Building Trades > Carpentry",
@@ -408,9 +382,9 @@ class Command(BaseCommand):
             "Graduates work as carpenters, joiners, furniture makers, or self-employed. Daily rates: KSh 1,000-2,000. Skilled carpenters earn KSh 30,000-80,000 monthly. High demand with construction activities.",
             "6 months to 1 year",
             "Kenya National Examinations Council (KNEC)"
-        ))
+        )
 
-        programs.append(self.make_program(
+        yield self.make_program(
             "Artisan in Motor Vehicle Mechanics",
             level,
             "Automotive & Mechanical > Motor Vehicle",
@@ -421,9 +395,9 @@ class Command(BaseCommand):
             "Graduates work as motor vehicle mechanics, auto mechanics, or self-employed. Daily rates: KSh 1,200-2,500. Skilled mechanics earn KSh 30,000-75,000 monthly. Strong demand with large vehicle population.",
             "6 months to 1 year",
             "Kenya National Examinations Council (KNEC)"
-        ))
+        )
 
-        programs.append(self.make_program(
+        yield self.make_program(
             "Artisan in Hairdressing and Beauty Therapy",
             level,
             "Beauty & Personal Care > Hairdressing",
@@ -434,36 +408,15 @@ class Command(BaseCommand):
             "Graduates work as hairdressers, beauticians, salon assistants, or own salons. Salon owners can earn KSh 50,000-300,000+ monthly. Independent stylists charge per service earning KSh 40,000-100,000+ monthly.",
             "6 months to 1 year",
             "Kenya National Examinations Council (KNEC)"
-        ))
+        )
 
         # Add more artisan programs...
         
-        return programs
 
     # ============================================================================
     # VALIDATION AND STATISTICS
     # ============================================================================
 
-    def get_database_statistics(self, courses: List[Dict]) -> Dict:
-        """Generate statistics about the course database."""
-        stats = {
-            "total_courses": len(courses),
-            "by_level": {},
-            "by_path": {},
-            "by_exam_body": {}
-        }
-        
-        for course in courses:
-            level = course["level"]
-            path = course["path"]
-            exam_body = course["exam_body"]
-            
-            stats["by_level"][level] = stats["by_level"].get(level, 0) + 1
-            stats["by_path"][path] = stats["by_path"].get(path, 0) + 1
-            stats["by_exam_body"][exam_body] = stats["by_exam_body"].get(exam_body, 0) + 1
-        
-        return stats
-
     def print_statistics(self, stats: Dict):
         """Print formatted database statistics."""
         self.stdout.write("\n" + "="*70)
@@ -472,7 +425,7 @@ class Command(BaseCommand):
         self.stdout.write(f"\n✅ Total Courses: {stats['total_courses']}")
         
         self.stdout.write("\n📚 By Qualification Level:")
-        for level in ["Degree", "Diploma", "Certificate", "Artisan"]:
+        for level in LEVEL_ORDER:
             count = stats['by_level'].get(level, 0)
             if count > 0:
                 self.stdout.write(f"   • {level}: {count} programs")
@@ -484,27 +437,10 @@ class Command(BaseCommand):
         
         self.stdout.write("="*70 + "\n")
 
-    def validate_database(self, courses: List[Dict]) -> bool:
-        """Validate database integrity."""
+    def print_validation(self, errors: List[str]) -> bool:
+        """Report validation errors collected during the build."""
         self.stdout.write("\n🔍 Validating database integrity...")
         
-        required_fields = [
-            "program_name", "level", "path", "min_mean_grade",
-            "min_cluster_points", "subject_requirements", "description",
-            "career_path", "duration", "exam_body", "metadata"
-        ]
-        
-        valid_levels = ["Degree", "Diploma", "Certificate", "Artisan"]
-        errors = []
-        
-        for idx, course in enumerate(courses):
-            missing = [f for f in required_fields if f not in course]
-            if missing:
-                errors.append(f"Course #{idx+1} missing fields: {missing}")
-            
-            if course.get("level") not in valid_levels:
-                errors.append(f"Course #{idx+1} has invalid level")
-        
         if errors:
             self.stdout.write(self.style.ERROR("❌ Validation FAILED:"))
             for error in errors[:5]:
@@ -514,41 +450,7 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS("✅ Validation PASSED!"))
         return True
 
-    def export_by_level(self, courses: List[Dict], output_dir: str = "exports"):
-        """Export courses by level."""
-        os.makedirs(output_dir, exist_ok=True)
-        
-        by_level = {}
-        for course in courses:
-            level = course["level"]
-            if level not in by_level:
-                by_level[level] = []
-            by_level[level].append(course)
-        
-        for level, level_courses in by_level.items():
-            filename = os.path.join(output_dir, f"{level.lower()}_courses.json")
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(level_courses, f, ensure_ascii=False, indent=2)
-            self.stdout.write(f"   ✅ {level}: {len(level_courses)} courses")
-
-    def export_by_path(self, courses: List[Dict], output_dir: str = "exports"):
-        """Export courses by career path."""
-        os.makedirs(output_dir, exist_ok=True)
-        
-        by_path = {}
-        for course in courses:
-            path = course["path"].split(">")[0].strip()
-            if path not in by_path:
-                by_path[path] = []
-            by_path[path].append(course)
-        
-        for path, path_courses in by_path.items():
-            safe_path = path.replace("/", "_").replace(" ", "_").lower()
-            filename = os.path.join(output_dir, f"path_{safe_path}.json")
-            with open(filename, "w", encoding="utf-8") as f:
-                json.dump(path_courses, f, ensure_ascii=False, indent=2)
-
-    def export_summary_report(self, courses: List[Dict], stats: Dict, output_dir: str = "exports"):
+    def export_summary_report(self, stats: Dict, output_dir: str = "exports"):
         """Export summary report."""
         os.makedirs(output_dir, exist_ok=True)
         
@@ -559,7 +461,7 @@ class Command(BaseCommand):
             f.write(f"Total Courses: {stats['total_courses']}\n\n")
             
             f.write("BY LEVEL:\n")
-            for level in ["Degree", "Diploma", "Certificate", "Artisan"]:
+            for level in LEVEL_ORDER:
                 count = stats['by_level'].get(level, 0)
                 f.write(f"  {level}: {count}\n")
         
@@ -1,15 +1,25 @@
 import csv
 import os
-import random
 from django.core.management.base import BaseCommand
 from courses.models import Course
+from courses.generation import DEFAULT_SEED, course_rng
 from django.conf import settings
 from django.db import transaction
 
 class Command(BaseCommand):
     help = "Imports ALL 20,000 courses but fixes Grades and Levels to match Kenyan Standards"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=DEFAULT_SEED,
+            help='Seed mixed into each course\'s name/level hash; the same seed always gives the same catalog (default: 0)'
+        )
+
     def handle(self, *args, **kwargs):
+        seed = kwargs['seed']
+
         # 1. Setup File Path
         file_path = os.path.join(settings.BASE_DIR, "data", "kenya_courses_20000 (1).csv")
 
@@ -48,27 +58,27 @@ class Command(BaseCommand):
             
             return 'Certificate' # Default safe option
 
-        def get_correct_grade(level):
+        def get_correct_grade(level, rng):
             """
             Enforces strict Kenyan Qualification Framework (KNQF) grades.
             """
             if level == 'Degree':
                 # Degrees MUST be C+ or higher. 
                 # We use a weighted choice so C+ and B- are more common than A.
-                return random.choice(['C+', 'C+', 'B-', 'B-', 'B', 'B+', 'A-', 'A'])
+                return rng.choice(['C+', 'C+', 'B-', 'B-', 'B', 'B+', 'A-', 'A'])
             
             if level == 'Diploma':
                 # Diplomas MUST be C- or C.
-                return random.choice(['C-', 'C-', 'C'])
+                return rng.choice(['C-', 'C-', 'C'])
             
             if level == 'Certificate':
                 # Certificates are usually D or D+
-                return random.choice(['D', 'D+'])
+                return rng.choice(['D', 'D+'])
             
             # Artisan is D- or E
-            return random.choice(['D-', 'E'])
+            return rng.choice(['D-', 'E'])
 
-        def get_realistic_points(level, grade):
+        def get_realistic_points(level, grade, rng):
             """Assigns cluster points that make sense for the grade."""
             if level == 'Degree':
                 # Logic: Higher grade = Higher points
@@ -79,10 +89,10 @@ class Command(BaseCommand):
                 if grade == 'A-': base = 41.0
                 if grade == 'A': base = 44.0
                 # Add small random variation
-                return round(base + random.uniform(0, 3), 1)
+                return round(base + rng.uniform(0, 3), 1)
             
             if level == 'Diploma':
-                return round(random.uniform(18.0, 26.0), 1)
+                return round(rng.uniform(18.0, 26.0), 1)
             
             return 0.0 # Cert/Artisan usually strictly grade-based
 
@@ -125,8 +135,9 @@ class Command(BaseCommand):
                     # 2. APPLY FIXES
                     final_level = get_correct_level(raw_name, raw_level_col)
                     final_path = determine_path(raw_name)
-                    final_grade = get_correct_grade(final_level)
-                    final_points = get_realistic_points(final_level, final_grade)
+                    rng = course_rng(raw_name, final_level, seed=seed)
+                    final_grade = get_correct_grade(final_level, rng)
+                    final_points = get_realistic_points(final_level, final_grade, rng)
 
                     # 3. FIX DESCRIPTION
                     # If description is too short or generic, enhance it
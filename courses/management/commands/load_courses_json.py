@@ -0,0 +1,58 @@
+import os
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+
+from courses.catalog import program_to_course_fields, upsert_courses, write_catalog_snapshot
+from courses.generation import iter_programs
+
+
+class Command(BaseCommand):
+    help = "Streams courses_db.json (or exports/*/*.ndjson shards) from the generator into the Course table, skipping unchanged rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'files',
+            nargs='*',
+            help='Generator JSON or NDJSON files to load (default: courses_db.json in the project root)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows per bulk insert/update (default: 1000)'
+        )
+        parser.add_argument(
+            '--no-snapshot',
+            action='store_true',
+            help="Don't rebuild the catalog snapshot (lookups and autocomplete) after loading"
+        )
+
+    def handle(self, *args, **options):
+        files = options['files'] or [os.path.join(settings.BASE_DIR, "courses_db.json")]
+
+        for file_path in files:
+            if not os.path.exists(file_path):
+                raise CommandError(f"File not found: {file_path}")
+
+        def records():
+            # Files are decoded one element at a time, never json.load-ed whole
+            for file_path in files:
+                self.stdout.write(f"Reading {file_path}...")
+                for program in iter_programs(file_path):
+                    yield program_to_course_fields(program)
+
+        try:
+            counts = upsert_courses(records(), batch_size=options['batch_size'])
+        except ValueError as e:
+            raise CommandError(f"Could not parse JSON: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"DONE! {counts['created']} created, {counts['updated']} updated, "
+            f"{counts['unchanged']} unchanged."
+        ))
+
+        # Workers pick up the new snapshot (and its autocomplete index) on their next lookup
+        if not options['no_snapshot'] and (counts['created'] or counts['updated']
+                                           or not os.path.exists(settings.CATALOG_SNAPSHOT_PATH)):
+            count = write_catalog_snapshot()
+            self.stdout.write(f"Catalog snapshot rebuilt ({count} courses).")
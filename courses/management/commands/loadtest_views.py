@@ -0,0 +1,140 @@
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from blog.models import Post
+from coursereviews.loadtest import run_load
+
+# gunicorn invocation for each deployment mode (see coursereviews/asgi.py).
+# Both serve static files in front of Django (coursereviews/static_files.py)
+# from STATIC_ROOT, so collectstatic runs first.
+SERVERS = {
+    'wsgi': ['coursereviews.wsgi:application'],
+    'asgi': ['coursereviews.asgi:application', '-k', 'uvicorn_worker.UvicornWorker'],
+}
+STATIC_ASSET = 'courses/hero.jpg'
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+
+class Command(BaseCommand):
+    help = "Load-tests the public read views under sync WSGI and ASGI (uvicorn workers) and compares throughput and p99 latency."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modes',
+            nargs='+',
+            choices=sorted(SERVERS),
+            default=['wsgi', 'asgi'],
+            help='Server modes to compare (default: wsgi asgi)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='gunicorn worker processes per mode (default: 2)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=50,
+            help='Parallel keep-alive clients (default: 50)'
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=2000,
+            help='Requests per mode (default: 2000)'
+        )
+        parser.add_argument(
+            '--slow-clients',
+            type=int,
+            default=0,
+            help='Extra connections that trickle headers like stalled mobile clients (default: 0)'
+        )
+        parser.add_argument(
+            '--port',
+            type=int,
+            default=8765,
+            help='Local port for the server under test (default: 8765)'
+        )
+        parser.add_argument(
+            '--skip-collectstatic',
+            action='store_true',
+            help='Serve STATIC_ROOT as it is instead of running collectstatic first'
+        )
+
+    def handle(self, *args, **options):
+        # 1. Endpoints: the async public views and a static asset
+        paths = ['/', '/blog/', '/robots.txt', '/sitemap.xml']
+        post = Post.objects.order_by('-created_at').first()
+        if post:
+            paths.insert(2, f'/blog/{post.id}/')
+        else:
+            self.stdout.write(self.style.WARNING("No blog posts; skipping /blog/<id>/. Run 'python manage.py populate_blog' first."))
+        if not options['skip_collectstatic']:
+            call_command('collectstatic', interactive=False, verbosity=0)
+        paths.append(settings.STATIC_URL + STATIC_ASSET)
+
+        results = {}
+        for mode in options['modes']:
+            # 2. Start the server in its own process group
+            command = [
+                sys.executable, '-m', 'gunicorn', *SERVERS[mode],
+                '--workers', str(options['workers']),
+                '--bind', f"127.0.0.1:{options['port']}",
+                '--log-level', 'warning',
+                '--chdir', str(settings.BASE_DIR),
+            ]
+            self.stdout.write(f"Starting {mode.upper()} server: {' '.join(command[2:])}")
+            process = subprocess.Popen(command, env=os.environ.copy())
+            try:
+                if not wait_for_port(options['port'], process):
+                    raise CommandError(f"{mode.upper()} server did not start (is gunicorn/uvicorn-worker installed?)")
+
+                # 3. Warm up, then measure
+                base_url = f"http://127.0.0.1:{options['port']}"
+                asyncio.run(run_load(base_url, paths, concurrency=4, total_requests=len(paths) * 4))
+                results[mode] = asyncio.run(run_load(
+                    base_url, paths,
+                    concurrency=options['concurrency'],
+                    total_requests=options['requests'],
+                    slow_clients=options['slow_clients'],
+                ))
+            finally:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+        # 4. Report
+        self.stdout.write(
+            f"\n{options['requests']} requests, {options['concurrency']} clients, "
+            f"{options['workers']} workers, {options['slow_clients']} slow clients\n"
+        )
+        self.stdout.write(f"{'':6s} {'path':26s} {'req/s':>9s} {'p50 ms':>9s} {'p99 ms':>9s} {'errors':>7s}")
+        for mode, stats in results.items():
+            rows = [('all', stats)] + list(stats['paths'].items())
+            for path, row in rows:
+                self.stdout.write(
+                    f"{mode.upper():6s} {path:26s} {row['throughput']:>9.1f} {row['p50']:>9.1f} "
+                    f"{row['p99']:>9.1f} {stats['errors'] if path == 'all' else '':>7}"
+                )
@@ -0,0 +1,67 @@
+import glob
+import os
+from collections import Counter
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from coursereviews.profiling import FILE_SUFFIX, read_collapsed
+
+
+class Command(BaseCommand):
+    help = "Merges the sampling profiler's collapsed-stack files and shows the hottest functions (or writes a flamegraph input)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--view',
+            type=str,
+            default=None,
+            help="Only this URL name, e.g. students:results (default: all views)"
+        )
+        parser.add_argument(
+            '--dir',
+            type=str,
+            default=None,
+            help='Profile directory (default: PROFILE_DIR)'
+        )
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Write the merged stacks here, ready for flamegraph.pl or speedscope'
+        )
+        parser.add_argument('--top', type=int, default=15, help='Functions to list (default: 15)')
+
+    def handle(self, *args, **options):
+        # 1. Find the files (named <view>.<period>.<pid>.collapsed)
+        directory = options['dir'] or settings.PROFILE_DIR
+        prefix = options['view'].replace(':', '-') + '.' if options['view'] else ''
+        files = sorted(glob.glob(os.path.join(glob.escape(directory), f"{glob.escape(prefix)}*{FILE_SUFFIX}")))
+        if not files:
+            raise CommandError(f"No profiles found in {directory}")
+
+        # 2. Merge
+        stacks = read_collapsed(files)
+        total = sum(stacks.values())
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+
+        # 3. Self time (leaf frame) and inclusive time (anywhere on the stack)
+        own, inclusive = Counter(), Counter()
+        for stack, count in stacks.items():
+            frames = stack.split(';')
+            own[frames[-1]] += count
+            for frame in set(frames):
+                inclusive[frame] += count
+
+        self.stdout.write(f"{total} samples from {len(files)} file(s)\n")
+        self.stdout.write(f"{'self %':>7s} {'total %':>8s}  function")
+        for frame, count in own.most_common(options['top']):
+            self.stdout.write(f"{100 * count / total:>6.1f}% {100 * inclusive[frame] / total:>7.1f}%  {frame}")
+        self.stdout.write("\nHottest by inclusive time:")
+        for frame, count in inclusive.most_common(options['top']):
+            self.stdout.write(f"{100 * count / total:>6.1f}%  {frame}")
+
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(f"Merged stacks written to {options['output']}"))
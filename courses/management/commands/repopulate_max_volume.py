@@ -1,12 +1,22 @@
 from django.core.management.base import BaseCommand
 from courses.models import Course
-import random
+from courses.generation import DEFAULT_SEED, course_rng
 from django.db import transaction
 
 class Command(BaseCommand):
     help = "Generates 10,000+ UNIQUE courses using Expanded Combinations and Specializations."
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=DEFAULT_SEED,
+            help='Seed mixed into each course\'s name/level hash; the same seed always gives the same catalog (default: 0)'
+        )
+
     def handle(self, *args, **kwargs):
+        seed = kwargs['seed']
+
         self.stdout.write(self.style.WARNING("Deleting all existing courses..."))
         Course.objects.all().delete()
         self.stdout.write(self.style.SUCCESS("Database Cleared."))
@@ -90,19 +100,20 @@ class Command(BaseCommand):
             if name in seen_names:
                 return
             seen_names.add(name)
+            rng = course_rng(name, level, seed=seed)
             
-            # Grade Logic
+            # Grade Logic (stable per course, see courses.generation)
             if level == 'Degree':
-                grade = random.choice(['A', 'A-', 'B+', 'B', 'B-', 'C+'])
+                grade = rng.choice(['A', 'A-', 'B+', 'B', 'B-', 'C+'])
                 points = {'A': 44.0, 'A-': 42.0, 'B+': 38.0, 'B': 34.0, 'B-': 30.0, 'C+': 26.0}[grade]
             elif level == 'Diploma':
-                grade = random.choice(['C', 'C-', 'D+'])
+                grade = rng.choice(['C', 'C-', 'D+'])
                 points = {'C': 20.0, 'C-': 18.0, 'D+': 16.0}[grade]
             elif level == 'Certificate':
-                grade = random.choice(['D', 'D-'])
+                grade = rng.choice(['D', 'D-'])
                 points = {'D': 14.0, 'D-': 12.0}[grade]
             else:  # Artisan
-                grade = random.choice(['D-', 'E'])
+                grade = rng.choice(['D-', 'E'])
                 points = 0.0
 
             # Get subject requirements
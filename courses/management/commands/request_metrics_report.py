@@ -0,0 +1,67 @@
+import glob
+import json
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from coursereviews.instrumentation import MetricsStore
+
+
+class Command(BaseCommand):
+    help = "Aggregates the rolling request-metrics log (REQUEST_METRICS_LOG) into per-view timings and query counts."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'files',
+            nargs='*',
+            help='Log files to read (default: REQUEST_METRICS_LOG and its rotated backups)'
+        )
+        parser.add_argument('--view', type=str, default=None, help='Only report this URL name')
+        parser.add_argument('--since', type=float, default=None, help='Only records newer than this UNIX timestamp')
+        parser.add_argument('--limit', type=int, default=20, help='Views to show, most total time first (default: 20)')
+
+    def handle(self, *args, **options):
+        # 1. Which files: the live log plus metrics.jsonl.1, .2, ...
+        files = options['files']
+        if not files:
+            base = getattr(settings, 'REQUEST_METRICS_LOG', None)
+            if not base:
+                raise CommandError("No log files given and REQUEST_METRICS_LOG is not set.")
+            files = [base] + sorted(glob.glob(f"{glob.escape(base)}.[0-9]*"))
+        files = [f for f in files if os.path.exists(f)]
+        if not files:
+            raise CommandError("No request-metrics log files found.")
+
+        # 2. Aggregate the JSON lines
+        store = MetricsStore()
+        skipped = 0
+        for filename in files:
+            with open(filename, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        skipped += 1
+                        continue
+                    if options['view'] and record.get('view') != options['view']:
+                        continue
+                    if options['since'] and record.get('ts', 0) < options['since']:
+                        continue
+                    store.add(record)
+
+        # 3. Report
+        rows = store.summaries()[:options['limit']]
+        self.stdout.write(
+            f"{'view':32s} {'count':>7s} {'avg ms':>8s} {'p95 <=':>7s} {'db ms':>8s} "
+            f"{'tpl ms':>8s} {'py ms':>8s} {'queries':>8s} {'max q':>6s} {'KB':>7s}"
+        )
+        for row in rows:
+            p95 = row['p95_ms'] if row['p95_ms'] is not None else '>2500'
+            self.stdout.write(
+                f"{row['name'][:32]:32s} {row['count']:>7d} {row['avg_ms']:>8.1f} {p95!s:>7s} {row['avg_db_ms']:>8.1f} "
+                f"{row['avg_template_ms']:>8.1f} {row['avg_python_ms']:>8.1f} {row['avg_queries']:>8.1f} "
+                f"{row['max_queries']:>6d} {row['avg_kb']:>7.1f}"
+            )
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"Skipped {skipped} unreadable lines"))
+        self.stdout.write(self.style.SUCCESS(f"Read {len(files)} file(s), {len(rows)} views."))
@@ -0,0 +1,101 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from coursereviews.benchmarks import (
+    JOURNEY_PREFIX, HttpClient, InProcessClient, find_regressions, load_report, run_journey,
+    save_report, summarize_samples,
+)
+from courses.models import Course
+from students.models import Payment
+
+
+def approve_payment(username):
+    """Does what the admin does in /admin/ after checking the M-Pesa code."""
+    Payment.objects.filter(user__username=username).update(has_paid=True)
+
+
+class Command(BaseCommand):
+    help = "Runs the signup -> grades -> payment -> results -> favourite -> review journey and reports throughput, latency percentiles and queries per request."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            type=str,
+            default=None,
+            help='Run over HTTP against a server sharing this database (e.g. http://127.0.0.1:8000). Default: in-process'
+        )
+        parser.add_argument('--journeys', type=int, default=20, help='Student journeys to run (default: 20)')
+        parser.add_argument('--concurrency', type=int, default=4, help='Parallel journeys in --url mode (default: 4)')
+        parser.add_argument('--seed', type=int, default=0, help='Seed for picking courses (default: 0)')
+        parser.add_argument('--baseline', type=str, default=None, help='Fail if results regress against this saved report')
+        parser.add_argument('--save', type=str, default=None, help='Write this run as a JSON report (e.g. a new baseline)')
+        parser.add_argument('--threshold', type=float, default=0.25, help='Allowed p95/throughput regression as a fraction (default: 0.25)')
+        parser.add_argument('--query-threshold', type=float, default=0, help='Allowed extra queries per request (default: 0)')
+        parser.add_argument('--keep-users', action='store_true', help='Keep the accounts created by the journeys')
+
+    def handle(self, *args, **options):
+        course_ids = list(Course.objects.values_list('id', flat=True)[:5000])
+        if not course_ids:
+            raise CommandError("No courses found. Run 'python manage.py seed_benchmark_data' first.")
+        if options['baseline']:
+            try:
+                baseline = load_report(options['baseline'])
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read baseline {options['baseline']}: {e}")
+
+        # 1. Clear accounts left by an earlier run so usernames and M-Pesa codes are free
+        User.objects.filter(username__startswith=JOURNEY_PREFIX).delete()
+        rng = random.Random(options['seed'])
+        picks = [rng.choice(course_ids) for _ in range(options['journeys'])]
+
+        # 2. Run the journeys
+        mode = f"HTTP {options['url']}" if options['url'] else "in-process"
+        self.stdout.write(f"Running {options['journeys']} journeys ({mode})...")
+        start = time.perf_counter()
+        if options['url']:
+            def journey(n):
+                client = HttpClient(options['url'])
+                run_journey(client, n, picks[n], approve_payment)
+                return client.samples
+
+            with ThreadPoolExecutor(max_workers=max(1, options['concurrency'])) as pool:
+                samples = [s for batch in pool.map(journey, range(options['journeys'])) for s in batch]
+        else:
+            samples = []
+            for n in range(options['journeys']):
+                client = InProcessClient()
+                run_journey(client, n, picks[n], approve_payment)
+                samples.extend(client.samples)
+        elapsed = time.perf_counter() - start
+
+        if not options['keep_users']:
+            User.objects.filter(username__startswith=JOURNEY_PREFIX).delete()
+
+        # 3. Report
+        report = summarize_samples(samples, elapsed, options['journeys'])
+        self.stdout.write(
+            f"\n{report['journeys']} journeys in {elapsed:.1f}s: {report['journeys_per_second']:.2f} journeys/s, "
+            f"{report['throughput']:.1f} req/s, {report['errors']} errors\n"
+        )
+        self.stdout.write(f"{'step':22s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'queries':>8s} {'errors':>7s}")
+        for step, stats in report['steps'].items():
+            queries = f"{stats['queries']:.1f}" if stats['queries'] is not None else '-'
+            self.stdout.write(
+                f"{step:22s} {stats['p50']:>9.1f} {stats['p95']:>9.1f} {stats['p99']:>9.1f} {queries:>8s} {stats['errors']:>7d}"
+            )
+
+        if options['save']:
+            save_report(report, options['save'])
+            self.stdout.write(f"\nReport saved to {options['save']}")
+
+        # 4. Regression gate (non-zero exit for CI)
+        if report['errors']:
+            raise CommandError(f"{report['errors']} requests failed or returned an unexpected status")
+        if options['baseline']:
+            regressions = find_regressions(report, baseline, options['threshold'], options['query_threshold'])
+            if regressions:
+                raise CommandError("Benchmark regressed:\n  " + "\n  ".join(regressions))
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
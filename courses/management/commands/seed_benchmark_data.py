@@ -0,0 +1,125 @@
+import os
+import random
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from blog.loader import bulk_load_posts
+from courses.catalog import program_to_course_fields, upsert_courses
+from courses.generation import DEFAULT_SEED, iter_db
+from courses.models import Course, CourseReview
+from students.models import GRADE_CHOICES_POINTS, Favorite, Payment, StudentGrades
+
+# Every seeded account starts with this prefix so re-seeding can clear them
+BENCH_USER_PREFIX = 'bench_student_'
+BENCH_PASSWORD = 'bench-pass-123'
+
+SUBJECTS = [
+    'mathematics', 'english', 'kiswahili', 'biology', 'physics', 'chemistry',
+    'history', 'geography', 'cre', 'business_studies', 'computer_studies',
+]
+
+MEAN_GRADES = [grade for _, grade in GRADE_CHOICES_POINTS]
+
+
+class Command(BaseCommand):
+    help = "Seeds a reproducible benchmark dataset: students with grades and payments, courses, reviews, favourites and blog posts."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000, help='Student accounts to create (default: 1000)')
+        parser.add_argument('--courses', type=int, default=20000, help='Catalog size to top up to (default: 20000)')
+        parser.add_argument('--reviews', type=int, default=3, help='Reviews per student (default: 3)')
+        parser.add_argument('--favorites', type=int, default=5, help='Favourites per student (default: 5)')
+        parser.add_argument('--posts', type=int, default=200, help='Blog posts to create (default: 200)')
+        parser.add_argument('--paid-ratio', type=float, default=0.7, help='Share of students with an approved payment (default: 0.7)')
+        parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help=f'Random seed (default: {DEFAULT_SEED})')
+        parser.add_argument(
+            '--source',
+            type=str,
+            default=os.path.join(settings.BASE_DIR, "courses_db.json"),
+            help='Generator JSON used as template programs for the synthetic catalog'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        # 1. Courses: top the catalog up to --courses with numbered copies of real programs
+        missing = options['courses'] - Course.objects.count()
+        if missing > 0:
+            templates = list(iter_db(options['source']))
+            if not templates:
+                raise CommandError(f"No programs found in {options['source']}")
+
+            def records():
+                for i in range(missing):
+                    program = dict(templates[i % len(templates)])
+                    program['program_name'] = f"{program['program_name']} (Bench {i})"
+                    yield program_to_course_fields(program)
+
+            counts = upsert_courses(records())
+            self.stdout.write(f"Courses: {counts['created']} created")
+        course_ids = list(Course.objects.values_list('id', flat=True))
+
+        with transaction.atomic():
+            # 2. Students (one password hash shared by all; hashing per user would dominate the run)
+            deleted, _ = User.objects.filter(username__startswith=BENCH_USER_PREFIX).delete()
+            if deleted:
+                self.stdout.write(f"Cleared {deleted} rows from the previous benchmark seed")
+
+            password = make_password(BENCH_PASSWORD)
+            User.objects.bulk_create([
+                User(username=f"{BENCH_USER_PREFIX}{i}", email=f"{BENCH_USER_PREFIX}{i}@example.com", password=password)
+                for i in range(options['students'])
+            ], batch_size=1000)
+            users = list(User.objects.filter(username__startswith=BENCH_USER_PREFIX).order_by('id'))
+
+            # 3. Grades with their cluster points, and payments
+            grades = []
+            for user in users:
+                row = StudentGrades(student=user, mean_grade=rng.choice(MEAN_GRADES))
+                for subject in SUBJECTS:
+                    setattr(row, subject, rng.randint(1, 12))
+                row.compute_clusters()
+                grades.append(row)
+            StudentGrades.objects.bulk_create(grades, batch_size=1000)
+
+            Payment.objects.bulk_create([
+                Payment(user=user, has_paid=rng.random() < options['paid_ratio'],
+                        transaction_code=f"BN{user.id:08d}")
+                for user in users
+            ], batch_size=1000)
+
+            # 4. Reviews and favourites on distinct courses per student
+            reviews, favorites = [], []
+            per_user = min(len(course_ids), options['reviews'] + options['favorites'])
+            for user in users:
+                picks = rng.sample(course_ids, per_user)
+                for course_id in picks[:options['reviews']]:
+                    reviews.append(CourseReview(user=user, course_id=course_id, rating=rng.randint(1, 5),
+                                                comment="Benchmark review of the course workload and job prospects."))
+                for course_id in picks[options['reviews']:]:
+                    favorites.append(Favorite(user=user, course_id=course_id))
+            CourseReview.objects.bulk_create(reviews, batch_size=2000)
+            Favorite.objects.bulk_create(favorites, batch_size=2000)
+            Favorite.recount()
+
+        # 5. Blog posts
+        author = User.objects.filter(is_superuser=True).first() or (users[0] if users else None)
+        if options['posts'] and author:
+            categories = ['Career Advice', 'University News', 'KUCCPS Updates', 'Success Stories']
+            counts, _ = bulk_load_posts([
+                {
+                    'title': f"Benchmark Article {i}",
+                    'category': categories[i % len(categories)],
+                    'content': "Choosing a course in Kenya. " * rng.randint(50, 400),
+                }
+                for i in range(options['posts'])
+            ], author)
+            self.stdout.write(f"Posts: {counts['created']} created, {counts['updated'] + counts['unchanged']} kept")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"DONE! {len(users)} students ({BENCH_USER_PREFIX}N / {BENCH_PASSWORD}), {len(course_ids)} courses, "
+            f"{len(reviews)} reviews, {len(favorites)} favourites."
+        ))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0003_coursereview'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, help_text='Places available (used by the placement simulation); blank means no limit', null=True),
+        ),
+    ]
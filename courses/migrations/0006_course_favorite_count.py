@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:35
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_favorites(apps, schema_editor):
+    Course = apps.get_model('courses', 'Course')
+    Favorite = apps.get_model('students', 'Favorite')
+    saves = Favorite.objects.filter(course=OuterRef('pk')).order_by().values('course')
+    saves = saves.annotate(n=Count('id')).values('n')
+    Course.objects.update(favorite_count=Coalesce(Subquery(saves), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_course_name_trigram_index'),
+        ('students', '0008_favorite'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='favorite_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False, help_text='Students who saved this course (kept in step with Favorite by toggle_favorite)'),
+        ),
+        migrations.RunPython(count_favorites, migrations.RunPython.noop),
+    ]
@@ -73,6 +73,19 @@ class Course(models.Model):
         help_text="Example career path after this course"
     )
 
+    capacity = models.PositiveIntegerField(
+        blank=True,
+        null=True,
+        help_text="Places available (used by the placement simulation); blank means no limit"
+    )
+
+    favorite_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        db_index=True,
+        help_text="Students who saved this course (kept in step with Favorite by toggle_favorite)"
+    )
+
     def __str__(self):
         return f"{self.name} ({self.level})"
 
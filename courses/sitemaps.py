@@ -24,7 +24,13 @@ class BlogSitemap(Sitemap):
     changefreq = 'monthly'
     priority = 0.8
 
+    def __init__(self, posts=None):
+        # The async sitemap view passes posts it already fetched
+        self.posts = posts
+
     def items(self):
+        if self.posts is not None:
+            return self.posts
         return Post.objects.all().order_by('-created_at')
 
     def lastmod(self, obj):
@@ -0,0 +1,247 @@
+"""
+Compact, memory-mappable snapshot of the course catalog.
+
+The file is column-oriented: one fixed-width array per field, with every
+string (names, levels, paths) interned once in a shared string table. Workers
+mmap it read-only, so the pages are shared between processes and only touched
+when a lookup needs them.
+
+Levels and paths share the string table with names, so their indexes can be
+as large as any name's (a 200k catalog passes 65,535 strings easily).
+
+Layout (little-endian, each section padded to 8 bytes):
+
+    header          magic, version, row count, string count, blob size, suggest entries
+    string offsets  uint32[strings + 1]
+    string blob     utf-8 bytes
+    ids             uint32[rows]   Course.id (0 for generator output), ascending when set
+    names           uint32[rows]   string index
+    levels          uint32[rows]   string index
+    paths           uint32[rows]   string index (canonical Course.path)
+    grade_ranks     uint8[rows]    GRADE_RANKS of min_mean_grade
+    cluster_points  float64[rows]  min_cluster_points (exact, so cut-off comparisons match the DB)
+    suggest_rows    uint32[entries]  autocomplete index: row of each entry
+    suggest_starts  uint16[entries]  where the entry starts in the row's suggest_key(name)
+
+The autocomplete index is a sorted array standing in for a prefix trie: one
+entry per word of each normalised name (stopwords skipped), ordered by the
+text from that word to the end of the name. All entries starting with a
+prefix are then adjacent, so suggest() is a bisect plus a short scan over
+the mapped pages, with no per-worker build step.
+"""
+
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections import namedtuple
+
+MAGIC = b'CRSNAP01'
+VERSION = 4
+HEADER = struct.Struct('<8sIIIII')
+SUGGEST_STOPWORDS = {'in', 'of', 'and', 'the', 'for', 'with', 'a', 'an', 'to', 'on'}
+SUGGEST_SCAN = 200  # entries looked at per prefix before ranking
+_NON_WORD = re.compile(r'[\W_]+')
+
+# (column, array typecode) in file order
+COLUMNS = [
+    ('ids', 'I'),
+    ('names', 'I'),
+    ('levels', 'I'),
+    ('paths', 'I'),
+    ('grade_ranks', 'B'),
+    ('cluster_points', 'd'),
+]
+
+CatalogRow = namedtuple('CatalogRow', 'id name level path grade_rank cluster_points')
+
+
+def _padding(size):
+    return (-size) % 8
+
+
+def suggest_key(text):
+    """Lower-case words separated by single spaces: what autocomplete prefixes are matched against."""
+    return _NON_WORD.sub(' ', (text or '').casefold()).strip()
+
+
+def _word_starts(key):
+    start = 0
+    for word in key.split(' '):
+        if word and (start == 0 or word not in SUGGEST_STOPWORDS):
+            yield start
+        start += len(word) + 1
+
+
+class SnapshotWriter:
+    """Collects catalog rows column by column and writes them as one snapshot file."""
+
+    def __init__(self):
+        self._strings = {}
+        self._columns = {column: array(typecode) for column, typecode in COLUMNS}
+
+    def __len__(self):
+        return len(self._columns['ids'])
+
+    def intern(self, text):
+        text = text or ''
+        if text not in self._strings:
+            self._strings[text] = len(self._strings)
+        return self._strings[text]
+
+    def add(self, name, level, path, grade_rank, cluster_points, course_id=0):
+        self._columns['ids'].append(course_id or 0)
+        self._columns['names'].append(self.intern(name))
+        self._columns['levels'].append(self.intern(level))
+        self._columns['paths'].append(self.intern(path))
+        self._columns['grade_ranks'].append(grade_rank or 0)
+        self._columns['cluster_points'].append(float(cluster_points or 0.0))
+
+    def write(self, filename):
+        """Writes the snapshot atomically (temp file + rename)."""
+        if sys.byteorder != 'little':
+            raise ValueError("Catalog snapshots are written on little-endian hosts only")
+
+        encoded = [s.encode('utf-8') for s in self._strings]
+        offsets = array('I', [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        blob = b''.join(encoded)
+
+        # Autocomplete entries, sorted by the name text from each word on
+        names = self._columns['names']
+        keys = {idx: suggest_key(text) for text, idx in self._strings.items()}
+        entries = sorted(
+            ((keys[names[row]][start:], row, start) for row in range(len(self))
+             for start in _word_starts(keys[names[row]])),
+        )
+        suggest_rows = array('I', (row for _, row, _ in entries))
+        suggest_starts = array('H', (start for _, _, start in entries))
+        del entries
+
+        tmp_filename = filename + '.tmp'
+        with open(tmp_filename, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self), len(encoded), len(blob), len(suggest_rows)))
+            f.write(b'\0' * _padding(HEADER.size))
+            columns = [self._columns[c].tobytes() for c, _ in COLUMNS]
+            for chunk in [offsets.tobytes(), blob] + columns + [suggest_rows.tobytes(), suggest_starts.tobytes()]:
+                f.write(chunk)
+                f.write(b'\0' * _padding(len(chunk)))
+        os.replace(tmp_filename, filename)
+
+
+class CatalogSnapshot:
+    """Read-only, memory-mapped view over a snapshot written by SnapshotWriter."""
+
+    def __init__(self, filename):
+        if sys.byteorder != 'little':
+            raise ValueError("Catalog snapshots can only be mapped on little-endian hosts")
+
+        self.filename = filename
+        with open(filename, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+
+        try:
+            magic, version, rows, strings, blob_size, entries = HEADER.unpack_from(view, 0)
+        except struct.error:
+            magic = version = None
+        if magic != MAGIC or version != VERSION:
+            view.release()
+            self._mmap.close()
+            raise ValueError(f"{filename} is not a version {VERSION} catalog snapshot")
+
+        pos = HEADER.size + _padding(HEADER.size)
+        size = (strings + 1) * 4
+        self._offsets = view[pos:pos + size].cast('I')
+        pos += size + _padding(size)
+        self._blob = view[pos:pos + blob_size]
+        pos += blob_size + _padding(blob_size)
+
+        for column, typecode in COLUMNS:
+            size = rows * array(typecode).itemsize
+            setattr(self, '_' + column, view[pos:pos + size].cast(typecode))
+            pos += size + _padding(size)
+        self._suggest_rows = view[pos:pos + entries * 4].cast('I')
+        pos += entries * 4 + _padding(entries * 4)
+        self._suggest_starts = view[pos:pos + entries * 2].cast('H')
+
+        self._rows = rows
+        self._entries = entries
+        self._string_cache = {}
+
+    def __len__(self):
+        return self._rows
+
+    def string(self, idx):
+        text = self._string_cache.get(idx)
+        if text is None:
+            text = str(self._blob[self._offsets[idx]:self._offsets[idx + 1]], 'utf-8')
+            self._string_cache[idx] = text
+        return text
+
+    def course_id(self, i):
+        return self._ids[i]
+
+    def name(self, i):
+        return self.string(self._names[i])
+
+    def level(self, i):
+        return self.string(self._levels[i])
+
+    def path(self, i):
+        return self.string(self._paths[i])
+
+    def grade_rank(self, i):
+        return self._grade_ranks[i]
+
+    def cluster_points(self, i):
+        return self._cluster_points[i]
+
+    def row(self, i):
+        return CatalogRow(self.course_id(i), self.name(i), self.level(i), self.path(i),
+                          self.grade_rank(i), self.cluster_points(i))
+
+    def rows(self):
+        for i in range(self._rows):
+            yield self.row(i)
+
+    def find(self, course_id):
+        """Row index of a Course.id (ids are stored in ascending order), or None."""
+        i = bisect_left(self._ids, course_id)
+        if i < self._rows and self._ids[i] == course_id:
+            return i
+        return None
+
+    def _suffix(self, entry):
+        return suggest_key(self.name(self._suggest_rows[entry]))[self._suggest_starts[entry]:]
+
+    def suggest(self, prefix, limit=8):
+        """
+        Rows whose name has a word starting with `prefix` (one row per
+        distinct name): names starting with it first, then shorter names.
+        """
+        prefix = suggest_key(prefix)
+        if not prefix:
+            return []
+        entry = bisect_left(range(self._entries), prefix, key=self._suffix)
+        found, seen = [], set()
+        for entry in range(entry, min(entry + SUGGEST_SCAN, self._entries)):
+            if not self._suffix(entry).startswith(prefix):
+                break
+            i = self._suggest_rows[entry]
+            name = self.name(i)
+            if name not in seen:
+                seen.add(name)
+                found.append((self._suggest_starts[entry] > 0, len(name), name, i))
+        found.sort()
+        return [self.row(i) for *_, i in found[:limit]]
+
+    def close(self):
+        # Views must be released before the map can be closed
+        for attr in ['_offsets', '_blob', '_suggest_rows', '_suggest_starts'] + ['_' + column for column, _ in COLUMNS]:
+            getattr(self, attr).release()
+        self._mmap.close()
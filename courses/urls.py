@@ -7,7 +7,9 @@ urlpatterns = [
     path("", views.home, name="home"),
     path("about/", views.about, name="about"),
     path("contact/", views.contact_us, name="contact_us"), 
+    path("courses/suggest/", views.course_suggest, name="course_suggest"),
     path("owner/dashboard/", views.owner_dashboard, name="owner_dashboard"),
+    path("owner/metrics/", views.request_metrics, name="request_metrics"),
 ]
 
 
@@ -1,10 +1,16 @@
 from django.shortcuts import render, redirect
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
 from courses.models import Course, CourseReview
 from blog.models import Post
-from django.db.models import Avg, Count
+from django.db.models import Avg
 from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.models import User
+from django.contrib.sitemaps.views import sitemap
+from courses.sitemaps import StaticViewSitemap, BlogSitemap
+from courses.catalog import get_catalog_snapshot
+from courses.snapshot import suggest_key
+from coursereviews.async_utils import aload_user, alist
+from coursereviews.routers import use_replica
 from students.models import Payment, Favorite
 import datetime
 
@@ -12,20 +18,25 @@ import datetime
 # PUBLIC PAGES
 # ==========================================
 
-def home(request):
+@use_replica
+async def home(request):
     """
     Renders the public homepage with dynamic data.
+    Async: all queries go through the async ORM, so one ASGI worker can serve
+    many slow clients at once.
     """
+    await aload_user(request)
+
     # 1. Get Stats (Total number of courses in DB)
-    total_courses = Course.objects.count()
+    total_courses = await Course.objects.acount()
     
     # 2. Get Latest 3 Blog Posts
-    latest_posts = Post.objects.all().order_by('-created_at')[:3]
+    latest_posts = await alist(Post.objects.all().order_by('-created_at')[:3])
     
     # 3. Get Top Rated Courses
-    top_courses = Course.objects.annotate(
+    top_courses = await alist(Course.objects.annotate(
         avg_rating=Avg('reviews__rating')
-    ).filter(avg_rating__gte=4).order_by('-avg_rating')[:3]
+    ).filter(avg_rating__gte=4).order_by('-avg_rating')[:3])
 
     context = {
         'total_courses': total_courses,
@@ -56,7 +67,7 @@ def contact_us(request):
     return render(request, "courses/contact_us.html")
 
 
-def robots_txt(request):
+async def robots_txt(request):
     """
     Generates the robots.txt file for SEO.
     """
@@ -71,6 +82,43 @@ def robots_txt(request):
     ]
     return HttpResponse("\n".join(lines), content_type="text/plain")
 
+@use_replica
+async def sitemap_xml(request):
+    """
+    sitemap.xml with the blog posts fetched through the async ORM.
+    The sitemaps then only work on in-memory lists, so the stock view renders them.
+    """
+    posts = await alist(Post.objects.only('id', 'updated_at').order_by('-created_at'))
+    sitemaps = {
+        'static': StaticViewSitemap(),
+        'blog': BlogSitemap(posts),
+    }
+    return sitemap(request, sitemaps=sitemaps)
+
+SUGGEST_LIMIT = 8
+
+
+def course_suggest(request):
+    """
+    Autocomplete for the results search box: course names and fields matching
+    ?q=. Answered from the memory-mapped catalog snapshot and the fixed path
+    choices, so it never touches the database (or the session).
+    """
+    prefix = suggest_key(request.GET.get('q', ''))[:100]
+    snapshot = get_catalog_snapshot()
+    courses = snapshot.suggest(prefix, SUGGEST_LIMIT) if snapshot is not None and prefix else []
+    paths = [
+        {'value': value, 'label': label}
+        for value, label in Course.PATH_CHOICES
+        if prefix and any((' ' + suggest_key(text)).find(' ' + prefix) >= 0 for text in (value, label))
+    ]
+    response = JsonResponse({
+        'courses': [{'id': row.id, 'name': row.name, 'level': row.level, 'path': row.path} for row in courses],
+        'paths': paths,
+    })
+    response['Cache-Control'] = 'public, max-age=300'
+    return response
+
 # ==========================================
 # OWNER ANALYTICS DASHBOARD
 # ==========================================
@@ -93,10 +141,8 @@ def owner_dashboard(request):
     total_reviews = CourseReview.objects.count()
     total_favorites = Favorite.objects.count()
     
-    # 4. Most Popular Courses (Top 5 favorited)
-    popular_courses = Course.objects.annotate(
-        num_likes=Count('favorite')
-    ).order_by('-num_likes')[:5]
+    # 4. Most Popular Courses (Top 5 favorited, from the indexed counter)
+    popular_courses = Course.objects.order_by('-favorite_count')[:5]
 
     context = {
         'total_users': total_users,
@@ -108,3 +154,25 @@ def owner_dashboard(request):
         'total_favorites': total_favorites,
     }
     return render(request, 'courses/owner_dashboard.html', context)
+
+
+@staff_member_required
+def request_metrics(request):
+    """
+    Per-view query and timing histograms collected by RequestMetricsMiddleware
+    (this worker process only). Staff only.
+    """
+    from django.conf import settings
+    from coursereviews.instrumentation import metrics
+
+    if request.method == "POST" and request.POST.get('action') == 'reset':
+        metrics.reset()
+        return redirect('request_metrics')
+
+    context = {
+        'enabled': getattr(settings, 'REQUEST_METRICS_ENABLED', False),
+        'log_file': getattr(settings, 'REQUEST_METRICS_LOG', None),
+        'views': metrics.summaries(),
+        'since': datetime.datetime.fromtimestamp(metrics.started),
+    }
+    return render(request, 'courses/request_metrics.html', context)
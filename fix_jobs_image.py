@@ -1,8 +1,6 @@
-import requests
 import os
 import sys
 import django
-from django.core.files.base import ContentFile
 
 # 1. Add the current directory to the Python path so it finds 'coursereviews'
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -12,6 +10,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'coursereviews.settings')
 django.setup()
 
 # 3. Import Models (Must be done AFTER django.setup())
+from blog.images import ImageFetcher, ImageStore
 from blog.models import Post
 
 def fix_image():
@@ -28,18 +27,22 @@ def fix_image():
     
     print("Downloading replacement image...")
 
+    # Retries with backoff, and reuses an identical file if another post already has it
+    fetcher = ImageFetcher(concurrency=1, timeout=30)
     try:
-        response = requests.get(image_url, timeout=30)
-        if response.status_code == 200:
-            # Save it to the model
-            filename = f"blog_{post.id}_money.jpg"
-            post.image.save(filename, ContentFile(response.content), save=True)
-            print(f"✅ Success! Image updated for: {post.title}")
-        else:
-            print(f"Failed to download image. Status code: {response.status_code}")
-            
-    except Exception as e:
-        print(f"An error occurred: {e}")
+        content, _, error = fetcher.fetch([image_url])
+    finally:
+        fetcher.close()
+
+    if content is None:
+        print(f"Failed to download image. {error}")
+        return
+
+    # Save it to the model
+    store = ImageStore(Post.objects.exclude(pk=post.pk).exclude(image='').exclude(image__isnull=True))
+    filename = f"blog_{post.id}_money.jpg"
+    store.save(post, content, filename)
+    print(f"✅ Success! Image updated for: {post.title}")
 
 if __name__ == "__main__":
     fix_image()
\ No newline at end of file
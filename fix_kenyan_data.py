@@ -1,6 +1,8 @@
+import argparse
 import csv
 import os
-import random
+
+from courses.generation import DEFAULT_SEED, course_rng
 
 # --- CONFIGURATION ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -68,27 +70,27 @@ def determine_true_level(name_raw, level_raw):
     
     return 'Certificate' # Default safe option
 
-def get_correct_grade(level):
+def get_correct_grade(level, rng):
     """Assigns KNQF compliant grades."""
-    if level == 'Degree': return random.choice(GRADES_DEGREE)
-    if level == 'Diploma': return random.choice(GRADES_DIPLOMA)
-    if level == 'Certificate': return random.choice(GRADES_CERT)
-    return random.choice(GRADES_ARTISAN)
+    if level == 'Degree': return rng.choice(GRADES_DEGREE)
+    if level == 'Diploma': return rng.choice(GRADES_DIPLOMA)
+    if level == 'Certificate': return rng.choice(GRADES_CERT)
+    return rng.choice(GRADES_ARTISAN)
 
-def get_realistic_points(level, grade):
+def get_realistic_points(level, grade, rng):
     """Assigns cluster points that match the grade."""
     if level == 'Degree':
         # A student with A usually needs 40+, C+ needs ~25-30
         base = 25.0
         if 'A' in grade: base += 15
         elif 'B' in grade: base += 10
-        return round(base + random.uniform(0, 5), 1)
+        return round(base + rng.uniform(0, 5), 1)
     
     if level == 'Diploma':
-        return round(random.uniform(15.0, 24.0), 1)
+        return round(rng.uniform(15.0, 24.0), 1)
         
     if level == 'Certificate':
-        return round(random.uniform(10.0, 15.0), 1)
+        return round(rng.uniform(10.0, 15.0), 1)
         
     return 0.0 # Artisan often doesn't use cluster points
 
@@ -105,22 +107,22 @@ def determine_path(name):
     if 'hosp' in n or 'hotel' in n or 'tour' in n: return 'Hospitality'
     return 'Arts' # Default / General
 
-def generate_description(path, level):
+def generate_description(path, level, rng):
     """Picks a vivid description template."""
     options = TEMPLATES.get(path, TEMPLATES['General'])
-    desc = random.choice(options)
+    desc = rng.choice(options)
     return desc.format(level=level) # Inject the correct level into the text
 
-def main():
-    if not os.path.exists(INPUT_FILE):
-        print(f"Error: Input file not found at {INPUT_FILE}")
+def main(input_file=INPUT_FILE, output_file=OUTPUT_FILE, seed=DEFAULT_SEED):
+    if not os.path.exists(input_file):
+        print(f"Error: Input file not found at {input_file}")
         print("Make sure 'kenya_courses_20000 (1).csv' is in the 'review/data/' folder.")
         return
 
     print("Repairing Data according to KNQF Standards...")
     
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f_in, \
-         open(OUTPUT_FILE, 'w', encoding='utf-8', newline='') as f_out:
+    with open(input_file, 'r', encoding='utf-8') as f_in, \
+         open(output_file, 'w', encoding='utf-8', newline='') as f_out:
         
         reader = csv.DictReader(f_in)
         
@@ -138,13 +140,14 @@ def main():
             # 2. FIX LEVEL (The most important part)
             real_level = determine_true_level(raw_name, raw_level)
             
-            # 3. FIX GRADE & POINTS
-            real_grade = get_correct_grade(real_level)
-            real_points = get_realistic_points(real_level, real_grade)
+            # 3. FIX GRADE & POINTS (seeded per course so re-runs give the same file)
+            rng = course_rng(raw_name, real_level, seed=seed)
+            real_grade = get_correct_grade(real_level, rng)
+            real_points = get_realistic_points(real_level, real_grade, rng)
             
             # 4. FIX PATH & DESCRIPTION
             real_path = determine_path(raw_name)
-            real_desc = generate_description(real_path, real_level)
+            real_desc = generate_description(real_path, real_level, rng)
             
             # 5. FIX CAREER INFO (If missing, generate one)
             career = row.get('career_info', '')
@@ -165,7 +168,11 @@ def main():
             count += 1
             
     print(f"✅ Success! Repaired {count} courses.")
-    print(f"📁 Clean file saved to: {OUTPUT_FILE}")
+    print(f"📁 Clean file saved to: {output_file}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Repair course data according to KNQF standards.")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help="Seed mixed into each course's name/level hash (default: 0)")
+    args = parser.parse_args()
+    main(seed=args.seed)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import StudentGrades, Payment, Favorite
+from .models import StudentGrades, Payment, Favorite, Placement, PlacementRun
 
 # Register your models here.
 admin.site.register(StudentGrades)
@@ -19,3 +19,15 @@ class PaymentAdmin(admin.ModelAdmin):
     # THIS IS THE MAGIC LINE:
     # It allows you to check/uncheck 'Has Paid' directly in the list view
     list_editable = ('has_paid',)
+
+
+@admin.register(Placement)
+class PlacementAdmin(admin.ModelAdmin):
+    list_display = ('student', 'course', 'choice', 'points', 'updated_at')
+    search_fields = ('student__username', 'course__name')
+    raw_id_fields = ('student', 'course')
+
+
+@admin.register(PlacementRun)
+class PlacementRunAdmin(admin.ModelAdmin):
+    list_display = ('finished_at', 'students', 'placed', 'changed', 'seconds')
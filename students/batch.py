@@ -0,0 +1,248 @@
+"""
+Class results: cluster points and qualifying courses for a whole class.
+
+Counsellors upload one CSV row per student (a `student` column, `mean_grade`
+and any subject columns named like the grade-entry form, e.g. `mathematics`,
+`business_studies`, holding letter grades or 1-12 points). Cluster points come
+from StudentGrades.compute_clusters and admission chances from
+students.scoring, exactly as on the results page.
+
+The catalog is indexed once (from the catalog snapshot when one has been
+built, otherwise from the Course table) into groups keyed by level, cluster
+and market rank; within a group and minimum mean grade, minimum cluster
+points are sorted. Counting a student's courses per chance band is then a few
+bisections per group instead of a pass over every course, so a class of
+1,000 takes well under a second once the index is built.
+"""
+
+import csv
+import heapq
+import itertools
+from bisect import bisect_right
+
+from django.db import models
+
+from courses.catalog import get_catalog_snapshot
+from courses.generation import GRADE_RANKS
+from courses.models import Course
+from .models import GRADE_CHOICES_POINTS, StudentGrades
+from .scoring import (
+    CLUSTER_FIELDS, COMPETITIVE, HIGHLY_LIKELY, LOW_CHANCE, QUALIFIED, REACH, cluster_index, market_rank,
+)
+
+LEVELS = ('Degree', 'Diploma', 'Certificate', 'Artisan')
+PICK_LEVELS = ('Degree', 'Diploma')  # "Top Picks" on the results page come from these
+TOP_PICKS = 3
+MAX_RANK = max(GRADE_RANKS.values())
+
+GRADE_POINTS = {letter: points for points, letter in GRADE_CHOICES_POINTS}
+SUBJECT_FIELDS = [
+    field.name for field in StudentGrades._meta.fields
+    if isinstance(field, models.IntegerField) and field.choices
+]
+
+REPORT_HEADER = (
+    ['student', 'mean_grade']
+    + [field.replace('_points', '') for field in CLUSTER_FIELDS]
+    + [f"{level.lower()}_courses" for level in LEVELS]
+    + ['highly_likely', 'competitive', 'open_entry', 'reach', 'low_chance']
+    + [f"top_pick_{i}" for i in range(1, TOP_PICKS + 1)]
+    + ['error']
+)
+
+
+class StudentRow:
+    """One parsed CSV row: cluster points computed, or an error message."""
+
+    __slots__ = ('student', 'mean_grade', 'grades', 'error')
+
+    def __init__(self, student, mean_grade, grades=None, error=''):
+        self.student = student
+        self.mean_grade = mean_grade
+        self.grades = grades
+        self.error = error
+
+
+def _normalise(header):
+    return (header or '').strip().lower().replace(' ', '_').replace('-', '_')
+
+
+def parse_grade(value):
+    """Letter grade ('B+') or points ('10') to points; None when blank."""
+    value = (value or '').strip().upper()
+    if not value:
+        return None
+    if value in GRADE_POINTS:
+        return GRADE_POINTS[value]
+    if value.isdigit() and 1 <= int(value) <= 12:
+        return int(value)
+    raise ValueError(value)
+
+
+def read_class_csv(lines):
+    """
+    Checks the header and returns a generator of StudentRow, one per CSV row
+    (parsed lazily, so a report can stream while the upload is read).
+    Raises ValueError if the required columns are missing.
+    """
+    reader = csv.reader(lines)
+    header = [_normalise(h) for h in next(reader, [])]
+    if 'student' not in header or 'mean_grade' not in header:
+        raise ValueError("The CSV needs 'student' and 'mean_grade' columns")
+    subjects = [(i, name) for i, name in enumerate(header) if name in SUBJECT_FIELDS]
+    return _student_rows(reader, len(header), header.index('student'), header.index('mean_grade'), subjects)
+
+
+def _student_rows(reader, width, student_col, mean_col, subjects):
+    for values in reader:
+        if not any(v.strip() for v in values):
+            continue
+        values += [''] * (width - len(values))
+        student = values[student_col].strip()
+        mean_grade = values[mean_col].strip().upper()
+        if mean_grade not in GRADE_POINTS:
+            yield StudentRow(student, mean_grade, error=f"Unknown mean grade '{mean_grade}'")
+            continue
+        try:
+            grades = StudentGrades(mean_grade=mean_grade, **{name: parse_grade(values[i]) for i, name in subjects})
+        except ValueError as e:
+            yield StudentRow(student, mean_grade, error=f"Unknown grade '{e}'")
+            continue
+        grades.compute_clusters()
+        yield StudentRow(student, mean_grade, grades)
+
+
+class _Window:
+    """Courses of one group open to one mean grade: non-zero cut-offs sorted, open-entry names sorted."""
+
+    __slots__ = ('mins', 'names', 'open_names')
+
+    def __init__(self, entries):
+        ranked = sorted((points, name) for points, name in entries if points != 0)
+        self.mins = [points for points, _ in ranked]
+        self.names = [name for _, name in ranked]
+        self.open_names = sorted(name for points, name in entries if points == 0)
+
+    def bands(self, points):
+        """Course counts per chance band for a student with `points` in this group's cluster."""
+        highly = bisect_right(self.mins, points - 5)
+        competitive = bisect_right(self.mins, points)
+        reach = bisect_right(self.mins, points + 2)
+        return highly, competitive - highly, reach - competitive, len(self.mins) - reach
+
+    def names_in(self, chance, points):
+        if chance is QUALIFIED:
+            return self.open_names
+        bounds = {
+            HIGHLY_LIKELY: (None, points - 5),
+            COMPETITIVE: (points - 5, points),
+            REACH: (points, points + 2),
+            LOW_CHANCE: (points + 2, None),
+        }[chance]
+        start = 0 if bounds[0] is None else bisect_right(self.mins, bounds[0])
+        end = len(self.mins) if bounds[1] is None else bisect_right(self.mins, bounds[1])
+        return self.names[start:end]
+
+
+class CatalogIndex:
+    """The catalog grouped by (level, cluster, market rank), with a _Window per mean-grade rank."""
+
+    # Top-pick order: best chance first, as on the results page
+    PICK_ORDER = (HIGHLY_LIKELY, COMPETITIVE, QUALIFIED, REACH, LOW_CHANCE)
+
+    def __init__(self, rows):
+        grouped = {}
+        for name, level, path, grade_rank, min_points in rows:
+            level_name = next((l for l in LEVELS if l.lower() in (level or '').lower()), None)
+            if level_name is None:
+                continue
+            key = (level_name, cluster_index(path), market_rank(path))
+            grouped.setdefault(key, []).append((grade_rank, min_points or 0.0, f"{name} ({level_name})"))
+
+        self.groups = {}
+        for key, entries in grouped.items():
+            self.groups[key] = [
+                _Window([(points, label) for rank, points, label in entries if rank <= student_rank])
+                for student_rank in range(MAX_RANK + 1)
+            ]
+        self.market_ranks = sorted({key[2] for key in self.groups})
+        self.size = sum(len(entries) for entries in grouped.values())
+
+    @classmethod
+    def load(cls):
+        """From the catalog snapshot if one has been built, otherwise from the Course table."""
+        snapshot = get_catalog_snapshot()
+        if snapshot is not None:
+            rows = ((r.name, r.level, r.path, r.grade_rank, r.cluster_points) for r in snapshot.rows())
+        else:
+            rows = (
+                (name, level, path, GRADE_RANKS.get(grade, 0), points)
+                for name, level, path, grade, points in Course.objects.values_list(
+                    'name', 'level', 'path', 'min_mean_grade', 'min_cluster_points'
+                ).iterator(chunk_size=2000)
+            )
+        return cls(rows)
+
+    def score(self, grades):
+        """Course counts per level and per chance band, and the top picks, for one StudentGrades."""
+        rank = GRADE_RANKS[grades.mean_grade]
+        points = [getattr(grades, field) for field in CLUSTER_FIELDS]
+        per_level = dict.fromkeys(LEVELS, 0)
+        bands = [0, 0, 0, 0, 0]  # highly likely, competitive, open entry, reach, low chance
+        for (level, cluster, _), windows in self.groups.items():
+            window = windows[rank]
+            highly, competitive, reach, low = window.bands(points[cluster])
+            per_level[level] += len(window.mins) + len(window.open_names)
+            bands[0] += highly
+            bands[1] += competitive
+            bands[2] += len(window.open_names)
+            bands[3] += reach
+            bands[4] += low
+        return per_level, bands, self.top_picks(rank, points)
+
+    def top_picks(self, rank, points, limit=TOP_PICKS):
+        picks = []
+        for chance in self.PICK_ORDER:
+            for market in self.market_ranks:
+                for level in PICK_LEVELS:
+                    candidates = itertools.chain.from_iterable(
+                        self.groups[key][rank].names_in(chance, points[key[1]])
+                        for key in ((level, cluster, market) for cluster in range(len(CLUSTER_FIELDS)))
+                        if key in self.groups
+                    )
+                    picks.extend(heapq.nsmallest(limit - len(picks), candidates))
+                    if len(picks) >= limit:
+                        return picks
+        return picks
+
+
+def class_report(rows, index):
+    """Yields the CSV report: the header, then one row per student."""
+    yield REPORT_HEADER
+    for row in rows:
+        if row.error:
+            yield [row.student, row.mean_grade] + [''] * (len(REPORT_HEADER) - 3) + [row.error]
+            continue
+        per_level, bands, picks = index.score(row.grades)
+        yield (
+            [row.student, row.mean_grade]
+            + [getattr(row.grades, field) for field in CLUSTER_FIELDS]
+            + [per_level[level] for level in LEVELS]
+            + bands
+            + picks + [''] * (TOP_PICKS - len(picks))
+            + ['']
+        )
+
+
+class _Echo:
+    """File-like object for csv.writer that hands each line back instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(report):
+    """Encodes report rows as CSV lines, one at a time (for StreamingHttpResponse)."""
+    writer = csv.writer(_Echo())
+    for row in report:
+        yield writer.writerow(row)
@@ -0,0 +1,201 @@
+"""
+Cohort-based admission probabilities.
+
+The fixed gaps in students.scoring ignore how many other students want the
+same course. A nightly `build_cohort_model` run looks at every student's
+cluster points and at Favorite counts (our best signal of demand) and writes
+a small JSON model:
+
+  clusters   percentile table (101 points) of each cluster over all students
+  paths      percentile table of the path's cluster among students who
+             favourited a course in that path (the path's applicant pool),
+             when at least COHORT_MIN_POOL of them did
+  baseline   per path, the competition ratio of a course nobody favourited
+  ratios     per favourited course, (favourites + 1) / (path average + 1)
+
+A student's probability for a course compares their percentile in the pool
+with the cut-off's percentile, after shrinking the share of the pool above
+the cut-off by the course's competition ratio (a course twice as popular as
+its path's average effectively admits half as many of them). The margin goes
+through a logistic with COHORT_SPREAD so a student exactly on the effective
+bar gets 50%.
+
+Workers load the file once and re-read it when it is replaced, so the
+results page gets probabilities without any extra queries. Without a model
+(or with too few students) it keeps the fixed buckets.
+"""
+
+import json
+import logging
+import math
+import os
+from bisect import bisect_right
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db.models import Count
+
+from courses.models import Course
+from .models import Favorite, StudentGrades
+from .scoring import CLUSTER_FIELDS, cluster_index
+
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION = 1
+COHORT_STEPS = 100          # percentile tables hold COHORT_STEPS + 1 values
+COHORT_MIN_STUDENTS = 30    # fewer graded students than this: no model
+COHORT_MIN_POOL = 20        # fewer interested students than this: use the cluster table
+COHORT_SPREAD = 0.05        # percentile margin that moves the odds by a factor of e
+
+
+def percentile_table(values, steps=COHORT_STEPS):
+    """Values at 0, 1/steps, ..., 100% of the sorted sample (linear interpolation)."""
+    values = sorted(values)
+    last = len(values) - 1
+    table = []
+    for step in range(steps + 1):
+        position = last * step / steps
+        low = int(position)
+        high = min(low + 1, last)
+        table.append(round(values[low] + (values[high] - values[low]) * (position - low), 3))
+    return table
+
+
+def percentile_of(table, points):
+    """Share of the cohort (0-1) at or below `points`, interpolated within the table."""
+    if points < table[0]:
+        return 0.0
+    if points >= table[-1]:
+        return 1.0
+    i = bisect_right(table, points)  # table[i - 1] <= points < table[i]
+    low, high = table[i - 1], table[i]
+    fraction = (points - low) / (high - low) if high > low else 0.0
+    return (i - 1 + fraction) / (len(table) - 1)
+
+
+def build_cohort_model():
+    """Computes the model from StudentGrades and Favorite; returns a JSON-ready dict, or None if too few students."""
+    # 1. Cluster points of every graded student (one query)
+    cohort = {}
+    for row in StudentGrades.objects.filter(mean_grade__isnull=False).values_list('student_id', *CLUSTER_FIELDS):
+        cohort[row[0]] = row[1:]
+    if len(cohort) < COHORT_MIN_STUDENTS:
+        return None
+
+    clusters = [
+        percentile_table([points[c] or 0.0 for points in cohort.values()])
+        for c in range(len(CLUSTER_FIELDS))
+    ]
+
+    # 2. Applicant pools: students who favourited at least one course in a path
+    pools = {}
+    for user_id, path in Favorite.objects.values_list('user_id', 'course__path').distinct():
+        if user_id in cohort:
+            pools.setdefault(path, []).append(cohort[user_id][cluster_index(path)] or 0.0)
+    paths = {path: percentile_table(pool) for path, pool in pools.items() if len(pool) >= COHORT_MIN_POOL}
+
+    # 3. Demand: favourites per course against the average for its path
+    courses_per_path = dict(Course.objects.order_by().values_list('path').annotate(n=Count('id')))
+    favourites = list(Favorite.objects.order_by().values_list('course_id', 'course__path').annotate(n=Count('id')))
+    per_path = {}
+    for _, path, n in favourites:
+        per_path[path] = per_path.get(path, 0) + n
+    average = {path: per_path.get(path, 0) / count for path, count in courses_per_path.items() if count}
+
+    return {
+        'version': MODEL_VERSION,
+        'built_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'students': len(cohort),
+        'clusters': clusters,
+        'paths': paths,
+        'baseline': {path: round(1 / (avg + 1), 3) for path, avg in average.items()},
+        'ratios': {str(course_id): round((n + 1) / (average.get(path, 0) + 1), 3) for course_id, path, n in favourites},
+    }
+
+
+def write_cohort_model(filename=None):
+    """Builds and writes the model atomically (temp file + rename); returns it, or None if not written."""
+    filename = filename or settings.COHORT_MODEL_PATH
+    model = build_cohort_model()
+    if model is None:
+        return None
+    tmp_filename = filename + '.tmp'
+    with open(tmp_filename, 'w', encoding='utf-8') as f:
+        json.dump(model, f, separators=(',', ':'))
+    os.replace(tmp_filename, filename)
+    return model
+
+
+class CohortModel:
+    """A loaded model; probability() is pure arithmetic on the tables."""
+
+    def __init__(self, data):
+        if data.get('version') != MODEL_VERSION:
+            raise ValueError(f"Not a version {MODEL_VERSION} cohort model")
+        self.students = data['students']
+        self.built_at = data['built_at']
+        self.clusters = data['clusters']
+        self.paths = data['paths']
+        self.baseline = data['baseline']
+        self.ratios = {int(course_id): ratio for course_id, ratio in data['ratios'].items()}
+
+    def competition(self, course_id, path):
+        return self.ratios.get(course_id) or self.baseline.get(path, 1.0)
+
+    def probability(self, points, min_cluster_points, course_id, path):
+        """Estimated admission probability in percent (1-99), or None for open-entry courses."""
+        if not min_cluster_points:
+            return None
+        table = self.paths.get(path) or self.clusters[cluster_index(path)]
+        above_cutoff = 1.0 - percentile_of(table, min_cluster_points)
+        bar = 1.0 - above_cutoff / self.competition(course_id, path)
+        margin = percentile_of(table, points) - min(max(bar, 0.0), 1.0)
+        if points < min_cluster_points:
+            # Below the published cut-off: only a weak year gets you in
+            margin = min(margin, 0.0) - (min_cluster_points - points) / 100
+        chance = 100 / (1 + math.exp(-margin / COHORT_SPREAD))
+        return min(max(round(chance), 1), 99)
+
+
+def probability_label(percent):
+    """(label, bootstrap colour) for a probability from CohortModel.probability."""
+    if percent >= 75:
+        return f"{percent}% chance", "success"
+    if percent >= 40:
+        return f"{percent}% chance", "warning text-dark"
+    if percent >= 15:
+        return f"{percent}% chance", "danger"
+    return f"{percent}% chance", "secondary"
+
+
+_model = None
+_model_stamp = None
+
+
+def get_cohort_model():
+    """
+    This worker's CohortModel, or None if none has been built. The file is
+    re-read when it is replaced, so the nightly rebuild needs no restart. A
+    file from another model version, or a truncated one, also counts as none
+    (the results page falls back to the fixed chance buckets); it is only read
+    again once it changes.
+    """
+    global _model, _model_stamp
+    filename = settings.COHORT_MODEL_PATH
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+
+    stamp = (filename, stat.st_ino, stat.st_mtime_ns)
+    if stamp != _model_stamp:
+        try:
+            with open(filename, encoding='utf-8') as f:
+                _model = CohortModel(json.load(f))
+        except (ValueError, KeyError, TypeError, AttributeError) as exc:
+            # JSONDecodeError is a ValueError; the others come from JSON of the wrong shape
+            logger.warning("Ignoring cohort model %s: %s. Rebuild it with 'python manage.py build_cohort_model'.",
+                           filename, exc)
+            _model = None
+        _model_stamp = stamp
+    return _model
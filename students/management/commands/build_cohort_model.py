@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+
+from students.cohort import COHORT_MIN_STUDENTS, write_cohort_model
+
+
+class Command(BaseCommand):
+    help = ("Rebuilds the cohort admission model (cluster percentiles and course competition ratios) "
+            "used for the results page's probabilities. Run nightly, e.g. from cron.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Model file to write (default: settings.COHORT_MODEL_PATH)'
+        )
+
+    def handle(self, *args, **options):
+        output = options['output'] or settings.COHORT_MODEL_PATH
+        model = write_cohort_model(output)
+        if model is None:
+            raise CommandError(f"Fewer than {COHORT_MIN_STUDENTS} students have entered grades; model not written.")
+        self.stdout.write(self.style.SUCCESS(
+            f"Cohort model from {model['students']} students, {len(model['paths'])} path pools and "
+            f"{len(model['ratios'])} favourited courses written to {output}"
+        ))
@@ -0,0 +1,59 @@
+import csv
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from students.batch import CatalogIndex, class_report, read_class_csv
+
+
+class Command(BaseCommand):
+    help = "Computes cluster points, course counts per admission chance and top picks for a class CSV of grades."
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', type=str, help="CSV with 'student', 'mean_grade' and subject columns")
+        parser.add_argument(
+            '--output',
+            type=str,
+            default=None,
+            help='Report CSV to write (default: stdout)'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+
+        # 1. Index the catalog once for the whole class
+        index = CatalogIndex.load()
+        if not index.size:
+            raise CommandError("The course catalog is empty.")
+
+        # 2. Score every student, writing the report as we go
+        try:
+            source = open(options['input'], 'r', encoding='utf-8-sig', newline='')
+        except OSError as e:
+            raise CommandError(f"Could not open {options['input']}: {e}")
+
+        students = errors = 0
+        with source:
+            try:
+                rows = read_class_csv(source)
+            except ValueError as e:
+                raise CommandError(str(e))
+
+            target = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else None
+            writer = csv.writer(target or self.stdout)
+            try:
+                report = class_report(rows, index)
+                writer.writerow(next(report))  # header
+                for row in report:
+                    writer.writerow(row)
+                    students += 1
+                    errors += bool(row[-1])
+            finally:
+                if target:
+                    target.close()
+
+        # 3. Summary
+        if options['output']:
+            self.stdout.write(self.style.SUCCESS(
+                f"{students} students ({errors} with errors) scored against {index.size} courses "
+                f"in {time.perf_counter() - start:.2f}s -> {options['output']}"
+            ))
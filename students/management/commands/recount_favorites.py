@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from students.models import Favorite
+
+
+class Command(BaseCommand):
+    help = ("Resets Course.favorite_count from the Favorite table. toggle_favorite keeps the counts in step; "
+            "run this after bulk changes that bypass it (deleted accounts, imports, admin deletes).")
+
+    def handle(self, *args, **options):
+        courses = Favorite.recount()
+        self.stdout.write(self.style.SUCCESS(f"Favourite counts reset for {courses} courses"))
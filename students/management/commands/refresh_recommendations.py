@@ -0,0 +1,30 @@
+import time
+from django.core.management.base import BaseCommand
+
+from students.recommend import TOP_K, refresh_recommendations
+
+
+class Command(BaseCommand):
+    help = ("Updates the \"students who saved this also saved\" neighbours from favourites and positive reviews. "
+            "Only students whose saved courses changed since the last run are recounted.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Recount every student and rewrite every course (ignores the saved state)'
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=TOP_K,
+            help='Neighbours kept per course'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        students, courses, rows = refresh_recommendations(full=options['full'], top=options['top'])
+        self.stdout.write(self.style.SUCCESS(
+            f"{students} students changed; {courses} courses re-ranked ({rows} neighbours) "
+            f"in {time.perf_counter() - start:.2f}s"
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from students.placement import run_placement
+
+
+class Command(BaseCommand):
+    help = ("Runs the placement simulation over every student's favourites and caches each result. "
+            "Skips the run when nothing changed since the last one; schedule it every few minutes.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Run even if grades, favourites and course limits are unchanged'
+        )
+
+    def handle(self, *args, **options):
+        run = run_placement(force=options['force'])
+        if run is None:
+            self.stdout.write("Nothing changed since the last placement run.")
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f"{run.placed} of {run.students} students placed; {run.changed} placements updated in {run.seconds:.2f}s"
+        ))
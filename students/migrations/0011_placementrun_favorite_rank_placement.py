@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('courses', '0004_course_capacity'),
+        ('students', '0010_studentgrades_edit_count_studentgrades_last_updated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlacementRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('finished_at', models.DateTimeField(auto_now_add=True)),
+                ('watermark', models.CharField(help_text='Fingerprint of the inputs this run used', max_length=200)),
+                ('students', models.PositiveIntegerField(default=0)),
+                ('placed', models.PositiveIntegerField(default=0)),
+                ('changed', models.PositiveIntegerField(default=0, help_text='Placement rows written')),
+                ('seconds', models.FloatField(default=0.0)),
+            ],
+            options={
+                'get_latest_by': 'finished_at',
+            },
+        ),
+        migrations.AddField(
+            model_name='favorite',
+            name='rank',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Choice order for the placement simulation (1 = first choice); saved order when blank', null=True),
+        ),
+        migrations.CreateModel(
+            name='Placement',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('choice', models.PositiveSmallIntegerField(blank=True, help_text='Which favourite (1 = first choice)', null=True)),
+                ('points', models.FloatField(default=0.0, help_text='Cluster points the student competed with')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('course', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='courses.course')),
+            ],
+        ),
+    ]
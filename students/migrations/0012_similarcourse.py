@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 15:13
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_course_capacity'),
+        ('students', '0011_placementrun_favorite_rank_placement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarCourse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField(help_text='1 = closest neighbour')),
+                ('score', models.FloatField(help_text="Cosine similarity of the two courses' savers")),
+                ('co_saves', models.PositiveIntegerField(help_text='Students who saved or rated both')),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_courses', to='courses.course')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='courses.course')),
+            ],
+            options={
+                'ordering': ['course', 'rank'],
+                'unique_together': {('course', 'rank')},
+            },
+        ),
+    ]
@@ -1,5 +1,7 @@
 import math
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator, MaxValueValidator
 # --- IMPORT COURSE MODEL (Needed for Favorites) ---
@@ -97,6 +99,11 @@ class StudentGrades(models.Model):
         return data
 
     def calculate_all_clusters(self):
+        self.compute_clusters()
+        self.save()
+
+    def compute_clusters(self):
+        """Sets the four cluster_points_* fields from the subject grades without saving."""
         grades = self._get_all_grades_as_dict()
 
         # --- Cluster: MEDICINE ---
@@ -130,8 +137,6 @@ class StudentGrades(models.Model):
         arts_g3 = max(grades['history'], grades['geography'], grades['cre'])
         arts_g4 = max(grades['kiswahili'], grades['french'], grades['german'], grades['business_studies'], grades['music'])
         self.cluster_points_arts = arts_g1 + arts_g2 + arts_g3 + arts_g4
-        
-        self.save()
 
 
 # --- PAYMENT MODEL (Updated for Manual Pay) ---
@@ -151,9 +156,64 @@ class Favorite(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
     saved_at = models.DateTimeField(auto_now_add=True)
+    rank = models.PositiveSmallIntegerField(
+        null=True, blank=True,
+        help_text="Choice order for the placement simulation (1 = first choice); saved order when blank"
+    )
 
     class Meta:
         unique_together = ('user', 'course')
 
     def __str__(self):
-        return f"{self.user.username} -> {self.course.name}"
\ No newline at end of file
+        return f"{self.user.username} -> {self.course.name}"
+
+    @staticmethod
+    def recount(course_ids=None):
+        """Resets Course.favorite_count from the Favorite rows (all courses, or the given ones)."""
+        saves = Favorite.objects.filter(course=OuterRef('pk')).order_by().values('course')
+        saves = saves.annotate(n=Count('id')).values('n')
+        courses = Course.objects.all() if course_ids is None else Course.objects.filter(id__in=course_ids)
+        return courses.update(favorite_count=Coalesce(Subquery(saves), 0))
+
+
+# --- PLACEMENT SIMULATION (see students/placement.py) ---
+class Placement(models.Model):
+    student = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+    course = models.ForeignKey(Course, on_delete=models.SET_NULL, null=True, blank=True)
+    choice = models.PositiveSmallIntegerField(null=True, blank=True, help_text="Which favourite (1 = first choice)")
+    points = models.FloatField(default=0.0, help_text="Cluster points the student competed with")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.student.username} -> {self.course.name if self.course else 'not placed'}"
+
+
+class PlacementRun(models.Model):
+    finished_at = models.DateTimeField(auto_now_add=True)
+    watermark = models.CharField(max_length=200, help_text="Fingerprint of the inputs this run used")
+    students = models.PositiveIntegerField(default=0)
+    placed = models.PositiveIntegerField(default=0)
+    changed = models.PositiveIntegerField(default=0, help_text="Placement rows written")
+    seconds = models.FloatField(default=0.0)
+
+    class Meta:
+        get_latest_by = 'finished_at'
+
+    def __str__(self):
+        return f"Placement run {self.finished_at:%Y-%m-%d %H:%M} ({self.placed}/{self.students} placed)"
+
+
+# --- "ALSO SAVED" RECOMMENDATIONS (see students/recommend.py) ---
+class SimilarCourse(models.Model):
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='similar_courses')
+    similar = models.ForeignKey(Course, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField(help_text="1 = closest neighbour")
+    score = models.FloatField(help_text="Cosine similarity of the two courses' savers")
+    co_saves = models.PositiveIntegerField(help_text="Students who saved or rated both")
+
+    class Meta:
+        unique_together = ('course', 'rank')
+        ordering = ['course', 'rank']
+
+    def __str__(self):
+        return f"{self.course_id} -> {self.similar_id} (#{self.rank})"
@@ -0,0 +1,181 @@
+"""
+Placement simulation: a KUCCPS-style run over the students' favourites.
+
+Each student applies to their favourites in order (Favorite.rank, then the
+order they were saved). A course accepts students who meet its minimum mean
+grade and cluster points; once it is full (Course.capacity, blank = no limit)
+it keeps the highest cluster points (then the higher mean grade, then the
+earlier registration) and rejects the rest, who move on to their next choice.
+This is student-proposing deferred acceptance: every student gets the best
+placement any stable outcome could give them, and the result does not depend
+on the order students are processed in.
+
+The cohort is loaded once into flat per-student lists (eligible choices and
+the score each one would be ranked by) and course heaps, so 100k students x
+10 choices runs in seconds. Results are cached per student in Placement;
+only rows whose placement changed are written, and run_placement() skips the
+run entirely when grades, favourites and course requirements and limits are
+unchanged since the last PlacementRun.
+"""
+
+import hashlib
+import heapq
+import itertools
+import time
+
+from django.db import transaction
+from django.db.models import Count, F, Max, Sum
+from django.utils import timezone
+
+from courses.generation import GRADE_RANKS
+from courses.models import Course
+from .models import Favorite, Placement, PlacementRun, StudentGrades
+from .scoring import CLUSTER_FIELDS, cluster_index
+
+WRITE_BATCH = 2000
+
+
+def deferred_acceptance(choices, scores, capacities):
+    """
+    choices[s] lists course indexes in student s's order, scores[s][k] is how
+    course choices[s][k] ranks them, capacities[c] is a limit or None.
+    Returns, per student, the index into choices[s] they end up placed at, or -1.
+    """
+    placed = [-1] * len(choices)
+    next_choice = [0] * len(choices)
+    held = [[] for _ in capacities]  # min-heap per course of ((score, -student), student)
+    free = list(range(len(choices)))
+    while free:
+        student = free.pop()
+        prefs, k = choices[student], next_choice[student]
+        while k < len(prefs):
+            course = prefs[k]
+            key = (scores[student][k], -student)
+            k += 1
+            capacity, heap = capacities[course], held[course]
+            if capacity is None or len(heap) < capacity:
+                heapq.heappush(heap, (key, student))
+                placed[student] = k - 1
+                break
+            if heap and heap[0][0] < key:
+                # Full: bump the weakest holder, who goes back to proposing
+                _, bumped = heapq.heapreplace(heap, (key, student))
+                placed[bumped] = -1
+                free.append(bumped)
+                placed[student] = k - 1
+                break
+        next_choice[student] = k
+    return placed
+
+
+def course_checksum():
+    """SHA-256 over each course's entry requirements and capacity, in id order."""
+    digest = hashlib.sha256()
+    rows = Course.objects.order_by('id').values_list('id', 'path', 'min_mean_grade', 'min_cluster_points', 'capacity')
+    for row in rows.iterator(chunk_size=5000):
+        digest.update(repr(row).encode())
+    return digest.hexdigest()
+
+
+def input_watermark():
+    """
+    Fingerprint of everything a run reads, to tell whether a new run is needed.
+    Grades and favourites are summarised by aggregates; courses are hashed row
+    by row, since edits such as a changed min_mean_grade or two capacities
+    swapped leave any sum unchanged.
+    """
+    grades = StudentGrades.objects.aggregate(n=Count('student'), changed=Max('last_updated'))
+    favourites = Favorite.objects.aggregate(
+        n=Count('id'), newest=Max('saved_at'), order=Sum(F('rank') * F('course_id')),
+    )
+    parts = [*grades.values(), *favourites.values(), course_checksum()]
+    return '|'.join(str(value) for value in parts)[:200]
+
+
+def load_cohort():
+    """
+    Students (by id) with their eligible choices, scores and original choice
+    numbers, plus course ids and capacities by index.
+    """
+    # 1. Courses: entry requirements and limits
+    course_ids, capacities, requirements, course_index = [], [], [], {}
+    rows = Course.objects.values_list('id', 'path', 'min_mean_grade', 'min_cluster_points', 'capacity')
+    for course_id, path, grade, points, capacity in rows.iterator(chunk_size=5000):
+        course_index[course_id] = len(course_ids)
+        course_ids.append(course_id)
+        capacities.append(capacity)
+        requirements.append((GRADE_RANKS.get(grade, 0), points or 0.0, cluster_index(path)))
+
+    # 2. Students with grades
+    grades = {}
+    fields = ('student_id', 'mean_grade') + CLUSTER_FIELDS
+    for student_id, mean_grade, *points in StudentGrades.objects.values_list(*fields).iterator(chunk_size=5000):
+        if mean_grade:
+            grades[student_id] = (GRADE_RANKS.get(mean_grade, 0), [p or 0.0 for p in points])
+
+    # 3. Favourites in choice order, one group per student
+    student_ids, choices, scores, numbers = [], [], [], []
+    favourites = Favorite.objects.order_by(
+        'user_id', F('rank').asc(nulls_last=True), 'saved_at', 'id'
+    ).values_list('user_id', 'course_id')
+    for student_id, group in itertools.groupby(favourites.iterator(chunk_size=5000), key=lambda row: row[0]):
+        if student_id not in grades:
+            continue
+        rank, points = grades[student_id]
+        eligible, keys, positions = [], [], []
+        for number, (_, course_id) in enumerate(group, start=1):
+            c = course_index.get(course_id)
+            if c is None:
+                continue
+            min_rank, min_points, cluster = requirements[c]
+            if rank >= min_rank and points[cluster] >= min_points:
+                eligible.append(c)
+                keys.append((points[cluster], rank))
+                positions.append(number)
+        student_ids.append(student_id)
+        choices.append(eligible)
+        scores.append(keys)
+        numbers.append(positions)
+    return student_ids, choices, scores, numbers, course_ids, capacities
+
+
+def run_placement(force=False):
+    """Simulates the whole cohort unless nothing changed since the last run; returns the PlacementRun or None."""
+    start = time.perf_counter()
+    watermark = input_watermark()
+    last = PlacementRun.objects.order_by('-finished_at', '-id').first()
+    if not force and last is not None and last.watermark == watermark:
+        return None
+
+    student_ids, choices, scores, numbers, course_ids, capacities = load_cohort()
+    placed = deferred_acceptance(choices, scores, capacities)
+
+    # Write only what changed
+    existing = {row[0]: row[1:] for row in Placement.objects.values_list('student_id', 'course_id', 'choice', 'points')}
+    now = timezone.now()
+    to_create, to_update = [], []
+    for s, student_id in enumerate(student_ids):
+        k = placed[s]
+        if k >= 0:
+            row = (course_ids[choices[s][k]], numbers[s][k], scores[s][k][0])
+        else:
+            row = (None, None, 0.0)
+        current = existing.pop(student_id, None)
+        if current == row:
+            continue
+        placement = Placement(student_id=student_id, course_id=row[0], choice=row[1], points=row[2], updated_at=now)
+        (to_create if current is None else to_update).append(placement)
+
+    with transaction.atomic():
+        Placement.objects.bulk_create(to_create, batch_size=WRITE_BATCH)
+        Placement.objects.bulk_update(to_update, ['course', 'choice', 'points', 'updated_at'], batch_size=WRITE_BATCH)
+        stale = list(existing)  # no longer have grades or favourites
+        for i in range(0, len(stale), WRITE_BATCH):
+            Placement.objects.filter(student_id__in=stale[i:i + WRITE_BATCH]).delete()
+        return PlacementRun.objects.create(
+            watermark=watermark,
+            students=len(student_ids),
+            placed=sum(1 for k in placed if k >= 0),
+            changed=len(to_create) + len(to_update) + len(stale),
+            seconds=round(time.perf_counter() - start, 3),
+        )
@@ -0,0 +1,174 @@
+"""
+"Students who saved this also saved": item-to-item course recommendations.
+
+A student's basket is the set of courses they saved (Favorite) or rated
+POSITIVE_RATING or more (CourseReview). Two courses co-occur once for every
+basket holding both. A neighbour's score is the cosine similarity of the two
+courses' savers, co_saves / sqrt(saves_a * saves_b), and every course keeps
+its TOP_K best neighbours (with at least MIN_CO_SAVES co-saves) as
+SimilarCourse rows, so a page needs one indexed lookup to show them.
+
+refresh_recommendations() is incremental: the baskets and the sparse
+co-occurrence counts from the previous run are kept in
+settings.RECOMMENDER_STATE_PATH. Only students whose basket changed are
+re-counted, only courses whose scores could have moved are re-ranked, and
+only those courses' rows are rewritten.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import pickle
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+
+from courses.models import Course, CourseReview
+from .models import Favorite, SimilarCourse
+
+POSITIVE_RATING = 4
+TOP_K = 10
+MIN_CO_SAVES = 2
+STATE_VERSION = 1
+WRITE_BATCH = 2000
+
+
+def current_baskets():
+    """{user_id: frozenset(course_ids)} from favourites and positive reviews."""
+    baskets = defaultdict(set)
+    for user_id, course_id in Favorite.objects.values_list('user_id', 'course_id').iterator(chunk_size=10000):
+        baskets[user_id].add(course_id)
+    positive = CourseReview.objects.filter(rating__gte=POSITIVE_RATING).values_list('user_id', 'course_id')
+    for user_id, course_id in positive.iterator(chunk_size=10000):
+        baskets[user_id].add(course_id)
+    return {user_id: frozenset(courses) for user_id, courses in baskets.items()}
+
+
+class CoOccurrence:
+    """Baskets, saves per course and the sparse course x course co-occurrence counts."""
+
+    def __init__(self):
+        self.baskets = {}
+        self.saves = Counter()
+        self.pairs = defaultdict(Counter)
+
+    def _pair(self, a, b, sign, touched):
+        touched.update((a, b))
+        self.pairs[a][b] += sign
+        self.pairs[b][a] += sign
+        if not self.pairs[a][b]:
+            del self.pairs[a][b], self.pairs[b][a]
+
+    def update(self, baskets):
+        """
+        Applies the difference between the stored baskets and `baskets`.
+        Returns (students changed, courses whose neighbour lists may have changed).
+        """
+        touched, resaved = set(), set()
+        changed = 0
+        for user_id in self.baskets.keys() | baskets.keys():
+            old, new = self.baskets.get(user_id, frozenset()), baskets.get(user_id, frozenset())
+            if old == new:
+                continue
+            changed += 1
+            # Pairs inside the part of the basket that stayed keep their counts
+            kept = old & new
+            for courses, sign in ((sorted(old - new), -1), (sorted(new - old), +1)):
+                for course in courses:
+                    self.saves[course] += sign
+                    resaved.add(course)
+                    for other in kept:
+                        self._pair(course, other, sign, touched)
+                for a, b in itertools.combinations(courses, 2):
+                    self._pair(a, b, sign, touched)
+        self.baskets = baskets
+        for course in [c for c in resaved if not self.saves[c]]:
+            del self.saves[course]
+            self.pairs.pop(course, None)
+
+        # A course's save count is in every neighbour's score: re-rank those too
+        affected = touched | resaved
+        for course in resaved:
+            affected.update(self.pairs.get(course, ()))
+        return changed, affected
+
+    def neighbours(self, course, top=TOP_K):
+        """[(score, similar_id, co_saves)] best first."""
+        saves = self.saves[course]
+        candidates = (
+            (co_saves / math.sqrt(saves * self.saves[other]), other, co_saves)
+            for other, co_saves in self.pairs.get(course, {}).items()
+            if co_saves >= MIN_CO_SAVES
+        )
+        return heapq.nlargest(top, candidates, key=lambda n: (n[0], n[2], -n[1]))
+
+    @classmethod
+    def load(cls, filename):
+        """The state saved by the last run, or None if there is none (or it is from another version)."""
+        try:
+            with open(filename, 'rb') as f:
+                version, state = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, ValueError):
+            return None
+        return state if version == STATE_VERSION else None
+
+    def save(self, filename):
+        tmp_filename = filename + '.tmp'
+        with open(tmp_filename, 'wb') as f:
+            pickle.dump((STATE_VERSION, self), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_filename, filename)
+
+
+def refresh_recommendations(full=False, top=TOP_K, filename=None):
+    """
+    Brings SimilarCourse up to date with favourites and reviews. Returns
+    (students changed, courses re-ranked, rows written).
+    """
+    filename = filename or settings.RECOMMENDER_STATE_PATH
+    state = None if full else CoOccurrence.load(filename)
+    if state is None:
+        state, full = CoOccurrence(), True
+
+    changed, affected = state.update(current_baskets())
+    if full:
+        affected = set(state.saves) | set(SimilarCourse.objects.values_list('course_id', flat=True).distinct())
+
+    existing = set(Course.objects.values_list('id', flat=True))
+    rows = [
+        SimilarCourse(course_id=course, similar_id=other, rank=rank, score=round(score, 4), co_saves=co_saves)
+        for course in affected if course in existing
+        for rank, (score, other, co_saves) in enumerate(state.neighbours(course, top), start=1)
+        if other in existing
+    ]
+    affected = sorted(affected)
+    with transaction.atomic():
+        for i in range(0, len(affected), WRITE_BATCH):
+            SimilarCourse.objects.filter(course_id__in=affected[i:i + WRITE_BATCH]).delete()
+        SimilarCourse.objects.bulk_create(rows, batch_size=WRITE_BATCH)
+    state.save(filename)
+    return changed, len(affected), len(rows)
+
+
+# --- LOOKUPS FOR PAGES (one query each) ---
+
+def also_saved(course_ids, limit=3):
+    """{course_id: [similar Course, ...]} best first, for all of `course_ids` in one query."""
+    found = defaultdict(list)
+    rows = SimilarCourse.objects.filter(course_id__in=course_ids, rank__lte=limit).select_related('similar')
+    for row in rows:
+        found[row.course_id].append(row.similar)
+    return found
+
+
+def recommended_for(course_ids, limit=6):
+    """Courses most similar to a set of saved courses (excluding them), best first, in one query."""
+    scores = defaultdict(float)
+    courses = {}
+    rows = SimilarCourse.objects.filter(course_id__in=course_ids).exclude(similar_id__in=course_ids)
+    for row in rows.select_related('similar'):
+        scores[row.similar_id] += row.score
+        courses[row.similar_id] = row.similar
+    best = heapq.nlargest(limit, scores, key=lambda course_id: (scores[course_id], -course_id))
+    return [courses[course_id] for course_id in best]
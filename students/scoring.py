@@ -0,0 +1,59 @@
+"""
+Admission-chance scoring shared by the results page and class batches.
+
+A course is scored against the student's cluster points for its path:
+Medicine uses the medicine cluster; Engineering, Sciences, Agriculture and
+ICT use the engineering cluster; Law uses law; everything else uses arts.
+"""
+
+# (label, bootstrap colour, sort score), best first in the results page's "Top Picks"
+QUALIFIED = ("Qualified", "success", 10)
+HIGHLY_LIKELY = ("Highly Likely", "success", 20)
+COMPETITIVE = ("Competitive", "warning text-dark", 15)
+REACH = ("Reach (Risky)", "danger", 5)
+LOW_CHANCE = ("Low Chance", "secondary", 0)
+
+CLUSTER_FIELDS = (
+    'cluster_points_medicine', 'cluster_points_engineering',
+    'cluster_points_law', 'cluster_points_arts',
+)
+
+
+def cluster_index(path):
+    """Which of CLUSTER_FIELDS applies to a course path."""
+    path_lower = (path or '').lower()
+    if 'med' in path_lower:
+        return 0
+    if 'engin' in path_lower or 'sci' in path_lower or 'agri' in path_lower or 'ict' in path_lower:
+        return 1
+    if 'law' in path_lower:
+        return 2
+    return 3
+
+
+def student_points(grades, path):
+    """The student's cluster points for a course path."""
+    return getattr(grades, CLUSTER_FIELDS[cluster_index(path)])
+
+
+def admission_chance(points, min_cluster_points):
+    """(label, colour, sort score) for a student with `points` applying to a course."""
+    if min_cluster_points == 0:
+        return QUALIFIED
+    gap = points - min_cluster_points
+    if gap >= 5:
+        return HIGHLY_LIKELY
+    if gap >= 0:
+        return COMPETITIVE
+    if gap >= -2:
+        return REACH
+    return LOW_CHANCE
+
+
+def market_rank(path):
+    """Demand ordering used by results (Medicine first); mirrors the view's Case() annotation."""
+    path_lower = (path or '').lower()
+    for rank, keyword in enumerate(('medicine', 'engineering', 'ict', 'law', 'business'), start=1):
+        if keyword in path_lower:
+            return rank
+    return 20
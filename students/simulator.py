@@ -0,0 +1,119 @@
+"""
+"What-if" grade simulator.
+
+For each (level, cluster) the catalog is kept as one array sorted by
+(grade rank, cluster cut-off). A student with mean-grade rank r and cluster
+points p is within reach of a course (Qualified, Highly Likely or
+Competitive on the results page) when grade_rank <= r and cut-off <= p, so
+for every grade rank up to r the reachable courses are a prefix of that
+rank's block, found by binary search. Comparing two grade sets is then a
+difference of prefixes: the courses in between are the ones that unlock
+(or lock). No SQL runs per simulation; the arrays are built once per worker
+and rebuilt when the catalog snapshot changes (or every CUTOFF_INDEX_TTL
+seconds when reading the Course table).
+"""
+
+import time
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+
+from courses.catalog import get_catalog_snapshot
+from courses.generation import GRADE_RANKS
+from courses.models import Course
+from .batch import LEVELS
+from .scoring import CLUSTER_FIELDS, cluster_index
+
+CUTOFF_INDEX_TTL = 300
+
+SimCourse = namedtuple('SimCourse', 'id name level path cutoff')
+
+
+class CutoffArrays:
+    """Courses of one (level, cluster), sorted by (grade rank, cut-off)."""
+
+    __slots__ = ('keys', 'courses')
+
+    def __init__(self, entries):
+        entries.sort(key=lambda entry: (entry[0], entry[1].cutoff, entry[1].name))
+        self.keys = [(rank, course.cutoff) for rank, course in entries]
+        self.courses = [course for _, course in entries]
+
+    def reachable(self, rank, points):
+        """(start, end) slices of the courses within reach, one per grade rank block up to `rank`."""
+        slices = []
+        for grade_rank in range(rank + 1):
+            start = bisect_left(self.keys, (grade_rank, float('-inf')))
+            end = bisect_right(self.keys, (grade_rank, points))
+            if end > start:
+                slices.append((grade_rank, start, end))
+        return slices
+
+    def changed(self, before, after):
+        """Courses within reach for `after` but not for `before`; each is a (rank, points) pair."""
+        old = {grade_rank: end for grade_rank, _, end in self.reachable(*before)}
+        gained = []
+        for grade_rank, start, end in self.reachable(*after):
+            start = max(start, old.get(grade_rank, start))
+            gained.extend(self.courses[start:end])
+        return gained
+
+
+class CutoffIndex:
+    """CutoffArrays for every (level, cluster) in the catalog."""
+
+    def __init__(self, courses):
+        grouped = {}
+        for grade_rank, course in courses:
+            level = next((l for l in LEVELS if l.lower() in (course.level or '').lower()), None)
+            if level is not None:
+                grouped.setdefault((level, cluster_index(course.path)), []).append((grade_rank, course))
+        self.arrays = {key: CutoffArrays(entries) for key, entries in grouped.items()}
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        return cls(
+            (row.grade_rank, SimCourse(row.id, row.name, row.level, row.path, row.cluster_points))
+            for row in snapshot.rows()
+        )
+
+    @classmethod
+    def from_database(cls):
+        rows = Course.objects.values_list('id', 'name', 'level', 'path', 'min_mean_grade', 'min_cluster_points')
+        return cls(
+            (GRADE_RANKS.get(grade, 0), SimCourse(course_id, name, level, path, points or 0.0))
+            for course_id, name, level, path, grade, points in rows.iterator(chunk_size=2000)
+        )
+
+    def compare(self, before, after):
+        """
+        Courses that unlock and lock going from `before` to `after`, each a
+        StudentGrades (only mean_grade and cluster points are read).
+        """
+        unlocked, locked = {}, {}
+        old_rank, new_rank = GRADE_RANKS.get(before.mean_grade, 0), GRADE_RANKS.get(after.mean_grade, 0)
+        for (level, cluster), arrays in self.arrays.items():
+            old = (old_rank, getattr(before, CLUSTER_FIELDS[cluster]))
+            new = (new_rank, getattr(after, CLUSTER_FIELDS[cluster]))
+            unlocked.setdefault(level, []).extend(arrays.changed(old, new))
+            locked.setdefault(level, []).extend(arrays.changed(new, old))
+        return unlocked, locked
+
+
+_index = None
+_index_source = None
+
+
+def get_cutoff_index():
+    """This worker's CutoffIndex, rebuilt when the catalog snapshot changes (or after CUTOFF_INDEX_TTL)."""
+    global _index, _index_source
+    snapshot = get_catalog_snapshot()
+    source = snapshot if snapshot is not None else int(time.monotonic() // CUTOFF_INDEX_TTL)
+    if _index is None or source != _index_source:
+        _index = CutoffIndex.from_snapshot(snapshot) if snapshot is not None else CutoffIndex.from_database()
+        _index_source = source
+    return _index
+
+
+def reset_cutoff_index():
+    global _index, _index_source
+    _index = _index_source = None
@@ -1,3 +1,680 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import random
+import tempfile
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+
+from coursereviews.benchmarks import JOURNEY_PREFIX, find_regressions
+from coursereviews.testing import QueryBudgetMixin
+from courses.generation import GRADE_RANKS
+from courses.models import Course, CourseReview
+from courses.snapshot import SnapshotWriter
+from students.cohort import MODEL_VERSION, CohortModel, build_cohort_model, get_cohort_model, percentile_of, percentile_table
+from students.batch import REPORT_HEADER, CatalogIndex, class_report, read_class_csv
+from students.models import Favorite, Payment, Placement, SimilarCourse, StudentGrades
+from students.placement import deferred_acceptance, load_cohort, run_placement
+from students.recommend import refresh_recommendations
+from students.scoring import COMPETITIVE, HIGHLY_LIKELY, QUALIFIED, admission_chance, student_points
+from students.simulator import get_cutoff_index, reset_cutoff_index
+
+
+# ==========================================
+# BENCHMARK SUITE
+# ==========================================
+
+class BenchmarkSuiteTests(TestCase):
+
+    def test_seed_benchmark_data(self):
+        call_command('seed_benchmark_data', students=20, courses=40, reviews=2, favorites=3, posts=5,
+                     stdout=StringIO())
+        self.assertEqual(Course.objects.count(), 40)
+        self.assertEqual(StudentGrades.objects.count(), 20)
+        self.assertEqual(CourseReview.objects.count(), 40)
+        self.assertEqual(Favorite.objects.count(), 60)
+        grades = StudentGrades.objects.first()
+        self.assertGreater(grades.cluster_points_medicine, 0)
+
+        # Re-seeding replaces the students instead of piling up
+        call_command('seed_benchmark_data', students=10, courses=40, reviews=1, favorites=1, posts=5,
+                     stdout=StringIO())
+        self.assertEqual(User.objects.filter(username__startswith='bench_student_').count(), 10)
+        self.assertEqual(Payment.objects.count(), 10)
+
+    def test_journeys_run_in_process_and_gate_on_baseline(self):
+        call_command('seed_benchmark_data', students=2, courses=10, posts=0, stdout=StringIO())
+        with tempfile.TemporaryDirectory() as tmp:
+            report_file = os.path.join(tmp, 'baseline.json')
+            out = StringIO()
+            call_command('run_benchmarks', journeys=2, save=report_file, stdout=out)
+            self.assertIn('review_submit', out.getvalue())
+            self.assertFalse(User.objects.filter(username__startswith=JOURNEY_PREFIX).exists())
+
+            with open(report_file) as f:
+                report = json.load(f)
+            self.assertEqual(report['errors'], 0)
+            self.assertEqual(report['steps']['results']['requests'], 2)
+            self.assertIsNotNone(report['steps']['results']['queries'])
+
+            # A baseline with fewer queries than today fails the run
+            report['steps']['results']['queries'] -= 3
+            with open(report_file, 'w') as f:
+                json.dump(report, f)
+            with self.assertRaisesMessage(CommandError, 'results:'):
+                call_command('run_benchmarks', journeys=1, baseline=report_file, threshold=100, stdout=StringIO())
+
+    def test_find_regressions_thresholds(self):
+        baseline = {'throughput': 100.0, 'steps': {'results': {'p95': 100.0, 'queries': 10}}}
+        report = {'throughput': 90.0, 'steps': {'results': {'p95': 120.0, 'queries': 10}}}
+        self.assertEqual(find_regressions(report, baseline, threshold=0.25), [])
+
+        report = {'throughput': 70.0, 'steps': {'results': {'p95': 130.0, 'queries': 12}}}
+        self.assertEqual(len(find_regressions(report, baseline, threshold=0.25)), 3)
+        self.assertEqual(len(find_regressions(report, baseline, threshold=0.5, query_threshold=2)), 0)
+
+
+# ==========================================
+# QUERY BUDGETS
+# ==========================================
+
+class StudentQueryCountTests(QueryBudgetMixin, TestCase):
+    """Upper bounds on SQL per page for a paid student with realistic data; N+1 checks where lists grow."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='achieng', password='pw')
+        grades = StudentGrades(student=self.user, mean_grade='B+', mathematics=10, english=11, kiswahili=9,
+                               biology=10, physics=9, chemistry=10, history=8, geography=9)
+        grades.calculate_all_clusters()
+        Payment.objects.create(user=self.user, has_paid=True, transaction_code='QB12345678')
+        self.reviewers = [User.objects.create_user(username=f'reviewer{i}', password='pw') for i in range(3)]
+        self.add_courses(0, 12)
+        self.course = Course.objects.order_by('id').first()
+        self.client.force_login(self.user)
+
+    def add_courses(self, start, count):
+        levels = ['Degree', 'Diploma', 'Certificate', 'Artisan']
+        paths = ['Medicine', 'Engineering', 'ICT', 'Law', 'Business', 'Arts']
+        courses = Course.objects.bulk_create([
+            Course(name=f'Course {i}', level=levels[i % 4], path=paths[i % 6], min_mean_grade='C+',
+                   min_cluster_points=30 + i % 10, description='Placement details')
+            for i in range(start, start + count)
+        ])
+        CourseReview.objects.bulk_create([
+            CourseReview(course=course, user=reviewer, rating=4, comment='Good')
+            for course in courses for reviewer in self.reviewers
+        ])
+        Favorite.objects.bulk_create([Favorite(user=self.user, course=course) for course in courses[::2]])
+
+    def grow(self):
+        self.add_courses(100, 12)
+
+    def test_results(self):
+        self.assertQueryBudget('/students/results/', 12)
+        self.assertConstantQueries('/students/results/', self.grow)
+
+    def test_favorites(self):
+        self.assertQueryBudget('/students/my-favorites/', 5)
+        self.assertConstantQueries('/students/my-favorites/', self.grow)
+
+    def test_move_favorite(self):
+        url = f'/students/my-favorites/{self.course.id}/move/'
+        # Reads the choice order, then one bulk UPDATE however many favourites there are
+        self.assertQueryBudget(url, 4, method='post', data={'direction': 'down'}, status=302)
+        self.assertConstantQueries(url, self.grow, method='post', data={'direction': 'down'}, status=302)
+
+    def test_course_reviews(self):
+        url = f'/students/course/{self.course.id}/reviews/'
+        self.assertQueryBudget(url, 7)
+
+        def more_reviews():
+            CourseReview.objects.bulk_create([
+                CourseReview(course=self.course, user=User.objects.create_user(username=f'extra{i}'), rating=3, comment='Ok')
+                for i in range(5)
+            ])
+        self.assertConstantQueries(url, more_reviews)
+        self.assertQueryBudget(url, 6, method='post', data={'rating': 5, 'comment': 'Great'}, status=302)
+
+    def test_grade_entry_and_account_pages(self):
+        self.assertQueryBudget('/students/enter-grades/', 4)  # paid, one correction still allowed
+        self.assertQueryBudget('/students/profile/', 5)
+        self.assertQueryBudget('/students/payment/', 3, status=302)
+        self.assertQueryBudget('/students/career-quiz/', 2)
+        # DELETE + counter UPDATE, in a transaction (SAVEPOINT/RELEASE here)
+        self.assertQueryBudget(f'/students/toggle-favorite/{self.course.id}/', 6, method='post', status=302)
+
+    def test_what_if(self):
+        self.assertQueryBudget('/students/what-if/', 4)
+        get_cutoff_index()  # built once per worker; simulations then read no catalog rows
+        data = {'mean_grade': 'A-', 'mathematics': 11, 'english': 11, 'kiswahili': 9, 'biology': 11}
+        self.assertQueryBudget('/students/what-if/simulate/?' + '&'.join(f'{k}={v}' for k, v in data.items()), 4)
+
+    def test_grade_submission(self):
+        data = {'mean_grade': 'B', 'mathematics': 9, 'english': 11, 'kiswahili': 9, 'biology': 10,
+                'physics': 9, 'chemistry': 10, 'history': 8, 'geography': 9}
+        self.assertQueryBudget('/students/enter-grades/', 6, method='post', data=data, status=302)
+
+    def test_class_results(self):
+        self.client.force_login(User.objects.create_user(username='counsellor', password='pw', is_staff=True))
+        url = '/students/class-results/'
+
+        def upload(students):
+            header, *rows = CLASS_CSV.splitlines()
+            text = '\n'.join([header] + [rows[i % len(rows)] for i in range(students)])
+            return {'grades_file': SimpleUploadedFile('class.csv', text.encode('utf-8'), content_type='text/csv')}
+
+        self.assertQueryBudget(url, 2)
+        small = self.assertQueryBudget(url, 3, method='post', data=upload(4))
+        self.assertConstantQueries(url, self.grow)
+        # The catalog is read once for the whole upload, however many students or courses
+        larger, _ = self.count_queries(url, method='post', data=upload(40))
+        self.assertEqual(larger, small)
+
+    def test_signup(self):
+        self.client.logout()
+        self.assertQueryBudget('/students/signup/', 0)
+        self.assertQueryBudget('/students/signup/', 11, method='post', status=302, data={
+            'username': 'newstudent', 'email': 'new@example.com',
+            'password1': 'Str0ng-pass-2025', 'password2': 'Str0ng-pass-2025',
+        })
+
+
+# ==========================================
+# CLASS RESULTS
+# ==========================================
+
+CLASS_CSV = """Student,Mean Grade,Mathematics,English,Kiswahili,Biology,Physics,Chemistry,History,Geography
+Wanjiru,B+,B+,A-,B,B+,B,B+,B-,B
+Otieno,C+,7,8,7,6,6,7,8,7
+Chebet,Q,,,,,,,,
+Mutua,B,B,Z,,,,,,
+"""
+
+
+class ClassResultsTests(TestCase):
+
+    def setUp(self):
+        rng = random.Random(7)
+        grades = [g for g in GRADE_RANKS if g != 'E']
+        Course.objects.bulk_create([
+            Course(name=f'Programme {i:03d}', level=['Degree', 'Diploma', 'Certificate', 'Artisan'][i % 4],
+                   path=['Medicine', 'Engineering', 'ICT', 'Law', 'Business', 'Arts', 'Agriculture'][i % 7],
+                   min_mean_grade=rng.choice(grades),
+                   min_cluster_points=0 if i % 9 == 0 else rng.choice([20, 28, 33, 36, 38, 40, 42, 45]))
+            for i in range(300)
+        ])
+        self.staff = User.objects.create_user(username='counsellor', password='pw', is_staff=True)
+
+    def report(self, text=CLASS_CSV):
+        rows = list(class_report(read_class_csv(text.splitlines()), CatalogIndex.load()))
+        self.assertEqual(rows[0], REPORT_HEADER)
+        return [dict(zip(REPORT_HEADER, row)) for row in rows[1:]]
+
+    def test_matches_the_results_page(self):
+        wanjiru = self.report()[0]
+
+        user = User.objects.create_user(username='wanjiru', password='pw')
+        Payment.objects.create(user=user, has_paid=True)
+        grades = StudentGrades(student=user, mean_grade='B+', mathematics=10, english=11, kiswahili=9, biology=10,
+                               physics=9, chemistry=10, history=8, geography=9)
+        grades.calculate_all_clusters()
+        self.client.force_login(user)
+        response = self.client.get('/students/results/')
+
+        self.assertEqual(wanjiru['cluster_medicine'], grades.cluster_points_medicine)
+        self.assertEqual(wanjiru['cluster_law'], grades.cluster_points_law)
+        self.assertEqual([wanjiru[f'top_pick_{i}'] for i in (1, 2, 3)],
+                         [f'{c.name} ({c.level})' for c in response.context['top_picks']])
+        self.assertEqual(wanjiru['degree_courses'], response.context['degree_courses'].paginator.count)
+
+        # Band counts agree with scoring every open course one by one
+        bands = {'Highly Likely': 0, 'Competitive': 0, 'Qualified': 0, 'Reach (Risky)': 0, 'Low Chance': 0}
+        for course in Course.objects.all():
+            if GRADE_RANKS[course.min_mean_grade] <= GRADE_RANKS['B+']:
+                bands[admission_chance(student_points(grades, course.path), course.min_cluster_points)[0]] += 1
+        self.assertEqual(
+            [wanjiru[k] for k in ('highly_likely', 'competitive', 'open_entry', 'reach', 'low_chance')],
+            list(bands.values()),
+        )
+
+    def test_bad_rows_are_reported_not_fatal(self):
+        rows = self.report()
+        self.assertEqual([r['student'] for r in rows], ['Wanjiru', 'Otieno', 'Chebet', 'Mutua'])
+        self.assertEqual(rows[1]['error'], '')
+        self.assertEqual(rows[2]['error'], "Unknown mean grade 'Q'")
+        self.assertEqual(rows[3]['error'], "Unknown grade 'Z'")
+        with self.assertRaises(ValueError):
+            read_class_csv(['name,grade'])
+
+    def test_staff_upload_streams_csv(self):
+        upload = SimpleUploadedFile('class.csv', CLASS_CSV.encode('utf-8-sig'), content_type='text/csv')
+        self.assertEqual(self.client.post('/students/class-results/', {'grades_file': upload}).status_code, 302)
+
+        self.client.force_login(self.staff)
+        self.assertContains(self.client.get('/students/class-results/'), 'business_studies')
+        upload.seek(0)
+        response = self.client.post('/students/class-results/', {'grades_file': upload})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        lines = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(lines[0], REPORT_HEADER)
+        self.assertEqual(len(lines), 5)
+
+        bad = SimpleUploadedFile('class.csv', b'name,grade\nA,B\n', content_type='text/csv')
+        response = self.client.post('/students/class-results/', {'grades_file': bad}, follow=True)
+        self.assertContains(response, 'needs')
+
+    def test_command_scores_a_large_class(self):
+        rng = random.Random(3)
+        letters = ['A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+']
+        with tempfile.TemporaryDirectory() as tmp:
+            source, target = os.path.join(tmp, 'class.csv'), os.path.join(tmp, 'report.csv')
+            with open(source, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['student', 'mean_grade', 'mathematics', 'english', 'kiswahili', 'biology',
+                                 'physics', 'chemistry', 'history', 'geography', 'business_studies'])
+                for i in range(1000):
+                    writer.writerow([f'Student {i}', rng.choice(letters)] + [rng.choice(letters) for _ in range(9)])
+            out = StringIO()
+            call_command('class_results', source, output=target, stdout=out)
+            with open(target, newline='') as f:
+                rows = list(csv.reader(f))
+        self.assertIn('1000 students (0 with errors) scored against 300 courses', out.getvalue())
+        self.assertEqual(len(rows), 1001)
+        self.assertTrue(all(row[-1] == '' and row[-4] for row in rows[1:]))
+
+    def test_snapshot_cutoffs_match_the_results_page(self):
+        # A student exactly on a 30.1 cut-off is Competitive everywhere, snapshot or not
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, 'catalog.snapshot')
+            writer = SnapshotWriter()
+            writer.add('Diploma in Nursing', 'Diploma', 'Medicine', GRADE_RANKS['C'], 30.1, course_id=1)
+            writer.write(filename)
+            grades = StudentGrades(mean_grade='B', cluster_points_medicine=30.1, cluster_points_engineering=0,
+                                   cluster_points_law=0, cluster_points_arts=0)
+            with override_settings(CATALOG_SNAPSHOT_PATH=filename):
+                _, bands, _ = CatalogIndex.load().score(grades)
+        self.assertEqual(admission_chance(30.1, 30.1), COMPETITIVE)
+        self.assertEqual(bands, [0, 1, 0, 0, 0])
+
+
+# ==========================================
+# WHAT-IF SIMULATOR
+# ==========================================
+
+class WhatIfSimulatorTests(TestCase):
+
+    def setUp(self):
+        rng = random.Random(11)
+        grades = [g for g in GRADE_RANKS if g != 'E']
+        Course.objects.bulk_create([
+            Course(name=f'Programme {i:03d}', level=['Degree', 'Diploma', 'Certificate', 'Artisan'][i % 4],
+                   path=['Medicine', 'Engineering', 'ICT', 'Law', 'Business', 'Arts', 'Agriculture'][i % 7],
+                   min_mean_grade=rng.choice(grades),
+                   min_cluster_points=0 if i % 9 == 0 else rng.choice([20, 28, 33, 36, 38, 40, 42, 45]))
+            for i in range(300)
+        ])
+        self.user = User.objects.create_user(username='wanjiru', password='pw')
+        Payment.objects.create(user=self.user, has_paid=True)
+        self.grades = StudentGrades(student=self.user, mean_grade='C+', mathematics=7, english=8, kiswahili=7,
+                                    biology=6, physics=6, chemistry=7, history=8, geography=7)
+        self.grades.calculate_all_clusters()
+        reset_cutoff_index()
+
+    def reachable(self, grades):
+        """Courses rated Qualified, Highly Likely or Competitive, scored one by one."""
+        return {
+            course.id for course in Course.objects.all()
+            if GRADE_RANKS[course.min_mean_grade] <= GRADE_RANKS[grades.mean_grade]
+            and admission_chance(student_points(grades, course.path), course.min_cluster_points)
+            in (QUALIFIED, HIGHLY_LIKELY, COMPETITIVE)
+        }
+
+    def test_matches_scoring_every_course(self):
+        better = StudentGrades(mean_grade='B+', mathematics=10, english=11, kiswahili=9, biology=10,
+                               physics=9, chemistry=10, history=8, geography=9)
+        better.compute_clusters()
+
+        index = get_cutoff_index()
+        with self.assertNumQueries(0):
+            unlocked, locked = index.compare(self.grades, better)
+        self.assertEqual({c.id for courses in unlocked.values() for c in courses},
+                         self.reachable(better) - self.reachable(self.grades))
+        self.assertEqual(sum(len(courses) for courses in locked.values()), 0)
+
+        unlocked, locked = index.compare(better, self.grades)
+        self.assertEqual({c.id for courses in locked.values() for c in courses},
+                         self.reachable(better) - self.reachable(self.grades))
+        self.assertEqual(sum(len(courses) for courses in unlocked.values()), 0)
+
+    def test_simulate_endpoint(self):
+        params = {'mean_grade': 'B', 'mathematics': 10, 'english': 8, 'kiswahili': 7, 'biology': 10,
+                  'physics': 10, 'chemistry': 10, 'history': 8, 'geography': 7}
+        self.assertEqual(self.client.get('/students/what-if/').status_code, 302)
+
+        self.client.force_login(self.user)
+        self.assertContains(self.client.get('/students/what-if/'), 'what-if-form')
+        data = self.client.get('/students/what-if/simulate/', params).json()
+
+        simulated = StudentGrades(**params)
+        simulated.compute_clusters()
+        self.assertEqual(data['clusters']['cluster_points_medicine'],
+                         {'current': self.grades.cluster_points_medicine,
+                          'simulated': simulated.cluster_points_medicine})
+        self.assertEqual(sum(level['count'] for level in data['unlocked'].values()),
+                         len(self.reachable(simulated) - self.reachable(self.grades)))
+
+        # The saved grades are untouched
+        self.grades.refresh_from_db()
+        self.assertEqual(self.grades.mean_grade, 'C+')
+        self.assertEqual(self.client.get('/students/what-if/simulate/', {'mean_grade': 'Q'}).status_code, 400)
+
+        Payment.objects.filter(user=self.user).update(has_paid=False)
+        self.assertEqual(self.client.get('/students/what-if/simulate/', params).status_code, 403)
+
+
+# ==========================================
+# COHORT ADMISSION MODEL
+# ==========================================
+
+class CohortModelTests(TestCase):
+
+    def setUp(self):
+        self.popular = Course.objects.create(name='BSc Computer Science', level='Degree', path='ICT',
+                                             min_mean_grade='C+', min_cluster_points=36)
+        self.quiet = Course.objects.create(name='BSc Information Technology', level='Degree', path='ICT',
+                                           min_mean_grade='C+', min_cluster_points=36)
+        Course.objects.create(name='Certificate in ICT', level='Certificate', path='ICT',
+                              min_mean_grade='C-', min_cluster_points=0)
+        rng = random.Random(5)
+        for i in range(40):
+            user = User.objects.create_user(username=f'student{i}')
+            points = {s: rng.randint(5, 12) for s in ('mathematics', 'english', 'kiswahili', 'biology', 'physics',
+                                                      'chemistry', 'history', 'geography')}
+            StudentGrades(student=user, mean_grade='B', **points).calculate_all_clusters()
+            Favorite.objects.create(user=user, course=self.popular)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.model_path = os.path.join(self.tmp.name, 'cohort_model.json')
+
+    def test_percentiles(self):
+        table = percentile_table(range(101))
+        self.assertEqual(table[:3], [0, 1, 2])
+        self.assertEqual(percentile_of(table, 50), 0.5)
+        self.assertEqual(percentile_of(table, 49.5), 0.495)
+        self.assertEqual((percentile_of(table, -1), percentile_of(table, 500)), (0.0, 1.0))
+
+    def test_probability_follows_points_and_demand(self):
+        model = CohortModel(build_cohort_model())
+        self.assertIn('ICT', model.paths)  # 40 interested students: a path pool of its own
+        self.assertIsNone(model.probability(30, 0, self.popular.id, 'ICT'))
+
+        chances = [model.probability(points, 36, self.popular.id, 'ICT') for points in (30, 34, 36, 40, 46)]
+        self.assertEqual(chances, sorted(chances))
+        self.assertLess(chances[0], 15)
+        self.assertGreater(chances[-1], 75)
+        # Same cut-off, nobody else wants it: better odds
+        self.assertGreater(model.probability(36, 36, self.quiet.id, 'ICT'), chances[2])
+
+    def test_too_few_students(self):
+        StudentGrades.objects.filter(student__username__gte='student2').delete()
+        self.assertIsNone(build_cohort_model())
+        with self.assertRaises(CommandError):
+            call_command('build_cohort_model', output=self.model_path, stdout=StringIO())
+
+    def test_results_show_probabilities_without_extra_queries(self):
+        student = User.objects.get(username='student0')
+        Payment.objects.create(user=student, has_paid=True)
+        self.client.force_login(student)
+
+        with override_settings(COHORT_MODEL_PATH=self.model_path):
+            with CaptureQueriesContext(connection) as buckets:
+                response = self.client.get('/students/results/')
+            self.assertNotContains(response, '% chance')
+
+            out = StringIO()
+            call_command('build_cohort_model', output=self.model_path, stdout=out)
+            self.assertIn('Cohort model from 40 students', out.getvalue())
+            self.assertIsNotNone(get_cohort_model())
+            with CaptureQueriesContext(connection) as modelled:
+                response = self.client.get('/students/results/')
+
+        self.assertContains(response, '% chance')
+        self.assertContains(response, 'Qualified')  # open entry keeps its badge
+        self.assertEqual(len(modelled), len(buckets))
+
+    def test_stale_or_corrupt_model_falls_back_to_buckets(self):
+        student = User.objects.get(username='student0')
+        Payment.objects.create(user=student, has_paid=True)
+        self.client.force_login(student)
+        model = build_cohort_model()
+
+        for name, contents in (('stale.json', json.dumps(dict(model, version=MODEL_VERSION + 1))),
+                               ('truncated.json', '{"version": 1, "stud')):
+            path = os.path.join(self.tmp.name, name)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(contents)
+            with override_settings(COHORT_MODEL_PATH=path), self.assertLogs('students.cohort', 'WARNING'):
+                    response = self.client.get('/students/results/')
+            self.assertEqual(response.status_code, 200)
+            self.assertNotContains(response, '% chance')
+            with override_settings(COHORT_MODEL_PATH=path), mock.patch('students.cohort.CohortModel') as loaded:
+                self.assertIsNone(get_cohort_model())  # not read again until it changes
+            loaded.assert_not_called()
+
+
+# ==========================================
+# PLACEMENT SIMULATION
+# ==========================================
+
+class PlacementTests(TestCase):
+
+    def setUp(self):
+        rng = random.Random(9)
+        self.courses = Course.objects.bulk_create([
+            Course(name=f'Programme {i}', level='Degree', path=['Medicine', 'Engineering', 'Law', 'Arts'][i % 4],
+                   min_mean_grade=rng.choice(['C+', 'B-', 'B']), min_cluster_points=rng.choice([0, 24, 30, 36]),
+                   capacity=rng.choice([None, 1, 3, 5]))
+            for i in range(12)
+        ])
+        self.users = []
+        for i in range(60):
+            user = User.objects.create_user(username=f'applicant{i}')
+            StudentGrades(student=user, mean_grade=rng.choice(['C+', 'B-', 'B', 'A-']),
+                          **{s: rng.randint(4, 12) for s in ('mathematics', 'english', 'kiswahili', 'biology',
+                                                             'physics', 'chemistry', 'history', 'geography')}
+                          ).calculate_all_clusters()
+            Favorite.objects.bulk_create([Favorite(user=user, course=c) for c in rng.sample(self.courses, 4)])
+            self.users.append(user)
+
+    def test_placement_is_stable(self):
+        student_ids, choices, scores, numbers, course_ids, capacities = load_cohort()
+        placed = deferred_acceptance(choices, scores, capacities)
+
+        holders = {}
+        for s, k in enumerate(placed):
+            if k >= 0:
+                holders.setdefault(choices[s][k], []).append((scores[s][k], -s))
+        for c, held in holders.items():
+            self.assertLessEqual(len(held), capacities[c] or len(held))
+        # Nobody would rather have a course that has room for them or holds someone ranked lower
+        for s, prefs in enumerate(choices):
+            better = prefs if placed[s] < 0 else prefs[:placed[s]]
+            for k, c in enumerate(better):
+                held = holders.get(c, [])
+                self.assertIsNotNone(capacities[c])
+                self.assertEqual(len(held), capacities[c])
+                self.assertTrue(all(key > (scores[s][k], -s) for key in held))
+
+    def test_results_are_cached_and_rerun_only_on_change(self):
+        run = run_placement()
+        self.assertEqual(run.students, 60)
+        self.assertEqual(Placement.objects.count(), 60)
+        self.assertEqual(Placement.objects.filter(course__isnull=False).count(), run.placed)
+        self.assertIsNone(run_placement())
+        self.assertEqual(run_placement(force=True).changed, 0)
+
+        # One student changes their list: only placements that move are rewritten
+        user = self.users[0]
+        Favorite.objects.filter(user=user).delete()
+        open_course = Course.objects.create(name='Open Programme', level='Degree', path='Arts', min_mean_grade='D')
+        Favorite.objects.create(user=user, course=open_course)
+        run = run_placement()
+        self.assertGreaterEqual(run.changed, 1)
+        self.assertLess(run.changed, 60)
+        self.assertEqual(Placement.objects.get(student=user).choice, 1)
+
+    def test_course_edits_that_keep_the_totals_trigger_a_rerun(self):
+        run_placement()
+        first, second = sorted(self.courses, key=lambda c: c.id)[:2]
+        Course.objects.filter(id=first.id).update(min_mean_grade='A')
+        self.assertIsNotNone(run_placement())
+
+        # Swapped capacities and cut-offs: every sum is unchanged
+        Course.objects.filter(id=first.id).update(capacity=7, min_cluster_points=40)
+        Course.objects.filter(id=second.id).update(capacity=2, min_cluster_points=10)
+        self.assertIsNotNone(run_placement())
+        Course.objects.filter(id=first.id).update(capacity=2, min_cluster_points=10)
+        Course.objects.filter(id=second.id).update(capacity=7, min_cluster_points=40)
+        self.assertIsNotNone(run_placement())
+        self.assertIsNone(run_placement())
+
+    def test_favorites_page_shows_placement_and_reorders(self):
+        user = self.users[1]
+        run_placement()
+        self.client.force_login(user)
+        self.assertContains(self.client.get('/students/my-favorites/'), 'Placement simulation')
+
+        second = list(Favorite.objects.filter(user=user).order_by('saved_at', 'id'))[1].course_id
+        self.client.post(f'/students/my-favorites/{second}/move/', {'direction': 'up'})
+        ordered = Favorite.objects.filter(user=user).order_by('rank').values_list('course_id', flat=True)
+        self.assertEqual(ordered[0], second)
+        self.assertEqual(list(Favorite.objects.filter(user=user).values_list('rank', flat=True).order_by('rank')),
+                         [1, 2, 3, 4])
+
+
+# ==========================================
+# "ALSO SAVED" RECOMMENDATIONS
+# ==========================================
+
+class RecommendationTests(TestCase):
+
+    def setUp(self):
+        self.rng = random.Random(13)
+        self.courses = Course.objects.bulk_create([
+            Course(name=f'Course {i}', level='Degree', path='ICT', min_mean_grade='C+', min_cluster_points=0)
+            for i in range(15)
+        ])
+        self.users = [User.objects.create_user(username=f'saver{i}') for i in range(40)]
+        for user in self.users:
+            # Two loose "interest groups" so neighbours are not random
+            group = self.courses[:8] if user.id % 2 else self.courses[7:]
+            Favorite.objects.bulk_create([Favorite(user=user, course=c) for c in self.rng.sample(group, 4)])
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.state = os.path.join(tmp.name, 'recommender.state')
+
+    def neighbours(self):
+        return list(SimilarCourse.objects.order_by('course', 'rank').values_list('course', 'similar', 'rank', 'co_saves'))
+
+    def test_incremental_refresh_matches_full_rebuild(self):
+        students, _, rows = refresh_recommendations(filename=self.state)
+        self.assertEqual(students, 40)
+        self.assertGreater(rows, 0)
+        self.assertEqual(refresh_recommendations(filename=self.state)[:2], (0, 0))
+
+        # Some students change their lists; one leaves a positive review
+        for user in self.users[:5]:
+            Favorite.objects.filter(user=user).order_by('id').first().delete()
+            Favorite.objects.get_or_create(user=user, course=self.courses[14])
+        CourseReview.objects.create(user=self.users[6], course=self.courses[0], rating=5, comment='Great')
+        CourseReview.objects.create(user=self.users[7], course=self.courses[1], rating=2, comment='Meh')
+        students, _, _ = refresh_recommendations(filename=self.state)
+        self.assertEqual(students, 6)
+        incremental = self.neighbours()
+
+        refresh_recommendations(full=True, filename=self.state)
+        self.assertEqual(incremental, self.neighbours())
+
+        # Neighbours come from the same interest group
+        first = SimilarCourse.objects.filter(course=self.courses[0], rank=1).get()
+        self.assertLess(self.courses.index(first.similar), 8)
+
+    def test_pages_show_also_saved(self):
+        with override_settings(RECOMMENDER_STATE_PATH=self.state):
+            call_command('refresh_recommendations', stdout=StringIO())
+        user = self.users[1]
+        Payment.objects.create(user=user, has_paid=True)
+        StudentGrades(student=user, mean_grade='B', mathematics=9, english=9, kiswahili=9,
+                      biology=9, physics=9, chemistry=9).calculate_all_clusters()
+        self.client.force_login(user)
+
+        self.assertContains(self.client.get('/students/results/'), 'Students who saved this also saved')
+        self.assertContains(self.client.get(f'/students/course/{self.courses[0].id}/reviews/'),
+                            'Students who saved this also saved')
+        response = self.client.get('/students/my-favorites/')
+        saved = set(Favorite.objects.filter(user=user).values_list('course_id', flat=True))
+        self.assertTrue(response.context['recommendations'])
+        self.assertFalse({c.id for c in response.context['recommendations']} & saved)
+
+
+# ==========================================
+# FAVOURITE TOGGLE
+# ==========================================
+
+class FavoriteToggleTests(TestCase):
+
+    def setUp(self):
+        self.course = Course.objects.create(name='Diploma in Nursing', level='Diploma', path='Medicine')
+        self.url = f'/students/toggle-favorite/{self.course.id}/'
+        self.user = User.objects.create(username='njeri')
+        self.client.force_login(self.user)
+
+    def toggle(self, client=None):
+        response = (client or self.client).post(self.url, HTTP_ACCEPT='application/json')
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_toggle_returns_state_and_count(self):
+        other = self.client_class()
+        other.force_login(User.objects.create(username='kiprop'))
+        self.assertEqual(self.toggle(), {'saved': True, 'favorite_count': 1})
+        self.assertEqual(self.toggle(other), {'saved': True, 'favorite_count': 2})
+        self.assertEqual(self.toggle(), {'saved': False, 'favorite_count': 1})
+        self.assertEqual(list(Favorite.objects.values_list('user__username', flat=True)), ['kiprop'])
+
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.favorite_count, 1)
+        Favorite.recount()
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.favorite_count, 1)
+
+    def test_losing_double_click_keeps_the_course_saved(self):
+        Favorite.objects.create(user=self.user, course=self.course)
+        Course.objects.update(favorite_count=1)
+        # The other click inserted between this request's DELETE and INSERT
+        with mock.patch('django.db.models.query.QuerySet.delete', return_value=(0, {})):
+            self.assertEqual(self.toggle(), {'saved': True, 'favorite_count': 1})
+        self.assertEqual(Favorite.objects.count(), 1)
+
+    def test_post_only_and_unknown_courses(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        self.assertEqual(self.client.post('/students/toggle-favorite/999/', HTTP_ACCEPT='application/json').status_code, 404)
+        self.assertFalse(Favorite.objects.exists())
+
+    def test_form_post_redirects_back(self):
+        response = self.client.post(self.url, HTTP_REFERER='/students/my-favorites/')
+        self.assertRedirects(response, '/students/my-favorites/', fetch_redirect_response=False)
+        self.assertTrue(Favorite.objects.filter(user=self.user).exists())
+        self.assertEqual(Course.objects.get().favorite_count, 1)
+
+    def test_count_never_goes_negative(self):
+        Favorite.objects.create(user=self.user, course=self.course)  # saved without the counter
+        self.assertEqual(self.toggle(), {'saved': False, 'favorite_count': 0})
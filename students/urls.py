@@ -19,5 +19,9 @@ urlpatterns = [
     path('career-quiz/', views.career_quiz, name='career_quiz'),
     path('toggle-favorite/<int:course_id>/', views.toggle_favorite, name='toggle_favorite'),
     path('my-favorites/', views.favorite_list, name='favorite_list'),
+    path('my-favorites/<int:course_id>/move/', views.move_favorite, name='move_favorite'),
     path('course/<int:course_id>/reviews/', views.course_reviews, name='course_reviews'),
+    path('what-if/', views.what_if, name='what_if'),
+    path('what-if/simulate/', views.what_if_simulate, name='what_if_simulate'),
+    path('class-results/', views.class_results, name='class_results'),
 ]
\ No newline at end of file
@@ -1,27 +1,37 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import login, update_session_auth_hash
 from django.contrib.auth.forms import PasswordChangeForm
 from django.contrib import messages
-from django.db.models import Case, When, Value, IntegerField, Q, Avg
+from django.db import IntegrityError, transaction
+from django.db.models import Case, When, Value, IntegerField, Q, Avg, F
+from django.db.models.functions import Greatest
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
 from django.urls import reverse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_POST
+import copy
+import csv
+import io
 import re 
 
 # Import Models
-from .models import StudentGrades, Payment, Favorite
+from .models import StudentGrades, Payment, Favorite, Placement
 from courses.models import Course, CourseReview
+from courses.fuzzy import fuzzy_matches
+from courses.generation import GRADE_RANKS
+from coursereviews.routers import replica_reads
+from .scoring import admission_chance, student_points
+from .batch import SUBJECT_FIELDS, CatalogIndex, class_report, csv_lines, read_class_csv
+from .simulator import get_cutoff_index
+from .cohort import get_cohort_model, probability_label
+from .recommend import also_saved, recommended_for
 
 # Import Forms
 from .forms import GradeEntryForm, SignUpForm, CareerQuizForm
 from courses.forms import ReviewForm
 
-# --- HELPER DICTIONARIES ---
-GRADE_RANKS = {
-    'A': 12, 'A-': 11, 'B+': 10, 'B': 9, 'B-': 8,
-    'C+': 7, 'C': 6, 'C-': 5, 'D+': 4, 'D': 3, 'D-': 2, 'E': 1, 'Any': 0,
-}
-
 # --- HELPER FUNCTION FOR PAGINATION ---
 def paginate_queryset(request, queryset_list, param_name='page'):
     """Helper to paginate a list or queryset."""
@@ -173,20 +183,61 @@ def payment_page(request):
 # FEATURES
 # ==========================================
 @login_required
+@require_POST
 def toggle_favorite(request, course_id):
-    course = get_object_or_404(Course, id=course_id)
-    favorite_item = Favorite.objects.filter(user=request.user, course=course).first()
-    if favorite_item:
-        favorite_item.delete()
-    else:
-        Favorite.objects.create(user=request.user, course=course)
-    return redirect(request.META.get('HTTP_REFERER', 'students:results'))
+    """
+    Saves or un-saves a course and returns {'saved', 'favorite_count'} so the
+    heart updates in place (plain form posts are redirected back instead).
+    The favourite is one DELETE, or one INSERT when nothing was deleted; the
+    unique (user, course) pair settles double-clicks, and the losing click
+    leaves the course saved. Course.favorite_count moves by F() in the same
+    transaction.
+    """
+    one_less = Greatest(F('favorite_count') - 1, 0)  # never negative, even if the count has drifted
+    with transaction.atomic():
+        removed, _ = Favorite.objects.filter(user=request.user, course_id=course_id).delete()
+        # Also tells us the course exists before a favourite points at it
+        if not Course.objects.filter(id=course_id).update(favorite_count=one_less if removed else F('favorite_count') + 1):
+            raise Http404("No such course")
+        if not removed:
+            try:
+                with transaction.atomic():
+                    Favorite.objects.create(user=request.user, course_id=course_id)
+            except IntegrityError:
+                Course.objects.filter(id=course_id).update(favorite_count=one_less)
+
+    if 'application/json' not in request.headers.get('Accept', ''):
+        return redirect(request.META.get('HTTP_REFERER', 'students:results'))
+    favorite_count = Course.objects.filter(id=course_id).values_list('favorite_count', flat=True).get()
+    return JsonResponse({'saved': not removed, 'favorite_count': favorite_count})
+
+def _choice_order(user):
+    # Same order the placement simulation uses
+    return Favorite.objects.filter(user=user).order_by(F('rank').asc(nulls_last=True), 'saved_at', 'id')
 
 @login_required
 def favorite_list(request):
-    favorites = Favorite.objects.filter(user=request.user).select_related('course')
+    favorites = _choice_order(request.user).select_related('course')
     courses = [f.course for f in favorites]
-    return render(request, 'students/favorites.html', {'courses': courses})
+    placement = Placement.objects.filter(student=request.user).select_related('course').first()
+    recommendations = recommended_for([course.id for course in courses]) if courses else []
+    return render(request, 'students/favorites.html', {
+        'courses': courses, 'placement': placement, 'recommendations': recommendations,
+    })
+
+@login_required
+def move_favorite(request, course_id):
+    """Moves a favourite one place up or down in the student's choice order."""
+    if request.method == 'POST':
+        favorites = list(_choice_order(request.user))
+        index = next((i for i, f in enumerate(favorites) if f.course_id == course_id), None)
+        other = None if index is None else index + (-1 if request.POST.get('direction') == 'up' else 1)
+        if other is not None and 0 <= other < len(favorites):
+            favorites[index], favorites[other] = favorites[other], favorites[index]
+            for rank, favorite in enumerate(favorites, start=1):
+                favorite.rank = rank
+            Favorite.objects.bulk_update(favorites, ['rank'])
+    return redirect('students:favorite_list')
 
 @login_required
 def course_reviews(request, course_id):
@@ -206,6 +257,7 @@ def course_reviews(request, course_id):
     else:
         form = ReviewForm()
     context = {'course': course, 'reviews': reviews, 'avg_rating': round(avg_rating, 1), 'review_count': reviews.count(), 'form': form}
+    context['also_saved'] = also_saved([course.id], limit=5).get(course.id, [])
     return render(request, 'students/course_reviews.html', context)
 
 @login_required
@@ -280,16 +332,29 @@ def results(request):
         market_rank=market_demand_sorting
     ).order_by('market_rank', 'name')
     
-    # 4. Search & Filter
-    search_query = request.GET.get('search', '')
-    if search_query:
-        qualified_courses = qualified_courses.filter(Q(name__icontains=search_query) | Q(description__icontains=search_query))
-
+    # 4. Filter & Search (misspelt names are caught by trigram matching among the
+    #    courses the student qualifies for; best matches first, ordered in SQL so the
+    #    200-course slices below keep the closest ones)
     available_paths = Course.objects.values_list('path', flat=True).distinct().order_by('path')
     selected_path = request.GET.get('filter_path')
     if selected_path and selected_path != 'All':
         qualified_courses = qualified_courses.filter(path__iexact=selected_path)
 
+    search_query = request.GET.get('search', '')
+    if search_query:
+        with replica_reads():
+            search_matches = fuzzy_matches(search_query, courses=qualified_courses)
+        qualified_courses = qualified_courses.filter(
+            Q(name__icontains=search_query) | Q(description__icontains=search_query)
+            | Q(id__in=[course_id for course_id, _ in search_matches])
+        )
+        if search_matches:
+            qualified_courses = qualified_courses.annotate(search_rank=Case(
+                *[When(id=course_id, then=Value(rank)) for rank, (course_id, _) in enumerate(search_matches)],
+                default=Value(len(search_matches)),
+                output_field=IntegerField()
+            )).order_by('search_rank', 'market_rank', 'name')
+
     # --- GAP ANALYSIS: Near Misses ---
     # Find courses that require exactly 1 grade higher than student has
     target_rank = student_grade_rank + 1
@@ -307,6 +372,8 @@ def results(request):
         ).annotate(
             market_rank=market_demand_sorting
         ).order_by('market_rank', 'name')[:5] 
+        with replica_reads():
+            missed_qs = list(missed_qs)
         
         # Manually process Near Misses
         temp_misses = []
@@ -323,47 +390,31 @@ def results(request):
             temp_misses.append(c)
         near_miss_list = temp_misses
 
-    # Helper for "Admission Chance" & Scoring
+    # Helper for "Admission Chance" & Scoring. With a cohort model (built nightly) the
+    # badge shows an estimated probability; the bucket still orders the Top Picks.
+    cohort = get_cohort_model()
+
     def add_chance_info(course_list):
         for course in course_list:
-            student_points = 0.0
-            path_lower = course.path.lower()
-            if 'med' in path_lower: student_points = grades.cluster_points_medicine
-            elif 'engin' in path_lower or 'sci' in path_lower or 'agri' in path_lower or 'ict' in path_lower: 
-                student_points = grades.cluster_points_engineering
-            elif 'law' in path_lower: student_points = grades.cluster_points_law
-            else: student_points = grades.cluster_points_arts
-
-            course.student_points = student_points 
-            gap = student_points - course.min_cluster_points
-            
-            if course.min_cluster_points == 0:
-                course.chance = "Qualified"
-                course.chance_color = "success"
-                course.sort_score = 10
-            elif gap >= 5:
-                course.chance = "Highly Likely"
-                course.chance_color = "success"
-                course.sort_score = 20
-            elif gap >= 0:
-                course.chance = "Competitive"
-                course.chance_color = "warning text-dark"
-                course.sort_score = 15
-            elif gap >= -2:
-                course.chance = "Reach (Risky)"
-                course.chance_color = "danger"
-                course.sort_score = 5
-            else:
-                course.chance = "Low Chance"
-                course.chance_color = "secondary"
-                course.sort_score = 0
+            course.student_points = student_points(grades, course.path)
+            course.chance, course.chance_color, course.sort_score = admission_chance(
+                course.student_points, course.min_cluster_points
+            )
+            course.probability = cohort and cohort.probability(
+                course.student_points, course.min_cluster_points, course.id, course.path
+            )
+            if course.probability:
+                course.chance, course.chance_color = probability_label(course.probability)
         return course_list
 
-    # 5. Split & Process Lists
-    degree_list = add_chance_info(list(qualified_courses.filter(level__icontains='Degree')[:200]))
-    diploma_list = add_chance_info(list(qualified_courses.filter(level__icontains='Diploma')[:200]))
-    cert_list = add_chance_info(list(qualified_courses.filter(level__icontains='Certificate')[:200]))
-    artisan_list = add_chance_info(list(qualified_courses.filter(level__icontains='Artisan')[:200]))
+    # 5. Split & Process Lists (the catalog may be read from the replica; grades,
+    #    payment and favourites above and below stay on the primary)
+    with replica_reads():
+        available_paths = list(available_paths)
+        degree_list = add_chance_info(list(qualified_courses.filter(level__icontains='Degree')[:200]))
+        diploma_list = add_chance_info(list(qualified_courses.filter(level__icontains='Diploma')[:200]))
+        cert_list = add_chance_info(list(qualified_courses.filter(level__icontains='Certificate')[:200]))
+        artisan_list = add_chance_info(list(qualified_courses.filter(level__icontains='Artisan')[:200]))
 
     # Top Picks Logic
     all_recommendations = degree_list + diploma_list
@@ -371,6 +422,13 @@ def results(request):
 
     user_favorites_ids = set(Favorite.objects.filter(user=request.user).values_list('course_id', flat=True))
 
+    # 6. "Also saved" for the courses on the current page of each tab (one query)
+    pages = [paginate_queryset(request, course_list) for course_list in (degree_list, diploma_list, cert_list, artisan_list)]
+    neighbours = also_saved([course.id for page in pages for course in page])
+    for page in pages:
+        for course in page:
+            course.also_saved = neighbours.get(course.id, [])
+
     context = {
         'grades': grades,
         'student_mean_grade': student_mean_grade,
@@ -380,10 +438,99 @@ def results(request):
         'user_favorites_ids': user_favorites_ids,
         'top_picks': top_picks,
         'near_misses': near_miss_list,
-        'degree_courses': paginate_queryset(request, degree_list),
-        'diploma_courses': paginate_queryset(request, diploma_list),
-        'certificate_courses': paginate_queryset(request, cert_list),
-        'artisan_courses': paginate_queryset(request, artisan_list),
+        'degree_courses': pages[0],
+        'diploma_courses': pages[1],
+        'certificate_courses': pages[2],
+        'artisan_courses': pages[3],
     }
     
-    return render(request, 'students/results.html', context)
\ No newline at end of file
+    return render(request, 'students/results.html', context)
+
+# ==========================================
+# WHAT-IF SIMULATOR
+# ==========================================
+WHAT_IF_LIST_LIMIT = 25
+
+def _paid_grades(request):
+    """The student's StudentGrades if they have paid and entered grades, else a redirect target."""
+    payment = Payment.objects.filter(user=request.user).first()
+    if not payment or not payment.has_paid:
+        return None, 'students:payment'
+    grades = StudentGrades.objects.filter(student=request.user).first()
+    if not grades or not grades.mean_grade:
+        return None, 'students:enter_grades'
+    return grades, None
+
+@login_required
+def what_if(request):
+    """Try different subject grades and see which courses unlock (nothing is saved)."""
+    grades, redirect_to = _paid_grades(request)
+    if redirect_to:
+        return redirect(redirect_to)
+    form = GradeEntryForm(instance=grades)
+    return render(request, 'students/what_if.html', {'form': form, 'grades': grades})
+
+@login_required
+def what_if_simulate(request):
+    """
+    JSON for the simulator: cluster points for the grades in the query string
+    and the courses they unlock or lose compared with the saved grades.
+    Answered from the in-memory cut-off arrays, without catalog queries.
+    """
+    grades, redirect_to = _paid_grades(request)
+    if redirect_to:
+        return JsonResponse({'error': 'Results are available after payment and grade entry.'}, status=403)
+
+    form = GradeEntryForm(request.GET, instance=copy.copy(grades))
+    if not form.is_valid():
+        return JsonResponse({'error': 'Invalid grades.', 'fields': form.errors}, status=400)
+    simulated = form.instance
+    simulated.compute_clusters()
+
+    unlocked, locked = get_cutoff_index().compare(grades, simulated)
+
+    def course_list(courses):
+        courses = sorted(courses, key=lambda c: (-c.cutoff, c.name))
+        return [
+            {'id': c.id, 'name': c.name, 'path': c.path, 'cutoff': c.cutoff}
+            for c in courses[:WHAT_IF_LIST_LIMIT]
+        ]
+
+    return JsonResponse({
+        'mean_grade': simulated.mean_grade,
+        'clusters': {
+            field: {'current': getattr(grades, field), 'simulated': getattr(simulated, field)}
+            for field in ('cluster_points_medicine', 'cluster_points_engineering',
+                          'cluster_points_law', 'cluster_points_arts')
+        },
+        'unlocked': {level: {'count': len(courses), 'courses': course_list(courses)}
+                     for level, courses in unlocked.items()},
+        'locked': {level: len(courses) for level, courses in locked.items()},
+    })
+
+# ==========================================
+# CLASS RESULTS (COUNSELLORS)
+# ==========================================
+@staff_member_required
+def class_results(request):
+    """
+    Batch version of results for a whole class: upload a CSV of grades and
+    download a CSV with each student's cluster points, course counts per
+    admission chance and top picks. The report is streamed row by row.
+    """
+    if request.method == 'POST' and request.FILES.get('grades_file'):
+        upload = request.FILES['grades_file']
+        lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+        try:
+            rows = read_class_csv(lines)
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            messages.error(request, f"Could not read {upload.name}: {e}")
+            return redirect('students:class_results')
+
+        report = class_report(rows, CatalogIndex.load())
+        response = StreamingHttpResponse(csv_lines(report), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="class_results.csv"'
+        return response
+
+    return render(request, 'students/class_results.html', {'subjects': SUBJECT_FIELDS})
+